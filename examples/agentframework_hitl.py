@@ -6,7 +6,6 @@
 # For a tools example, see agentframework_tools.py.
 
 import asyncio
-import os
 from collections.abc import AsyncIterable
 from dataclasses import dataclass, field
 
@@ -24,32 +23,13 @@ from agent_framework import (
     handler,
     response_handler,
 )
-from agent_framework.openai import OpenAIChatClient
-from azure.identity.aio import DefaultAzureCredential, get_bearer_token_provider
 from dotenv import load_dotenv
+from shared.model_clients import close_clients, create_agent_framework_client
 from typing_extensions import Never
 
 # Configure OpenAI client based on environment
 load_dotenv(override=True)
-API_HOST = os.getenv("API_HOST", "azure")
-async_credential = None
-
-if API_HOST == "azure":
-    async_credential = DefaultAzureCredential()
-    token_provider = get_bearer_token_provider(async_credential, "https://cognitiveservices.azure.com/.default")
-    client = OpenAIChatClient(
-        base_url=f"{os.environ['AZURE_OPENAI_ENDPOINT']}/openai/v1/",
-        api_key=token_provider,
-        model=os.environ["AZURE_OPENAI_CHAT_DEPLOYMENT"],
-    )
-elif API_HOST == "ollama":
-    client = OpenAIChatClient(
-        base_url=os.environ.get("OLLAMA_ENDPOINT", "http://localhost:11434/v1"),
-        api_key="none",
-        model=os.environ.get("OLLAMA_MODEL", "gemma4:e4b"),
-    )
-else:
-    client = OpenAIChatClient(api_key=os.environ["OPENAI_API_KEY"], model=os.environ.get("OPENAI_MODEL", "gpt-4o"))
+client = create_agent_framework_client()
 
 """
 Sample: Agents with human feedback
@@ -241,8 +221,7 @@ async def main() -> None:
 
     print("\nWorkflow complete.")
 
-    if async_credential:
-        await async_credential.close()
+    await close_clients()
 
 
 if __name__ == "__main__":
@@ -3,39 +3,19 @@ Agent Framework MagenticOne Example - Travel Planning with Multiple Agents
 """
 import asyncio
 import json
-import os
 from typing import cast
 
 from agent_framework import Agent, AgentResponseUpdate, Message, WorkflowEvent
-from agent_framework.openai import OpenAIChatClient
 from agent_framework.orchestrations import MagenticBuilder, MagenticProgressLedger
-from azure.identity.aio import DefaultAzureCredential, get_bearer_token_provider
 from dotenv import load_dotenv
 from rich.console import Console
 from rich.markdown import Markdown
 from rich.panel import Panel
+from shared.model_clients import close_clients, create_agent_framework_client
 
 # Configure OpenAI client based on environment
 load_dotenv(override=True)
-API_HOST = os.getenv("API_HOST", "azure")
-
-async_credential = None
-if API_HOST == "azure":
-    async_credential = DefaultAzureCredential()
-    token_provider = get_bearer_token_provider(async_credential, "https://cognitiveservices.azure.com/.default")
-    client = OpenAIChatClient(
-        base_url=f"{os.environ['AZURE_OPENAI_ENDPOINT']}/openai/v1/",
-        api_key=token_provider,
-        model=os.environ["AZURE_OPENAI_CHAT_DEPLOYMENT"],
-    )
-elif API_HOST == "ollama":
-    client = OpenAIChatClient(
-        base_url=os.environ.get("OLLAMA_ENDPOINT", "http://localhost:11434/v1"),
-        api_key="none",
-        model=os.environ.get("OLLAMA_MODEL", "gemma4:e4b"),
-    )
-else:
-    client = OpenAIChatClient(api_key=os.environ["OPENAI_API_KEY"], model=os.environ.get("OPENAI_MODEL", "gpt-4o"))
+client = create_agent_framework_client()
 
 # Initialize rich console
 console = Console()
@@ -161,8 +141,7 @@ async def main():
 
     print_final_result(output_event)
 
-    if async_credential:
-        await async_credential.close()
+    await close_clients()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,127 @@
+"""Load generator for the hotel MCP server (mcp_server_basic.py), over streamable HTTP.
+
+Each virtual user opens its own MCP session and calls the tool back to back. The
+benchmark ramps through increasing numbers of concurrent users, runs each step for a
+fixed time after a short warm-up, and reports the sustained throughput and the
+p50/p95/p99 latency of the calls. Calls that fail, or whose result is a tool error,
+are counted as errors and left out of the latencies.
+
+Calls cycle through several cities. By default each call also gets its own dates, so
+that every call misses the server's tool cache; pass `--repeat` to send the same few
+calls over and over and measure cache hits instead.
+
+Start the server first, then point the benchmark at it:
+
+    python examples/mcp_server_basic.py
+    python examples/benchmarks/mcp_load_benchmark.py --concurrency 1 4 16 64 --duration 10 --json results.json
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import platform
+import time
+from datetime import date, timedelta
+
+import numpy as np
+from mcp import ClientSession
+from mcp.client.streamable_http import streamable_http_client
+
+DEFAULT_LOCATIONS = "San Francisco,New York,Seattle,Chicago,London,Paris"
+
+
+def call_arguments(locations: list[str], repeat: bool, extra: dict):
+    """Yield `suggest_hotels` arguments, cycling through the locations and, unless `repeat`, the dates."""
+    first_check_in = date.today() + timedelta(days=30)
+    for i in itertools.count():
+        check_in = first_check_in + timedelta(days=0 if repeat else i // len(locations))
+        yield {
+            "location": locations[i % len(locations)],
+            "check_in": check_in.isoformat(),
+            "check_out": (check_in + timedelta(days=2)).isoformat(),
+            **extra,
+        }
+
+
+async def virtual_user(url: str, tool: str, arguments, start: float, deadline: float, results: list) -> None:
+    """Call `tool` until `deadline`, appending (latency in seconds, ok) for the calls started after `start`."""
+    async with streamable_http_client(url) as (read, write, _):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            while (now := time.perf_counter()) < deadline:
+                try:
+                    result = await session.call_tool(tool, next(arguments))
+                    ok = not result.isError
+                except Exception:
+                    ok = False
+                if now >= start:
+                    results.append((time.perf_counter() - now, ok))
+
+
+async def run_step(url: str, tool: str, arguments, concurrency: int, warmup: float, duration: float) -> dict:
+    results: list[tuple[float, bool]] = []
+    start = time.perf_counter() + warmup
+    deadline = start + duration
+    await asyncio.gather(*(virtual_user(url, tool, arguments, start, deadline, results) for _ in range(concurrency)))
+    latencies_ms = np.array([latency for latency, ok in results if ok]) * 1000
+    step = {
+        "concurrency": concurrency,
+        "calls": len(results),
+        "errors": sum(not ok for _, ok in results),
+        "throughput": len(latencies_ms) / duration,
+    }
+    for name, percentile in (("p50_ms", 50), ("p95_ms", 95), ("p99_ms", 99)):
+        step[name] = float(np.percentile(latencies_ms, percentile)) if len(latencies_ms) else None
+    step["max_ms"] = float(latencies_ms.max()) if len(latencies_ms) else None
+    return step
+
+
+def format_ms(value: float | None) -> str:
+    return f"{value:>10.2f}" if value is not None else f"{'-':>10}"
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000/mcp/", help="Streamable HTTP endpoint of the server")
+    parser.add_argument("--tool", default="suggest_hotels")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--duration", type=float, default=10.0, help="Measured seconds per concurrency step")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Unmeasured seconds at the start of each step")
+    parser.add_argument("--locations", default=DEFAULT_LOCATIONS, help="Comma-separated cities to cycle through")
+    parser.add_argument("--arguments", type=json.loads, default={}, help="JSON of extra tool arguments")
+    parser.add_argument("--repeat", action="store_true", help="Repeat the same dates, so calls hit the tool cache")
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    arguments = call_arguments([city.strip() for city in args.locations.split(",")], args.repeat, args.arguments)
+    print(f"{args.tool} at {args.url}, {args.duration:g}s per step after {args.warmup:g}s of warm-up\n")
+    print(f"{'users':>6}{'calls':>8}{'errors':>8}{'calls/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    steps = []
+    for concurrency in args.concurrency:
+        step = await run_step(args.url, args.tool, arguments, concurrency, args.warmup, args.duration)
+        steps.append(step)
+        print(
+            f"{concurrency:>6}{step['calls']:>8}{step['errors']:>8}{step['throughput']:>10.1f}"
+            f"{format_ms(step['p50_ms'])}{format_ms(step['p95_ms'])}{format_ms(step['p99_ms'])}"
+        )
+
+    if args.json_path:
+        report = {
+            "url": args.url,
+            "tool": args.tool,
+            "arguments": args.arguments,
+            "locations": args.locations,
+            "repeat": args.repeat,
+            "duration_seconds": args.duration,
+            "warmup_seconds": args.warmup,
+            "python": platform.python_version(),
+            "steps": steps,
+        }
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {args.json_path}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
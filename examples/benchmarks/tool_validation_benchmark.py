@@ -0,0 +1,96 @@
+"""Per-call cost of the MCP server's argument validation, before and after precompiling it.
+
+Times the date validation the hotel tool used to run on every call (compiling its regex,
+then `datetime.strptime`) against `parse_stay` from `shared/tool_validation.py`, and the
+amenity and hotel type lookups against their precomputed tables.
+
+    python examples/benchmarks/tool_validation_benchmark.py
+"""
+
+import argparse
+import re
+import sys
+import timeit
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from shared.hotel_inventory import HotelVocabulary  # noqa: E402
+from shared.tool_validation import parse_stay  # noqa: E402
+
+VOCABULARY = HotelVocabulary(
+    hotel_types=("Luxury", "Boutique", "Budget", "Business"),
+    amenities=("Free WiFi", "Pool", "Spa", "Gym", "Restaurant", "Bar", "Room Service", "Parking"),
+    neighborhoods=("Downtown",),
+    name_suffixes=("Hotel",),
+    price_ranges={},
+)
+
+
+def previous_validate_iso_date(date_str: str, param_name: str):
+    """The validation previously defined in mcp_server_basic.py."""
+    iso_pattern = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+    if not iso_pattern.match(date_str):
+        raise ValueError(f"{param_name} must be in ISO format (YYYY-MM-DD), got: {date_str}")
+    try:
+        return datetime.strptime(date_str, "%Y-%m-%d").date()
+    except ValueError as e:
+        raise ValueError(f"Invalid {param_name}: {e}")
+
+
+def previous_parse_stay(check_in: str, check_out: str):
+    check_in_date = previous_validate_iso_date(check_in, "check_in")
+    check_out_date = previous_validate_iso_date(check_out, "check_out")
+    if check_out_date <= check_in_date:
+        raise ValueError("check_out date must be after check_in date")
+    return check_in_date, check_out_date
+
+
+def previous_amenity_mask(amenities: list[str]) -> int:
+    """The amenity lookup before the precomputed table: a scan of every name for each amenity."""
+    mask = 0
+    for requested in amenities:
+        wanted = requested.strip().casefold()
+        matches = [bit for bit, name in enumerate(VOCABULARY.amenities) if wanted in name.casefold()]
+        exact = [bit for bit in matches if VOCABULARY.amenities[bit].casefold() == wanted]
+        mask |= 1 << (exact or matches)[0]
+    return mask
+
+
+def time_call(call, number: int) -> float:
+    """Return the best per-call time in microseconds over a few repeats."""
+    return min(timeit.repeat(call, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=20000, help="Calls per timing")
+    args = parser.parse_args()
+
+    assert previous_parse_stay("2026-03-01", "2026-03-04") == parse_stay("2026-03-01", "2026-03-04")
+    assert previous_amenity_mask(["Pool", "Spa"]) == VOCABULARY.amenity_mask(["Pool", "Spa"])
+    cases = [
+        (
+            "check_in/check_out dates",
+            lambda: previous_parse_stay("2026-03-01", "2026-03-04"),
+            lambda: parse_stay("2026-03-01", "2026-03-04"),
+        ),
+        (
+            "amenities (2 names)",
+            lambda: previous_amenity_mask(["Pool", "Spa"]),
+            lambda: VOCABULARY.amenity_mask(["Pool", "Spa"]),
+        ),
+        (
+            "hotel type",
+            lambda: VOCABULARY.hotel_types.index("Business"),
+            lambda: VOCABULARY.hotel_type_codes["Business"],
+        ),
+    ]
+    print(f"{'validation':<28}{'before us':>10}{'after us':>10}{'speedup':>10}")
+    for label, before, after in cases:
+        before_us, after_us = time_call(before, args.number), time_call(after, args.number)
+        print(f"{label:<28}{before_us:>10.2f}{after_us:>10.2f}{before_us / after_us:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
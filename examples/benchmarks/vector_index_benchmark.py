@@ -0,0 +1,97 @@
+"""Recall vs latency of the approximate (IVF) vector index against exact search.
+
+Runs queries against a `NumpyVectorStore` once with exact search and then through an
+IVF index at several `n_probe` values, and reports recall@k (the share of the exact
+top-k that the approximate search also returns) with the mean and p95 query latency.
+
+By default the store is filled with synthetic clustered vectors, so no model calls are
+needed; pass the persist directory of a cached LlamaIndex index (under
+`example_data/.llama_index_storage`) to benchmark on real embeddings instead, using
+perturbed copies of stored vectors as queries.
+
+    python examples/benchmarks/vector_index_benchmark.py --vectors 100000 --dim 1536
+    python examples/benchmarks/vector_index_benchmark.py --persist-dir example_data/.llama_index_storage/<name>
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from llama_index.core.schema import TextNode
+from llama_index.core.vector_stores.types import VectorStoreQuery
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from shared.ann_index import IVFIndex  # noqa: E402
+from shared.numpy_vector_store import NumpyVectorStore  # noqa: E402
+
+
+def synthetic_store(n_vectors: int, dim: int, n_topics: int, dtype: str, rng: np.random.Generator):
+    """Fill a store with vectors scattered around random topic directions, like document chunks."""
+    topics = rng.standard_normal((n_topics, dim)).astype(np.float32)
+    vectors = topics[rng.integers(n_topics, size=n_vectors)] + rng.standard_normal((n_vectors, dim)).astype(np.float32)
+    store = NumpyVectorStore(dtype=dtype)
+    store.add([TextNode(id_=str(i), embedding=vector.tolist()) for i, vector in enumerate(vectors)])
+    return store
+
+
+def make_queries(store: NumpyVectorStore, n_queries: int, rng: np.random.Generator) -> np.ndarray:
+    """Return perturbed copies of random stored vectors, so queries land near real data."""
+    rows = np.sort(rng.choice(store.row_count, size=n_queries, replace=False))
+    base = store.decoded(rows)
+    return base + 0.5 * rng.standard_normal(base.shape).astype(np.float32) / np.sqrt(base.shape[1])
+
+
+def run_queries(store: NumpyVectorStore, queries: np.ndarray, top_k: int) -> tuple[list[list[str]], np.ndarray]:
+    results, latencies = [], []
+    for query in queries:
+        start = time.perf_counter()
+        result = store.query(VectorStoreQuery(query_embedding=query.tolist(), similarity_top_k=top_k))
+        latencies.append(time.perf_counter() - start)
+        results.append(result.ids)
+    return results, np.array(latencies) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--persist-dir", type=Path, help="Benchmark the vectors of a persisted index")
+    parser.add_argument("--vectors", type=int, default=50000, help="Number of synthetic vectors")
+    parser.add_argument("--dim", type=int, default=768, help="Dimension of the synthetic vectors")
+    parser.add_argument("--topics", type=int, default=500, help="Number of clusters in the synthetic data")
+    parser.add_argument("--dtype", default="float32", choices=["float32", "float16", "int8"])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--lists", type=int, default=0, help="IVF lists, 0 for sqrt(number of vectors)")
+    parser.add_argument("--probes", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    if args.persist_dir:
+        store = NumpyVectorStore.from_persist_dir(args.persist_dir)
+    else:
+        print(f"Generating {args.vectors} synthetic {args.dim}-dimensional vectors...")
+        store = synthetic_store(args.vectors, args.dim, args.topics, args.dtype, rng)
+    queries = make_queries(store, min(args.queries, store.row_count), rng)
+
+    exact_ids, exact_ms = run_queries(store, queries, args.top_k)
+
+    ivf = IVFIndex(n_lists=args.lists)
+    start = time.perf_counter()
+    store.set_ann_index(ivf)
+    build_seconds = time.perf_counter() - start
+    print(f"{store.row_count} vectors, IVF with {len(ivf.centroids)} lists built in {build_seconds:.2f}s\n")
+
+    print(f"{'search':<14}{'recall@' + str(args.top_k):>10}{'mean ms':>10}{'p95 ms':>10}{'speedup':>10}")
+    print(f"{'exact':<14}{1.0:>10.3f}{exact_ms.mean():>10.2f}{np.percentile(exact_ms, 95):>10.2f}{1.0:>10.1f}")
+    for n_probe in args.probes:
+        ivf.n_probe = n_probe
+        ivf_ids, ivf_ms = run_queries(store, queries, args.top_k)
+        recall = np.mean([len(set(a) & set(e)) / len(e) for a, e in zip(ivf_ids, exact_ids)])
+        speedup = exact_ms.mean() / ivf_ms.mean()
+        label = f"ivf probe={n_probe}"
+        print(f"{label:<14}{recall:>10.3f}{ivf_ms.mean():>10.2f}{np.percentile(ivf_ms, 95):>10.2f}{speedup:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,37 +1,10 @@
-import os
-
-import azure.identity
 from dotenv import load_dotenv
 from langchain.agents import create_agent
-from langchain_openai import ChatOpenAI
 from rich import print
+from shared.model_clients import create_langchain_model
 
 load_dotenv(override=True)
-API_HOST = os.getenv("API_HOST", "azure")
-
-if API_HOST == "azure":
-    token_provider = azure.identity.get_bearer_token_provider(
-        azure.identity.DefaultAzureCredential(),
-        "https://cognitiveservices.azure.com/.default",
-    )
-    model = ChatOpenAI(
-        model=os.environ.get("AZURE_OPENAI_CHAT_DEPLOYMENT"),
-        base_url=os.environ["AZURE_OPENAI_ENDPOINT"] + "/openai/v1",
-        api_key=token_provider,
-        use_responses_api=True,
-    )
-elif API_HOST == "ollama":
-    model = ChatOpenAI(
-        model=os.environ.get("OLLAMA_MODEL", "gemma4:e4b"),
-        base_url=os.environ.get("OLLAMA_ENDPOINT", "http://localhost:11434/v1"),
-        api_key="none",
-        use_responses_api=True,
-    )
-else:
-    model = ChatOpenAI(
-        model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
-        use_responses_api=True,
-    )
+model = create_langchain_model()
 
 agent = create_agent(model=model, system_prompt="You're an informational agent. Answer questions cheerfully.", tools=[])
 
@@ -6,68 +6,48 @@ Prerequisite:
 """
 import asyncio
 import logging
-import os
 
-import azure.identity
 from dotenv import load_dotenv
 from langchain.agents import create_agent
 from langchain_core.messages import HumanMessage
 from langchain_mcp_adapters.client import MultiServerMCPClient
-from langchain_openai import ChatOpenAI
 from rich.logging import RichHandler
+from shared.mcp_tool_cache import get_cached_tools
+from shared.model_clients import close_clients, create_langchain_model
 
 logging.basicConfig(level=logging.WARNING, format="%(message)s", datefmt="[%X]", handlers=[RichHandler()])
 logger = logging.getLogger("lang_itinerary")
 
 load_dotenv(override=True)
-API_HOST = os.getenv("API_HOST", "azure")
-
-if API_HOST == "azure":
-    token_provider = azure.identity.get_bearer_token_provider(
-        azure.identity.DefaultAzureCredential(), "https://cognitiveservices.azure.com/.default"
-    )
-    model = ChatOpenAI(
-        model=os.environ.get("AZURE_OPENAI_CHAT_DEPLOYMENT"),
-        base_url=os.environ["AZURE_OPENAI_ENDPOINT"] + "/openai/v1",
-        api_key=token_provider,
-        use_responses_api=True,
-    )
-elif API_HOST == "ollama":
-    model = ChatOpenAI(
-        model=os.environ.get("OLLAMA_MODEL", "gemma4:e4b"),
-        base_url=os.environ.get("OLLAMA_ENDPOINT", "http://localhost:11434/v1"),
-        api_key="none",
-        use_responses_api=True,
-    )
-else:
-    model = ChatOpenAI(
-        model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
-        use_responses_api=True,
-    )
+model = create_langchain_model()
 
 
 async def run_agent():
-    client = MultiServerMCPClient(
-        {
-            "itinerary": {
-                # Make sure you start your itinerary server on port 8000
-                "url": "http://localhost:8000/mcp/",
-                "transport": "streamable_http",
+    try:
+        client = MultiServerMCPClient(
+            {
+                "itinerary": {
+                    # Make sure you start your itinerary server on port 8000
+                    "url": "http://localhost:8000/mcp/",
+                    "transport": "streamable_http",
+                }
             }
-        }
-    )
-
-    tools = await client.get_tools()
-    agent = create_agent(model, tools)
-
-    user_query = (
-        "Find me a hotel in San Francisco for 2 nights starting from 2026-01-01. "
-        "I need a hotel with free WiFi and a pool."
-    )
-
-    response = await agent.ainvoke({"messages": [HumanMessage(content=user_query)]})
-    final = response["messages"][-1].content
-    print(final)
+        )
+
+        # Tools saved by an earlier run, revalidated in the background (see shared/mcp_tool_cache.py)
+        tools = await get_cached_tools(client)
+        agent = create_agent(model, tools)
+
+        user_query = (
+            "Find me a hotel in San Francisco for 2 nights starting from 2026-01-01. "
+            "I need a hotel with free WiFi and a pool."
+        )
+
+        response = await agent.ainvoke({"messages": [HumanMessage(content=user_query)]})
+        final = response["messages"][-1].content
+        print(final)
+    finally:
+        await close_clients()
 
 
 def main():
@@ -6,46 +6,20 @@ adapted to this repo's multiple-provider model configuration.
 """
 from __future__ import annotations
 
-import os
 from dataclasses import dataclass
 
-import azure.identity
 from dotenv import load_dotenv
 from langchain.agents import create_agent
 from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import tool
-from langchain_openai import ChatOpenAI
-from langgraph.checkpoint.memory import InMemorySaver
 from langgraph.runtime import get_runtime
 from pydantic import BaseModel
 from rich import print
+from shared.model_clients import create_langchain_model
+from shared.sqlite_checkpointer import SQLiteCheckpointer, thread_id
 
 load_dotenv(override=True)
-API_HOST = os.getenv("API_HOST", "azure")
-
-if API_HOST == "azure":
-    token_provider = azure.identity.get_bearer_token_provider(
-        azure.identity.DefaultAzureCredential(),
-        "https://cognitiveservices.azure.com/.default",
-    )
-    model = ChatOpenAI(
-        model=os.environ.get("AZURE_OPENAI_CHAT_DEPLOYMENT"),
-        base_url=os.environ["AZURE_OPENAI_ENDPOINT"] + "/openai/v1",
-        api_key=token_provider,
-        use_responses_api=True,
-    )
-elif API_HOST == "ollama":
-    model = ChatOpenAI(
-        model=os.environ.get("OLLAMA_MODEL", "gemma4:e4b"),
-        base_url=os.environ.get("OLLAMA_ENDPOINT", "http://localhost:11434/v1"),
-        api_key="none",
-        use_responses_api=True,
-    )
-else:
-    model = ChatOpenAI(
-        model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
-        use_responses_api=True,
-    )
+model = create_langchain_model()
 
 
 system_prompt = """You are an expert weather forecaster, who speaks in puns.
@@ -90,7 +64,8 @@ class WeatherResponse(BaseModel):
     punny_response: str
 
 
-checkpointer = InMemorySaver()
+# Conversations are kept on disk between runs (see shared/sqlite_checkpointer.py)
+checkpointer = SQLiteCheckpointer.from_env()
 
 agent = create_agent(
     model=model,
@@ -102,20 +77,25 @@ agent = create_agent(
 
 
 def main():
-    config = {"configurable": {"thread_id": "1"}}
-    context = UserContext(user_id="1")
-
-    r1 = agent.invoke(
-        {"messages": [{"role": "user", "content": "what is the weather outside?"}]}, config=config, context=context
-    )
-    print(r1.get("structured_response"))
-
-    r2 = agent.invoke(
-        {"messages": [{"role": "user", "content": "Thanks"}]},
-        config=config,
-        context=context,
-    )
-    print(r2.get("structured_response"))
+    # A new conversation on every run, unless CHECKPOINT_THREAD names one to resume
+    config = {"configurable": {"thread_id": thread_id(__file__)}}
+    print(f"Thread: {config['configurable']['thread_id']}")
+    try:
+        context = UserContext(user_id="1")
+
+        r1 = agent.invoke(
+            {"messages": [{"role": "user", "content": "what is the weather outside?"}]}, config=config, context=context
+        )
+        print(r1.get("structured_response"))
+
+        r2 = agent.invoke(
+            {"messages": [{"role": "user", "content": "Thanks"}]},
+            config=config,
+            context=context,
+        )
+        print(r2.get("structured_response"))
+    finally:
+        checkpointer.close()
 
 
 if __name__ == "__main__":
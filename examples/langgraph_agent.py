@@ -1,35 +1,16 @@
-import os
+import asyncio
 
-import azure.identity
 from dotenv import load_dotenv
 from langchain_core.messages import HumanMessage
 from langchain_core.tools import tool
-from langchain_openai import ChatOpenAI
-from langgraph.checkpoint.memory import MemorySaver
 from langgraph.graph import END, START, MessagesState, StateGraph
 from langgraph.prebuilt import ToolNode
+from shared.model_clients import close_clients, create_langchain_model
+from shared.sqlite_checkpointer import SQLiteCheckpointer, thread_id
 
 # Setup the client to use Azure OpenAI
 load_dotenv(override=True)
-API_HOST = os.getenv("API_HOST", "azure")
-
-if API_HOST == "azure":
-    token_provider = azure.identity.get_bearer_token_provider(
-        azure.identity.DefaultAzureCredential(), "https://cognitiveservices.azure.com/.default"
-    )
-    model = ChatOpenAI(
-        model=os.environ.get("AZURE_OPENAI_CHAT_DEPLOYMENT"),
-        base_url=os.environ["AZURE_OPENAI_ENDPOINT"] + "/openai/v1",
-        api_key=token_provider,
-        use_responses_api=True,
-    )
-elif API_HOST == "ollama":
-    model = ChatOpenAI(
-        model=os.environ["OLLAMA_MODEL"],
-        base_url=os.environ.get("OLLAMA_ENDPOINT", "http://localhost:11434/v1"),
-        api_key="none",
-        use_responses_api=True,
-    )
+model = create_langchain_model()
 
 
 @tool
@@ -64,9 +45,9 @@ def should_continue(state):
 
 
 # Define the function that calls the model
-def call_model(state):
+async def call_model(state):
     messages = state["messages"]
-    response = model.invoke(messages)
+    response = await model.ainvoke(messages)
     # We return a list, because this will get added to the existing list
     return {"messages": [response]}
 
@@ -107,8 +88,8 @@ workflow.add_conditional_edges(
 # This means that after `tools` is called, `agent` node is called next.
 workflow.add_edge("action", "agent")
 
-# Set up memory
-memory = MemorySaver()
+# Set up memory, kept on disk between runs (see shared/sqlite_checkpointer.py)
+memory = SQLiteCheckpointer.from_env()
 
 # Finally, we compile it!
 # This compiles it into a LangChain Runnable,
@@ -118,7 +99,20 @@ memory = MemorySaver()
 # This will add a breakpoint before the `action` node is called
 app = workflow.compile(checkpointer=memory)
 
-config = {"configurable": {"thread_id": "1"}}
+# A new conversation on every run, unless CHECKPOINT_THREAD names one to resume
+config = {"configurable": {"thread_id": thread_id(__file__)}}
 input_message = HumanMessage(content="Can you play Taylor Swift's most popular song?")
-for event in app.stream({"messages": [input_message]}, config, stream_mode="values"):
-    event["messages"][-1].pretty_print()
+
+
+async def main():
+    print(f"Thread: {config['configurable']['thread_id']}")
+    try:
+        async for event in app.astream({"messages": [input_message]}, config, stream_mode="values"):
+            event["messages"][-1].pretty_print()
+    finally:
+        await close_clients()
+        memory.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
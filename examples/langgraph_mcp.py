@@ -5,64 +5,58 @@ Start the local MCP server defined in `mcp_server_basic.py` on port 8000:
     python examples/mcp_server_basic.py
 """
 
-import os
-
-import azure.identity
 from dotenv import load_dotenv
 from langchain_mcp_adapters.client import MultiServerMCPClient
-from langchain_openai import ChatOpenAI
 from langgraph.graph import START, MessagesState, StateGraph
 from langgraph.prebuilt import ToolNode, tools_condition
+from shared.graph_rendering import render_graph
+from shared.mcp_tool_cache import get_cached_tools, openai_tool_definitions
+from shared.model_clients import close_clients, create_langchain_model
 
 # Setup the client to use Azure OpenAI
 load_dotenv(override=True)
-API_HOST = os.getenv("API_HOST", "azure")
-
-if API_HOST == "azure":
-    token_provider = azure.identity.get_bearer_token_provider(
-        azure.identity.DefaultAzureCredential(), "https://cognitiveservices.azure.com/.default"
-    )
-    model = ChatOpenAI(
-        model=os.environ.get("AZURE_OPENAI_CHAT_DEPLOYMENT"),
-        base_url=os.environ["AZURE_OPENAI_ENDPOINT"] + "/openai/v1",
-        api_key=token_provider,
-        use_responses_api=True,
-    )
+model = create_langchain_model()
 
 
 async def setup_agent():
-    client = MultiServerMCPClient(
-        {
-            "weather": {
-                # make sure you start your weather server on port 8000
-                "url": "http://localhost:8000/mcp/",
-                "transport": "streamable_http",
+    try:
+        client = MultiServerMCPClient(
+            {
+                "weather": {
+                    # make sure you start your weather server on port 8000
+                    "url": "http://localhost:8000/mcp/",
+                    "transport": "streamable_http",
+                }
             }
-        }
-    )
-    tools = await client.get_tools()
+        )
+        # Tools saved by an earlier run, revalidated in the background (see shared/mcp_tool_cache.py)
+        tools = await get_cached_tools(client)
+
+        # Convert the tool schemas and bind them once, instead of on every model call
+        model_with_tools = model.bind_tools(openai_tool_definitions(tools))
 
-    def call_model(state: MessagesState):
-        response = model.bind_tools(tools).invoke(state["messages"])
-        return {"messages": response}
+        async def call_model(state: MessagesState):
+            response = await model_with_tools.ainvoke(state["messages"])
+            return {"messages": response}
 
-    builder = StateGraph(MessagesState)
-    builder.add_node(call_model)
-    builder.add_node(ToolNode(tools))
-    builder.add_edge(START, "call_model")
-    builder.add_conditional_edges(
-        "call_model",
-        tools_condition,
-    )
-    builder.add_edge("tools", "call_model")
-    graph = builder.compile()
-    hotel_response = await graph.ainvoke(
-        {"messages": "Find a hotel in SF for 2 nights starting from 2024-01-01. I need free WiFi and pool."}
-    )
-    print(hotel_response["messages"][-1].content)
-    image_bytes = graph.get_graph().draw_mermaid_png()
-    with open("examples/images/langgraph_mcp_http_graph.png", "wb") as f:
-        f.write(image_bytes)
+        builder = StateGraph(MessagesState)
+        builder.add_node(call_model)
+        builder.add_node(ToolNode(tools))
+        builder.add_edge(START, "call_model")
+        builder.add_conditional_edges(
+            "call_model",
+            tools_condition,
+        )
+        builder.add_edge("tools", "call_model")
+        graph = builder.compile()
+        hotel_response = await graph.ainvoke(
+            {"messages": "Find a hotel in SF for 2 nights starting from 2024-01-01. I need free WiFi and pool."}
+        )
+        print(hotel_response["messages"][-1].content)
+        # Only with RENDER_GRAPH=true, and only when the graph changed (see shared/graph_rendering.py)
+        render_graph(graph, "langgraph_mcp_http_graph.png")
+    finally:
+        await close_clients()
 
 
 if __name__ == "__main__":
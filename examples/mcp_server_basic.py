@@ -1,18 +1,55 @@
-import random
-import re
-from dataclasses import dataclass
-from datetime import datetime
-from typing import Annotated
-
-from faker import Faker
-from mcp.server.fastmcp import FastMCP
+import asyncio
+import json
+from dataclasses import asdict, dataclass
+from typing import Annotated, Literal
+
+import numpy as np
+from dotenv import load_dotenv
+from mcp.server.fastmcp import Context, FastMCP
 from pydantic import Field
+from shared.hotel_inventory import TABLE_COLUMNS, CityHotels, HotelInventory, HotelVocabulary
+from shared.mcp_serving import add_readiness_route, run_server, server_settings
+from shared.tool_cache import memoize_tool
+from shared.tool_pagination import decode_cursor, encode_cursor, search_key
+from shared.tool_validation import parse_stay
 
-app = FastMCP()
-fake = Faker()
+load_dotenv(override=True)
 
+# Host, port and stateless mode come from environment variables (see shared/mcp_serving.py)
+app = FastMCP(**server_settings())
+add_readiness_route(app)
 
-@dataclass
+# Labels for the mock hotel data
+HOTEL_VOCABULARY = HotelVocabulary(
+    hotel_types=("Luxury", "Boutique", "Budget", "Business"),
+    amenities=("Free WiFi", "Pool", "Spa", "Gym", "Restaurant", "Bar", "Room Service", "Parking"),
+    neighborhoods=(
+        "Downtown",
+        "Historic District",
+        "Waterfront",
+        "Business District",
+        "Arts District",
+        "University Area",
+    ),
+    name_suffixes=("Hotel", "Inn", "Suites", "Resort", "Plaza"),
+    price_ranges={
+        "Luxury": (250, 600),
+        "Boutique": (180, 350),
+        "Budget": (80, 150),
+        "Resort": (200, 500),
+        "Business": (150, 300),
+    },
+)
+# Generate the mock hotels once at startup, instead of on every call
+inventory = HotelInventory.from_env(HOTEL_VOCABULARY)
+DEFAULT_LIMIT = 5
+MAX_LIMIT = 50
+MAX_STOPS = 20
+# Hotels per progress notification when streaming
+STREAM_CHUNK_SIZE = 5
+
+
+@dataclass(slots=True)
 class Hotel:
     name: str
     address: str
@@ -24,106 +61,204 @@ class Hotel:
     available_rooms: int
 
 
+@dataclass(slots=True)
+class HotelTable:
+    """Hotels in compact form: one row per hotel, with its values in the order of `columns`."""
+
+    city: str
+    columns: list[str]
+    rows: list[list[str | float | int | list[int]]]
+    # The amenities column holds positions in this list
+    amenity_codes: list[str]
+
+
 @dataclass
 class HotelSuggestions:
     hotels: list[Hotel]
+    # Number of hotels matching the filters, across all pages
+    total: int
+    # Pass as `cursor` to get the next page; left out on the last page
+    next_cursor: str | None = None
+    # The hotels in the compact format, which leaves `hotels` empty
+    table: HotelTable | None = None
 
 
-def validate_iso_date(date_str: str, param_name: str):
-    """
-    Validates that a string is in ISO format (YYYY-MM-DD) and returns the parsed date.
+@dataclass
+class ItineraryStop:
+    location: Annotated[str, Field(description="Location (city or area) to search for hotels")]
+    check_in: Annotated[str, Field(description="Check-in date in ISO format (YYYY-MM-DD)")]
+    check_out: Annotated[str, Field(description="Check-out date in ISO format (YYYY-MM-DD)")]
 
-    Args:
-        date_str: The date string to validate
-        param_name: Name of the parameter for error messages
 
-    Returns:
-        The parsed date object
+@dataclass
+class StopSuggestions:
+    location: str
+    check_in: str
+    check_out: str
+    hotels: list[Hotel]
+    # Why this stop has no suggestions, such as invalid dates
+    error: str | None = None
+    # The hotels in the compact format, which leaves `hotels` empty
+    table: HotelTable | None = None
+
+
+@dataclass
+class ItinerarySuggestions:
+    stops: list[StopSuggestions]
 
-    Raises:
-        ValueError: If the date is not in ISO format or is invalid
-    """
-    iso_pattern = re.compile(r"^\d{4}-\d{2}-\d{2}$")
-    if not iso_pattern.match(date_str):
-        raise ValueError(f"{param_name} must be in ISO format (YYYY-MM-DD), got: {date_str}")
 
-    try:
-        return datetime.strptime(date_str, "%Y-%m-%d").date()
-    except ValueError as e:
-        raise ValueError(f"Invalid {param_name}: {e}")
+# Filters shared by the hotel tools
+Amenities = Annotated[
+    list[str] | None,
+    Field(description=f"Amenities the hotel must have, any of: {', '.join(HOTEL_VOCABULARY.amenities)}"),
+]
+MaxPrice = Annotated[float | None, Field(gt=0, description="Maximum price per night")]
+MinRating = Annotated[float | None, Field(ge=0, le=5, description="Minimum rating, from 0 to 5")]
+HotelType = Annotated[Literal[HOTEL_VOCABULARY.hotel_types] | None, Field(description="Type of hotel")]
+Limit = Annotated[int, Field(ge=1, le=MAX_LIMIT, description="Maximum number of hotels to return")]
+Stream = Annotated[
+    bool,
+    Field(description="Also send the results in progress notifications as soon as each part is ready"),
+]
+OutputFormat = Annotated[
+    Literal["full", "compact"],
+    Field(description="'compact' returns a table of rows with amenity codes, several times shorter than 'full'"),
+]
+
+
+def match_hotels(
+    location: str,
+    amenity_mask: int,
+    max_price: float | None,
+    min_rating: float | None,
+    hotel_type: str | None,
+) -> tuple[CityHotels, np.ndarray]:
+    """Return the city's hotels, and the rows matching the filters in the precomputed inventory, best rated first."""
+    city_hotels = inventory.city(location)
+    rows = city_hotels.query(
+        amenity_mask=amenity_mask,
+        max_price=max_price,
+        min_rating=min_rating,
+        hotel_type=HOTEL_VOCABULARY.hotel_type_codes[hotel_type] if hotel_type is not None else None,
+    )
+    return city_hotels, rows
+
+
+def to_hotels(city_hotels: CityHotels, rows: np.ndarray) -> list[Hotel]:
+    return [Hotel(**record) for record in inventory.records(city_hotels, rows)]
+
+
+def to_table(city_hotels: CityHotels, rows: np.ndarray) -> HotelTable:
+    """Return the hotels in `rows` in the compact format."""
+    return HotelTable(
+        city=city_hotels.city,
+        columns=list(TABLE_COLUMNS),
+        rows=inventory.table_rows(city_hotels, rows),
+        amenity_codes=list(HOTEL_VOCABULARY.amenities),
+    )
 
 
 @app.tool()
+@memoize_tool(bypass_when="stream")
 async def suggest_hotels(
     location: Annotated[str, Field(description="Location (city or area) to search for hotels")],
     check_in: Annotated[str, Field(description="Check-in date in ISO format (YYYY-MM-DD)")],
     check_out: Annotated[str, Field(description="Check-out date in ISO format (YYYY-MM-DD)")],
+    ctx: Context,
+    amenities: Amenities = None,
+    max_price: MaxPrice = None,
+    min_rating: MinRating = None,
+    hotel_type: HotelType = None,
+    limit: Limit = DEFAULT_LIMIT,
+    cursor: Annotated[str | None, Field(description="next_cursor of the previous page, to get the next one")] = None,
+    stream: Stream = False,
+    output_format: OutputFormat = "full",
 ) -> HotelSuggestions:
     """
-    Suggest hotels based on location and dates.
+    Suggest hotels based on location and dates, best rated first, one page of `limit` hotels at a time.
+    Filter by amenities, price, rating and hotel type here rather than on the results.
     """
-    # Validate dates
-    check_in_date = validate_iso_date(check_in, "check_in")
-    check_out_date = validate_iso_date(check_out, "check_out")
-
-    # Ensure check_out is after check_in
-    if check_out_date <= check_in_date:
-        raise ValueError("check_out date must be after check_in date")
-
-    # Create realistic mock data for hotels
-    hotel_types = ["Luxury", "Boutique", "Budget", "Business"]
-    amenities = ["Free WiFi", "Pool", "Spa", "Gym", "Restaurant", "Bar", "Room Service", "Parking"]
-
-    # Generate a rating between 3.0 and 5.0
-    def generate_rating():
-        return round(random.uniform(3.0, 5.0), 1)
-
-    # Generate a price based on hotel type
-    def generate_price(hotel_type):
-        price_ranges = {
-            "Luxury": (250, 600),
-            "Boutique": (180, 350),
-            "Budget": (80, 150),
-            "Resort": (200, 500),
-            "Business": (150, 300),
-        }
-        min_price, max_price = price_ranges.get(hotel_type, (100, 300))
-        return round(random.uniform(min_price, max_price))
-
-    # Generate between 3 and 8 hotels
-    num_hotels = random.randint(3, 8)
-    hotels = []
-
-    neighborhoods = [
-        "Downtown",
-        "Historic District",
-        "Waterfront",
-        "Business District",
-        "Arts District",
-        "University Area",
-    ]
-
-    for i in range(num_hotels):
-        hotel_type = random.choice(hotel_types)
-        hotel_amenities = random.sample(amenities, random.randint(3, 6))
-        neighborhood = random.choice(neighborhoods)
-
-        hotel = Hotel(
-            name=f"{hotel_type} {['Hotel', 'Inn', 'Suites', 'Resort', 'Plaza'][random.randint(0, 4)]}",
-            address=fake.street_address(),
-            location=f"{neighborhood}, {location}",
-            rating=generate_rating(),
-            price_per_night=generate_price(hotel_type),
-            hotel_type=hotel_type,
-            amenities=hotel_amenities,
-            available_rooms=random.randint(1, 15),
-        )
-        hotels.append(hotel)
-
-    # Sort by rating to show best hotels first
-    hotels.sort(key=lambda x: x.rating, reverse=True)
-    return HotelSuggestions(hotels=hotels)
+    # Validate dates, and ensure check_out is after check_in
+    parse_stay(check_in, check_out)
+
+    amenity_mask = HOTEL_VOCABULARY.amenity_mask(amenities or [])
+    key = search_key(
+        location=location, amenity_mask=amenity_mask, max_price=max_price, min_rating=min_rating, hotel_type=hotel_type
+    )
+    offset = decode_cursor(cursor, key)
+    # In a worker thread, so a city generated on first use doesn't block the server
+    city_hotels, rows = await asyncio.to_thread(match_hotels, location, amenity_mask, max_price, min_rating, hotel_type)
+    page = rows[offset : offset + limit]
+    table = None
+    if output_format == "compact":
+        # The compact table is built at once; streaming sends its rows in chunks
+        hotels, table = [], to_table(city_hotels, page)
+        if stream:
+            for start in range(0, len(page), STREAM_CHUNK_SIZE):
+                table_rows = table.rows[start : start + STREAM_CHUNK_SIZE]
+                await ctx.report_progress(start + len(table_rows), len(page), json.dumps({"rows": table_rows}))
+    elif stream:
+        # Send the best rated hotels first, while the rest of the page is being built
+        hotels = []
+        for start in range(0, len(page), STREAM_CHUNK_SIZE):
+            chunk = to_hotels(city_hotels, page[start : start + STREAM_CHUNK_SIZE])
+            hotels += chunk
+            await ctx.report_progress(len(hotels), len(page), json.dumps({"hotels": [asdict(h) for h in chunk]}))
+    else:
+        hotels = to_hotels(city_hotels, page)
+    next_offset = offset + len(page)
+    next_cursor = encode_cursor(next_offset, key) if next_offset < len(rows) else None
+    return HotelSuggestions(hotels=hotels, total=len(rows), next_cursor=next_cursor, table=table)
+
+
+@app.tool()
+@memoize_tool(bypass_when="stream")
+async def suggest_hotels_batch(
+    stops: Annotated[
+        list[ItineraryStop],
+        Field(min_length=1, max_length=MAX_STOPS, description="Stops of the itinerary, each with its own dates"),
+    ],
+    ctx: Context,
+    amenities: Amenities = None,
+    max_price: MaxPrice = None,
+    min_rating: MinRating = None,
+    hotel_type: HotelType = None,
+    limit: Limit = DEFAULT_LIMIT,
+    stream: Stream = False,
+    output_format: OutputFormat = "full",
+) -> ItinerarySuggestions:
+    """
+    Suggest hotels for every stop of a multi-city trip in one call, best rated first.
+    The filters apply to every stop. Prefer this over calling suggest_hotels once per city.
+    """
+    amenity_mask = HOTEL_VOCABULARY.amenity_mask(amenities or [])
+    stops_done = 0
+
+    def suggest_for_stop(stop: ItineraryStop) -> StopSuggestions:
+        try:
+            parse_stay(stop.check_in, stop.check_out)
+        except ValueError as e:
+            # A stop with invalid dates doesn't fail the other stops
+            return StopSuggestions(stop.location, stop.check_in, stop.check_out, hotels=[], error=str(e))
+        city_hotels, rows = match_hotels(stop.location, amenity_mask, max_price, min_rating, hotel_type)
+        if output_format == "compact":
+            table = to_table(city_hotels, rows[:limit])
+            return StopSuggestions(stop.location, stop.check_in, stop.check_out, hotels=[], table=table)
+        hotels = to_hotels(city_hotels, rows[:limit])
+        return StopSuggestions(stop.location, stop.check_in, stop.check_out, hotels=hotels)
+
+    async def search_stop(stop: ItineraryStop) -> StopSuggestions:
+        nonlocal stops_done
+        # Search in a worker thread, so a city generated on first use doesn't block the server
+        result = await asyncio.to_thread(suggest_for_stop, stop)
+        stops_done += 1
+        if stream:
+            await ctx.report_progress(stops_done, len(stops), json.dumps(asdict(result)))
+        return result
+
+    results = await asyncio.gather(*(search_stop(stop) for stop in stops))
+    return ItinerarySuggestions(stops=list(results))
 
 
 if __name__ == "__main__":
-    app.run(transport="streamable-http")
+    run_server(app, __file__)
@@ -7,14 +7,12 @@ Start the local MCP server defined in `mcp_server_basic.py` on port 8000:
 
 import asyncio
 import logging
-import os
 
-from agents import Agent, OpenAIResponsesModel, Runner, set_tracing_disabled
+from agents import Agent, Runner, set_tracing_disabled
 from agents.mcp.server import MCPServerStreamableHttp
 from agents.model_settings import ModelSettings
-from azure.identity.aio import DefaultAzureCredential, get_bearer_token_provider
 from dotenv import load_dotenv
-from openai import AsyncOpenAI
+from shared.model_clients import close_clients, create_openai_agents_model
 
 logging.basicConfig(level=logging.WARNING)
 # Disable tracing since we're not connected to a supported tracing provider
@@ -22,23 +20,7 @@ set_tracing_disabled(disabled=True)
 
 # Setup the OpenAI client to use either Azure OpenAI
 load_dotenv(override=True)
-API_HOST = os.getenv("API_HOST", "azure")
-
-async_credential = None
-if API_HOST == "azure":
-    async_credential = DefaultAzureCredential()
-    token_provider = get_bearer_token_provider(async_credential, "https://cognitiveservices.azure.com/.default")
-    client = AsyncOpenAI(
-        base_url=os.environ["AZURE_OPENAI_ENDPOINT"] + "/openai/v1",
-        api_key=token_provider,
-    )
-    MODEL_NAME = os.environ["AZURE_OPENAI_CHAT_DEPLOYMENT"]
-elif API_HOST == "ollama":
-    client = AsyncOpenAI(base_url=os.environ.get("OLLAMA_ENDPOINT", "http://localhost:11434/v1"), api_key="none")
-    MODEL_NAME = os.environ["OLLAMA_MODEL"]
-else:
-    client = AsyncOpenAI(api_key=os.environ["OPENAI_API_KEY"])
-    MODEL_NAME = os.environ.get("OPENAI_MODEL", "gpt-4o")
+model = create_openai_agents_model()
 
 
 mcp_server = MCPServerStreamableHttp(name="weather", params={"url": "http://localhost:8000/mcp/"})
@@ -47,7 +29,7 @@ agent = Agent(
     name="Assistant",
     instructions="Use the tools to achieve the task",
     mcp_servers=[mcp_server],
-    model=OpenAIResponsesModel(model=MODEL_NAME, openai_client=client),
+    model=model,
     model_settings=ModelSettings(tool_choice="required"),
 )
 
@@ -60,8 +42,7 @@ async def main():
 
     await mcp_server.cleanup()
 
-    if async_credential:
-        await async_credential.close()
+    await close_clients()
 
 
 if __name__ == "__main__":
@@ -1,14 +1,12 @@
 import asyncio
 import logging
-import os
 import random
 from datetime import datetime
 
-from agents import Agent, OpenAIResponsesModel, Runner, function_tool, set_tracing_disabled
-from azure.identity.aio import DefaultAzureCredential, get_bearer_token_provider
+from agents import Agent, Runner, function_tool, set_tracing_disabled
 from dotenv import load_dotenv
-from openai import AsyncOpenAI
 from rich.logging import RichHandler
+from shared.model_clients import close_clients, create_openai_agents_model
 
 # Setup logging with rich
 logging.basicConfig(level=logging.WARNING, format="%(message)s", datefmt="[%X]", handlers=[RichHandler()])
@@ -19,23 +17,7 @@ set_tracing_disabled(disabled=True)
 
 # Setup the OpenAI client to use either Azure OpenAI
 load_dotenv(override=True)
-API_HOST = os.getenv("API_HOST", "azure")
-
-async_credential = None
-if API_HOST == "azure":
-    async_credential = DefaultAzureCredential()
-    token_provider = get_bearer_token_provider(async_credential, "https://cognitiveservices.azure.com/.default")
-    client = AsyncOpenAI(
-        base_url=os.environ["AZURE_OPENAI_ENDPOINT"] + "/openai/v1",
-        api_key=token_provider,
-    )
-    MODEL_NAME = os.environ["AZURE_OPENAI_CHAT_DEPLOYMENT"]
-elif API_HOST == "ollama":
-    client = AsyncOpenAI(base_url=os.environ.get("OLLAMA_ENDPOINT", "http://localhost:11434/v1"), api_key="none")
-    MODEL_NAME = os.environ["OLLAMA_MODEL"]
-else:
-    client = AsyncOpenAI(api_key=os.environ["OPENAI_API_KEY"])
-    MODEL_NAME = os.environ.get("OPENAI_MODEL", "gpt-4o")
+model = create_openai_agents_model()
 
 
 @function_tool
@@ -80,7 +62,7 @@ agent = Agent(
         "Include the date of the weekend in your response."
     ),
     tools=[get_weather, get_activities, get_current_date],
-    model=OpenAIResponsesModel(model=MODEL_NAME, openai_client=client),
+    model=model,
 )
 
 
@@ -88,8 +70,7 @@ async def main():
     result = await Runner.run(agent, input="hii what can I do this weekend in Seattle?")
     print(result.final_output)
 
-    if async_credential:
-        await async_credential.close()
+    await close_clients()
 
 
 if __name__ == "__main__":
@@ -1,43 +1,23 @@
 from __future__ import annotations as _annotations
 
 import asyncio
-import os
 from dataclasses import dataclass, field
 
-from azure.identity.aio import DefaultAzureCredential, get_bearer_token_provider
 from dotenv import load_dotenv
 from groq import BaseModel
-from openai import AsyncOpenAI
 from pydantic_ai import Agent, format_as_xml
 from pydantic_ai.messages import ModelMessage
-from pydantic_ai.models.openai import OpenAIChatModel
-from pydantic_ai.providers.openai import OpenAIProvider
 from pydantic_graph import (
     BaseNode,
     End,
     Graph,
     GraphRunContext,
 )
+from shared.model_clients import close_clients, create_pydantic_ai_model
 
 # Setup the OpenAI client to use Azure OpenAI
 load_dotenv(override=True)
-API_HOST = os.getenv("API_HOST", "azure")
-
-async_credential = None
-if API_HOST == "azure":
-    async_credential = DefaultAzureCredential()
-    token_provider = get_bearer_token_provider(async_credential, "https://cognitiveservices.azure.com/.default")
-    client = AsyncOpenAI(
-        base_url=os.environ["AZURE_OPENAI_ENDPOINT"] + "/openai/v1",
-        api_key=token_provider,
-    )
-    model = OpenAIChatModel(os.environ["AZURE_OPENAI_CHAT_DEPLOYMENT"], provider=OpenAIProvider(openai_client=client))
-elif API_HOST == "ollama":
-    client = AsyncOpenAI(base_url=os.environ.get("OLLAMA_ENDPOINT", "http://localhost:11434/v1"), api_key="none")
-    model = OpenAIChatModel(os.environ["OLLAMA_MODEL"], provider=OpenAIProvider(openai_client=client))
-else:
-    client = AsyncOpenAI(api_key=os.environ["OPENAI_API_KEY"])
-    model = OpenAIChatModel(os.environ.get("OPENAI_MODEL", "gpt-4o"), provider=OpenAIProvider(openai_client=client))
+model = create_pydantic_ai_model()
 
 """
 Agent definitions
@@ -131,8 +111,7 @@ async def main():
     end = await question_graph.run(node, state=state)
     print("END:", end.output)
 
-    if async_credential:
-        await async_credential.close()
+    await close_clients()
 
 
 if __name__ == "__main__":
@@ -0,0 +1 @@
+"""Helpers shared by the example scripts in this directory."""
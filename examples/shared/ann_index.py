@@ -0,0 +1,157 @@
+"""Approximate nearest-neighbour (ANN) indexes for `NumpyVectorStore`.
+
+Exact search scores every stored vector, so query time grows linearly with the number
+of chunks. An ANN index narrows a query down to a set of candidate rows, and the store
+then scores only those rows exactly. Indexes are registered by name in `ANN_INDEXES`,
+so a different structure can be plugged in without touching the store.
+
+`IVFIndex` is an inverted file index: the vectors are clustered with spherical k-means,
+each row is assigned to its nearest centroid, and a query only scans the rows of the
+`n_probe` clusters whose centroids are closest to it.
+
+Configuration comes from environment variables:
+
+    IVF_LISTS                          Number of clusters, 0 to use sqrt(number of vectors) (default 0)
+    IVF_PROBES                         Clusters scanned per query (default 8)
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Protocol
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .numpy_vector_store import NumpyVectorStore
+
+logger = logging.getLogger(__name__)
+
+KMEANS_ITERATIONS = 10
+# Train the centroids on at most this many vectors per cluster
+KMEANS_SAMPLES_PER_LIST = 64
+
+
+class AnnIndex(Protocol):
+    """What `NumpyVectorStore` needs from an ANN index. Rows are positions in the store's matrix."""
+
+    name: str
+
+    def build(self, store: NumpyVectorStore) -> None: ...
+
+    def add(self, vectors: np.ndarray) -> None: ...
+
+    def keep(self, keep: np.ndarray) -> None: ...
+
+    def candidates(self, query: np.ndarray) -> np.ndarray | None: ...
+
+    def save(self, path: Path) -> None: ...
+
+    def load(self, path: Path, store: NumpyVectorStore) -> bool: ...
+
+
+class IVFIndex:
+    """Inverted file index over the rows of a `NumpyVectorStore`."""
+
+    name = "ivf"
+
+    @classmethod
+    def from_env(cls) -> IVFIndex:
+        return cls(n_lists=int(os.getenv("IVF_LISTS", "0")), n_probe=int(os.getenv("IVF_PROBES", "8")))
+
+    def __init__(self, n_lists: int = 0, n_probe: int = 8, seed: int = 0):
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.seed = seed
+        self.centroids: np.ndarray | None = None
+        self.assignments = np.empty(0, dtype=np.int32)
+        self._lists: list[np.ndarray] | None = None
+
+    def build(self, store: NumpyVectorStore) -> None:
+        """Cluster the vectors in `store` and assign every row to a list."""
+        n_rows = store.row_count
+        if n_rows == 0:
+            self.centroids, self.assignments, self._lists = None, np.empty(0, dtype=np.int32), None
+            return
+        n_lists = min(self.n_lists or max(1, round(math.sqrt(n_rows))), n_rows)
+        rng = np.random.default_rng(self.seed)
+        sample_rows = np.sort(rng.choice(n_rows, size=min(n_rows, n_lists * KMEANS_SAMPLES_PER_LIST), replace=False))
+        self.centroids = _spherical_kmeans(store.decoded(sample_rows), n_lists, rng)
+        self.assignments = np.concatenate([self._assign(block) for block in store.iter_decoded()])
+        self._lists = None
+        logger.info("Built IVF index with %d lists over %d vectors", n_lists, n_rows)
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        return np.argmax(vectors @ self.centroids.T, axis=1).astype(np.int32)
+
+    def add(self, vectors: np.ndarray) -> None:
+        """Assign newly added (normalised, float32) vectors to their nearest existing list."""
+        if self.centroids is not None:
+            self.assignments = np.concatenate([self.assignments, self._assign(vectors)])
+            self._lists = None
+
+    def keep(self, keep: np.ndarray) -> None:
+        """Drop the rows that the store removed, keeping the assignments aligned with its matrix."""
+        if self.centroids is not None:
+            self.assignments = self.assignments[keep]
+            self._lists = None
+
+    def candidates(self, query: np.ndarray) -> np.ndarray | None:
+        """Return the rows in the `n_probe` lists closest to `query`, or None to search every row."""
+        if self.centroids is None:
+            return None
+        if self._lists is None:
+            order = np.argsort(self.assignments, kind="stable")
+            bounds = np.searchsorted(self.assignments[order], np.arange(len(self.centroids) + 1))
+            self._lists = [order[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+        n_probe = min(self.n_probe, len(self.centroids))
+        probes = np.argpartition(-(self.centroids @ query), n_probe - 1)[:n_probe]
+        return np.sort(np.concatenate([self._lists[probe] for probe in probes]))
+
+    def save(self, path: Path) -> None:
+        tmp_path = path.with_suffix(".tmp.npz")
+        np.savez(tmp_path, centroids=self.centroids, assignments=self.assignments, n_lists=self.n_lists)
+        os.replace(tmp_path, path)
+
+    def load(self, path: Path, store: NumpyVectorStore) -> bool:
+        """Load a saved index, returning False if it is missing or does not match `store`."""
+        try:
+            with np.load(path) as data:
+                centroids, assignments, n_lists = data["centroids"], data["assignments"], int(data["n_lists"])
+        except (FileNotFoundError, KeyError, ValueError):
+            return False
+        if len(assignments) != store.row_count or n_lists != self.n_lists:
+            return False
+        self.centroids, self.assignments, self._lists = centroids, assignments, None
+        return True
+
+
+def _spherical_kmeans(vectors: np.ndarray, n_lists: int, rng: np.random.Generator) -> np.ndarray:
+    """Cluster unit vectors by cosine similarity, returning unit-length centroids."""
+    centroids = vectors[rng.choice(len(vectors), size=n_lists, replace=False)].copy()
+    for _ in range(KMEANS_ITERATIONS):
+        labels = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, vectors)
+        norms = np.linalg.norm(sums, axis=1)
+        empty = norms == 0
+        # Re-seed empty clusters with random vectors so every list stays in use
+        sums[empty] = vectors[rng.choice(len(vectors), size=int(empty.sum()))]
+        centroids = sums / np.linalg.norm(sums, axis=1, keepdims=True)
+    return centroids.astype(np.float32)
+
+
+# Every registered index class provides a `from_env()` constructor
+ANN_INDEXES: dict[str, type] = {"ivf": IVFIndex}
+
+
+def create_ann_index(name: str) -> AnnIndex | None:
+    """Return a new, unbuilt ANN index called `name` configured from the environment, or None for exact search."""
+    if name == "exact":
+        return None
+    if name not in ANN_INDEXES:
+        raise ValueError(f"Unknown vector index {name!r}, expected 'exact' or one of {sorted(ANN_INDEXES)}")
+    return ANN_INDEXES[name].from_env()
@@ -0,0 +1,178 @@
+"""Process-wide, proactively refreshed Azure AD token cache.
+
+`azure.identity.get_bearer_token_provider` asks the credential for a token on every
+call, and under load many requests can hit a cold or expired token at the same moment,
+each one stalling on its own fetch. The providers here keep the current token in memory,
+refresh it in the background once it enters the refresh window (before it expires),
+and make sure only one fetch is in flight at a time ("single flight"). After a failed
+background refresh, the next one waits `RETRY_BACKOFF` seconds.
+
+Both the sync (`azure.identity`) and async (`azure.identity.aio`) credentials are
+supported. Use `get_token_provider()` or `get_async_token_provider()` to get the shared
+provider for a scope; each is a callable that can be passed as `api_key` to OpenAI clients.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+AZURE_SCOPE = "https://cognitiveservices.azure.com/.default"
+
+# Start a background refresh this many seconds before the token expires
+REFRESH_MARGIN = 300
+# Tokens with less validity than this are treated as expired and refreshed in the foreground
+MIN_VALIDITY = 30
+# Seconds to wait after a failed background refresh before starting another one
+RETRY_BACKOFF = 10
+
+
+class _TokenState:
+    def __init__(self):
+        self.token: str | None = None
+        self.expires_on = 0.0
+        self.refresh_on = 0.0
+        self.retry_on = 0.0
+
+    def update(self, token_info) -> None:
+        self.token = token_info.token
+        self.expires_on = token_info.expires_on
+        # Prefer the refresh hint from the identity provider when it is earlier than our own margin
+        refresh_on = token_info.expires_on - REFRESH_MARGIN
+        if token_info.refresh_on:
+            refresh_on = min(refresh_on, token_info.refresh_on)
+        self.refresh_on = refresh_on
+
+    def is_usable(self, now: float) -> bool:
+        return self.token is not None and now < self.expires_on - MIN_VALIDITY
+
+    def needs_refresh(self, now: float) -> bool:
+        return now >= self.refresh_on and now >= self.retry_on
+
+    def refresh_failed(self, now: float) -> None:
+        # Otherwise every call in the refresh window would start a new fetch while the identity provider is failing
+        self.retry_on = now + RETRY_BACKOFF
+
+
+class TokenProvider:
+    """Cached bearer token provider for a synchronous `azure.identity` credential."""
+
+    def __init__(self, credential, scope: str = AZURE_SCOPE):
+        self.credential = credential
+        self.scope = scope
+        self._state = _TokenState()
+        self._lock = threading.Lock()
+
+    def __call__(self) -> str:
+        now = time.time()
+        if self._state.is_usable(now):
+            if self._state.needs_refresh(now):
+                self._refresh_in_background()
+            return self._state.token
+        with self._lock:
+            # Another thread may have refreshed while we were waiting for the lock
+            if not self._state.is_usable(time.time()):
+                self._fetch()
+            return self._state.token
+
+    def _fetch(self) -> None:
+        self._state.update(self.credential.get_token_info(self.scope))
+
+    def _refresh_in_background(self) -> None:
+        # If the lock is taken a refresh is already in flight
+        if self._lock.acquire(blocking=False):
+            threading.Thread(target=self._background_fetch, daemon=True).start()
+
+    def _background_fetch(self) -> None:
+        try:
+            self._fetch()
+        except Exception:
+            self._state.refresh_failed(time.time())
+            logger.warning("Background token refresh failed, will retry in %s seconds", RETRY_BACKOFF, exc_info=True)
+        finally:
+            self._lock.release()
+
+
+class AsyncTokenProvider:
+    """Cached bearer token provider for an asynchronous `azure.identity.aio` credential."""
+
+    def __init__(self, credential, scope: str = AZURE_SCOPE):
+        self.credential = credential
+        self.scope = scope
+        self._state = _TokenState()
+        self._refresh_task: asyncio.Task | None = None
+
+    async def __call__(self) -> str:
+        now = time.time()
+        if self._state.is_usable(now):
+            if self._state.needs_refresh(now):
+                self._start_refresh(background=True)
+            return self._state.token
+        # Every caller waits on the same task, so a cold start makes a single request. A failure is
+        # raised to the callers here rather than logged
+        await asyncio.shield(self._start_refresh(background=False))
+        return self._state.token
+
+    def _start_refresh(self, background: bool) -> asyncio.Task:
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.ensure_future(self._fetch())
+            # Nobody awaits a background refresh, so its failure is logged, once
+            if background:
+                self._refresh_task.add_done_callback(self._log_failure)
+        elif not background:
+            # A caller now awaits the refresh and gets its failure raised instead
+            self._refresh_task.remove_done_callback(self._log_failure)
+        return self._refresh_task
+
+    async def _fetch(self) -> None:
+        try:
+            self._state.update(await self.credential.get_token_info(self.scope))
+        except Exception:
+            self._state.refresh_failed(time.time())
+            raise
+
+    @staticmethod
+    def _log_failure(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Token refresh failed, will retry in %s seconds", RETRY_BACKOFF, exc_info=task.exception())
+
+    async def close(self) -> None:
+        if self._refresh_task is not None and not self._refresh_task.done():
+            self._refresh_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._refresh_task
+        await self.credential.close()
+
+
+_providers: dict[str, TokenProvider] = {}
+_async_providers: dict[str, AsyncTokenProvider] = {}
+
+
+def get_token_provider(scope: str = AZURE_SCOPE) -> TokenProvider:
+    """Return the shared token provider for `scope`, backed by a sync `DefaultAzureCredential`."""
+    if scope not in _providers:
+        from azure.identity import DefaultAzureCredential
+
+        _providers[scope] = TokenProvider(DefaultAzureCredential(), scope)
+    return _providers[scope]
+
+
+def get_async_token_provider(scope: str = AZURE_SCOPE) -> AsyncTokenProvider:
+    """Return the shared token provider for `scope`, backed by an async `DefaultAzureCredential`."""
+    if scope not in _async_providers:
+        from azure.identity.aio import DefaultAzureCredential
+
+        _async_providers[scope] = AsyncTokenProvider(DefaultAzureCredential(), scope)
+    return _async_providers[scope]
+
+
+async def close_async_token_providers() -> None:
+    """Close the async credentials behind the shared providers. Call before the event loop exits."""
+    while _async_providers:
+        _, provider = _async_providers.popitem()
+        await provider.close()
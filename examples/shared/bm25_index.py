@@ -0,0 +1,107 @@
+"""A small in-memory BM25 keyword index over the rows of a `NumpyVectorStore`.
+
+The index is kept row-aligned with the store's vector matrix: it is updated when nodes
+are added or deleted, saved next to the vectors, and searched without any model call.
+Terms are lower-cased word characters with common English stop words removed; there is
+no stemming, so exact policy terms ("PerksPlus", "401k") match as written.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+# Okapi BM25 parameters
+K1 = 1.2
+B = 0.75
+
+STOP_WORDS = frozenset(
+    "a an and are as at be by can do does for from how i if in is it my of on or our so that the their there "
+    "these this to was we what when where which who will with you your".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    return [term for term in re.findall(r"\w+", text.casefold()) if term not in STOP_WORDS]
+
+
+@dataclass
+class KeywordResults:
+    rows: np.ndarray
+    scores: np.ndarray
+    # Share of the query terms that appear in the best-scoring row
+    top_coverage: float
+
+
+class BM25Index:
+    """Term frequencies per row, with postings rebuilt lazily after the rows change."""
+
+    def __init__(self):
+        self._term_counts: list[Counter] = []
+        self._postings: dict[str, tuple[np.ndarray, np.ndarray]] | None = None
+        self._lengths = np.empty(0, dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self._term_counts)
+
+    def add(self, texts: list[str]) -> None:
+        self._term_counts.extend(Counter(tokenize(text)) for text in texts)
+        self._postings = None
+
+    def keep(self, keep: np.ndarray) -> None:
+        self._term_counts = [counts for counts, kept in zip(self._term_counts, keep) if kept]
+        self._postings = None
+
+    def _build_postings(self) -> dict[str, tuple[np.ndarray, np.ndarray]]:
+        rows: dict[str, list[int]] = {}
+        frequencies: dict[str, list[int]] = {}
+        for row, counts in enumerate(self._term_counts):
+            for term, count in counts.items():
+                rows.setdefault(term, []).append(row)
+                frequencies.setdefault(term, []).append(count)
+        self._lengths = np.array([counts.total() for counts in self._term_counts], dtype=np.float32)
+        return {
+            term: (np.array(rows[term], dtype=np.int32), np.array(frequencies[term], dtype=np.float32)) for term in rows
+        }
+
+    def search(self, query: str, top_k: int) -> KeywordResults:
+        """Return the `top_k` rows with a positive BM25 score for `query`, best first."""
+        if self._postings is None:
+            self._postings = self._build_postings()
+        terms = set(tokenize(query))
+        n_rows = len(self._term_counts)
+        scores = np.zeros(n_rows, dtype=np.float32)
+        if not terms or n_rows == 0:
+            return KeywordResults(rows=np.empty(0, dtype=np.int32), scores=scores[:0], top_coverage=0.0)
+
+        average_length = self._lengths.mean() or 1
+        for term in terms & self._postings.keys():
+            rows, frequencies = self._postings[term]
+            idf = math.log(1 + (n_rows - len(rows) + 0.5) / (len(rows) + 0.5))
+            norm = K1 * (1 - B + B * self._lengths[rows] / average_length)
+            scores[rows] += idf * frequencies * (K1 + 1) / (frequencies + norm)
+
+        hits = np.flatnonzero(scores)
+        if len(hits) > top_k:
+            hits = hits[np.argpartition(-scores[hits], top_k - 1)[:top_k]]
+        hits = hits[np.argsort(-scores[hits])]
+        coverage = len(terms & self._term_counts[hits[0]].keys()) / len(terms) if len(hits) else 0.0
+        return KeywordResults(rows=hits, scores=scores[hits], top_coverage=coverage)
+
+    def save(self, path: Path) -> None:
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self._term_counts))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> BM25Index:
+        index = cls()
+        index._term_counts = [Counter(counts) for counts in json.loads(path.read_text())]
+        return index
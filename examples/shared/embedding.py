@@ -0,0 +1,124 @@
+"""Batched, concurrent and rate-limited embedding for index builds.
+
+Chunks are packed into batches that stay under a per-request token budget, and the
+batches are sent from a small shared thread pool so that several documents can be
+embedded at the same time. A token bucket keeps the total request rate under the
+deployment's tokens-per-minute quota instead of relying on 429 retries.
+
+Configuration comes from environment variables:
+
+    EMBEDDING_CONCURRENCY              Batches in flight at once (default 4)
+    EMBEDDING_BATCH_MAX_TOKENS         Max tokens per embedding request (default 64000)
+    EMBEDDING_TPM                      Tokens per minute allowed, 0 for no limit. For Azure this defaults to
+                                       AZURE_OPENAI_EMBEDDING_CAPACITY * 1000, matching the
+                                       `embeddingDeploymentCapacity` set in infra/main.bicep
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+
+from llama_index.core import Settings
+from llama_index.core.schema import BaseNode, MetadataMode
+
+from .model_clients import get_api_host
+
+logger = logging.getLogger(__name__)
+
+
+class TokenRateLimiter:
+    """Thread-safe token bucket holding up to one minute of quota."""
+
+    def __init__(self, tokens_per_minute: int):
+        self.capacity = tokens_per_minute
+        self.rate = tokens_per_minute / 60
+        self._available = float(tokens_per_minute)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int) -> None:
+        """Block until `tokens` can be spent without going over the per-minute quota."""
+        tokens = min(tokens, self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._available = min(self.capacity, self._available + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._available >= tokens:
+                    self._available -= tokens
+                    return
+                wait = (tokens - self._available) / self.rate
+            time.sleep(wait)
+
+
+def get_tokens_per_minute() -> int:
+    if "EMBEDDING_TPM" in os.environ:
+        return int(os.environ["EMBEDDING_TPM"])
+    if get_api_host() == "azure" and "AZURE_OPENAI_EMBEDDING_CAPACITY" in os.environ:
+        # Each unit of Azure OpenAI deployment capacity is 1000 tokens per minute
+        return int(os.environ["AZURE_OPENAI_EMBEDDING_CAPACITY"]) * 1000
+    return 0
+
+
+class EmbeddingStage:
+    """Embeds nodes in token-bounded batches, with a bounded number of batches in flight."""
+
+    def __init__(self, concurrency: int, batch_max_tokens: int, tokens_per_minute: int = 0):
+        self.batch_max_tokens = batch_max_tokens
+        self.rate_limiter = TokenRateLimiter(tokens_per_minute) if tokens_per_minute else None
+        if self.rate_limiter is not None:
+            # A single batch can never be larger than the whole per-minute quota
+            self.batch_max_tokens = min(batch_max_tokens, tokens_per_minute)
+        # The pool is shared by every caller, so its size bounds concurrency across documents
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="embedding")
+
+    def make_batches(self, nodes: Sequence[BaseNode]) -> list[tuple[list[BaseNode], list[str], int]]:
+        """Pack nodes into (nodes, texts, token_count) batches under the token and input limits."""
+        max_inputs = Settings.embed_model.embed_batch_size
+        batches = []
+        batch_nodes, batch_texts, batch_tokens = [], [], 0
+        for node in nodes:
+            text = node.get_content(metadata_mode=MetadataMode.EMBED)
+            tokens = len(Settings.tokenizer(text))
+            if batch_nodes and (batch_tokens + tokens > self.batch_max_tokens or len(batch_nodes) >= max_inputs):
+                batches.append((batch_nodes, batch_texts, batch_tokens))
+                batch_nodes, batch_texts, batch_tokens = [], [], 0
+            batch_nodes.append(node)
+            batch_texts.append(text)
+            batch_tokens += tokens
+        if batch_nodes:
+            batches.append((batch_nodes, batch_texts, batch_tokens))
+        return batches
+
+    def _embed_batch(self, nodes: list[BaseNode], texts: list[str], tokens: int) -> None:
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(tokens)
+        embeddings = Settings.embed_model.get_text_embedding_batch(texts)
+        for node, embedding in zip(nodes, embeddings):
+            node.embedding = embedding
+
+    def embed_nodes(self, nodes: Sequence[BaseNode]) -> None:
+        """Set `embedding` on every node, blocking until all batches are done."""
+        batches = self.make_batches(nodes)
+        if not batches:
+            return
+        logger.info("Embedding %d chunks in %d batches", len(nodes), len(batches))
+        futures = [self._executor.submit(self._embed_batch, *batch) for batch in batches]
+        for future in futures:
+            future.result()
+
+
+@cache
+def get_embedding_stage() -> EmbeddingStage:
+    """Return the process-wide embedding stage configured from the environment."""
+    return EmbeddingStage(
+        concurrency=int(os.getenv("EMBEDDING_CONCURRENCY", "4")),
+        batch_max_tokens=int(os.getenv("EMBEDDING_BATCH_MAX_TOKENS", "64000")),
+        tokens_per_minute=get_tokens_per_minute(),
+    )
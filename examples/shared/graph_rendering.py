@@ -0,0 +1,106 @@
+"""Opt-in rendering of the LangGraph example graphs to the images in `examples/images`.
+
+Drawing a graph is documentation, not part of running the agent, so `render_graph()` does
+nothing unless `RENDER_GRAPH` is set. When it is, it hashes the graph's topology (its
+nodes and edges) and only draws the image again when that hash, or the renderer, differs
+from the ones recorded in `.graph_renders.json` (git-ignored) when it was last drawn.
+
+The default `mermaid` renderer uses `draw_mermaid_png()`, which sends the graph to the
+mermaid.ink web service, and is how the committed images were drawn. The `dot` renderer
+converts the graph's DOT source with the Graphviz `dot` command, without network access.
+
+Configuration comes from environment variables:
+
+    RENDER_GRAPH                       "true" to draw the graph images when running the examples (default false)
+    GRAPH_RENDERER                     "mermaid" (the mermaid.ink service, default) or "dot" (local Graphviz)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import subprocess
+from pathlib import Path
+
+from langchain_core.runnables import Runnable
+from langchain_core.runnables.graph import Graph
+
+logger = logging.getLogger(__name__)
+
+IMAGES_DIR = Path(__file__).resolve().parent.parent / "images"
+# The topology and renderer each image was last drawn from, by image name
+RENDERS_FILE = Path(__file__).resolve().parent.parent.parent / ".graph_renders.json"
+RENDERERS = ("mermaid", "dot")
+
+# Whether the missing Graphviz `dot` command was already reported
+_dot_missing_reported = False
+
+
+def topology_digest(graph: Graph) -> str:
+    """Return a digest of the nodes and edges of `graph`, ignoring what the nodes run."""
+    topology = {
+        "nodes": sorted((node.id, node.name) for node in graph.nodes.values()),
+        "edges": sorted((edge.source, edge.target, edge.conditional, str(edge.data)) for edge in graph.edges),
+    }
+    return hashlib.sha256(json.dumps(topology).encode()).hexdigest()
+
+
+def to_dot(graph: Graph) -> str:
+    """Return the DOT source of `graph`, in the style of `openai_agents_handoffs.dot`."""
+    lines = ["digraph G {", "    graph [splines=true];", '    node [fontname="Arial"];']
+    # A graph without a single start or end node has no node to highlight at that end
+    ends = {node.id for node in (graph.first_node(), graph.last_node()) if node is not None}
+    for node in graph.nodes.values():
+        if node.id in ends:
+            style = "shape=ellipse, style=filled, fillcolor=lightblue"
+        else:
+            style = "shape=box, style=filled, fillcolor=lightyellow"
+        lines.append(f"    {json.dumps(node.id)} [label={json.dumps(node.name)}, {style}];")
+    for edge in graph.edges:
+        attributes = " [style=dotted]" if edge.conditional else ""
+        lines.append(f"    {json.dumps(edge.source)} -> {json.dumps(edge.target)}{attributes};")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def read_renders() -> dict:
+    try:
+        return json.loads(RENDERS_FILE.read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def render_graph(graph: Runnable, image_name: str) -> bool:
+    """Draw `graph` to `IMAGES_DIR / image_name` if `RENDER_GRAPH` is set and its topology changed.
+
+    Returns whether the image was drawn.
+    """
+    if os.getenv("RENDER_GRAPH", "false").lower() != "true":
+        return False
+    renderer = os.getenv("GRAPH_RENDERER", "mermaid")
+    if renderer not in RENDERERS:
+        raise ValueError(f"GRAPH_RENDERER must be one of {', '.join(RENDERERS)}, got: {renderer}")
+
+    drawable = graph.get_graph()
+    image_path = IMAGES_DIR / image_name
+    render = {"topology": topology_digest(drawable), "renderer": renderer}
+    renders = read_renders()
+    if image_path.exists() and renders.get(image_name) == render:
+        return False
+
+    if renderer == "mermaid":
+        image_path.write_bytes(drawable.draw_mermaid_png())
+    elif dot_command := shutil.which("dot"):
+        subprocess.run([dot_command, "-Tpng", "-o", str(image_path)], input=to_dot(drawable), text=True, check=True)
+    else:
+        # Leave the image as it is, so it is drawn once Graphviz is installed
+        global _dot_missing_reported
+        if not _dot_missing_reported:
+            logger.warning("Graphviz `dot` is not installed, not drawing %s", image_path)
+            _dot_missing_reported = True
+        return False
+    RENDERS_FILE.write_text(json.dumps({**renders, image_name: render}, indent=2, sort_keys=True))
+    return True
@@ -0,0 +1,255 @@
+"""Precomputed, columnar hotel inventory for the MCP server examples.
+
+The hotel tool used to generate new hotels with Faker on every call. Instead, each city
+gets a fixed inventory generated once (deterministically, from the city name) and stored
+as columns: NumPy arrays for the numeric fields, a bitmask per hotel for its amenities,
+and the rows pre-sorted by rating. A query such as "San Francisco, free WiFi and pool,
+under $300" is then a few vectorised comparisons and a bitwise AND, with no generation.
+
+Cities listed in `HOTEL_INVENTORY_CITIES` are generated at startup; any other city is
+generated on its first query. Since clients choose the locations, only the
+`HOTEL_INVENTORY_MAX_CITIES` most recently queried cities are kept; an evicted city is
+generated again, with the same hotels, on its next query.
+
+Configuration comes from environment variables:
+
+    HOTEL_INVENTORY_CITIES             Comma-separated cities to generate at startup
+                                       (default: "San Francisco,New York,Seattle,Chicago,London,Paris")
+    HOTELS_PER_CITY                    Hotels generated per city (default 200)
+    HOTEL_INVENTORY_MAX_CITIES         Cities kept in memory, least recently queried evicted first (default 100)
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import threading
+from dataclasses import dataclass, field
+from functools import cached_property
+
+import numpy as np
+from faker import Faker
+
+from .ttl_cache import TTLCache
+
+DEFAULT_CITIES = "San Francisco,New York,Seattle,Chicago,London,Paris"
+
+# Columns of `HotelInventory.table_rows`. The city is left out, being the same for every row
+TABLE_COLUMNS = (
+    "name",
+    "address",
+    "neighborhood",
+    "rating",
+    "price_per_night",
+    "hotel_type",
+    "amenities",
+    "available_rooms",
+)
+
+# Short names that agents commonly use for a city, mapped to the inventory's city name
+CITY_ALIASES = {
+    "sf": "San Francisco",
+    "nyc": "New York",
+    "new york city": "New York",
+    "la": "Los Angeles",
+}
+
+
+@dataclass(frozen=True)
+class HotelVocabulary:
+    """The labels used to generate hotels, so each server can present them in its own language."""
+
+    hotel_types: tuple[str, ...]
+    amenities: tuple[str, ...]
+    neighborhoods: tuple[str, ...]
+    name_suffixes: tuple[str, ...]
+    # Nightly (min, max) price for each hotel type
+    price_ranges: dict[str, tuple[int, int]]
+
+    @cached_property
+    def amenity_bits(self) -> dict[str, int]:
+        """Bit of each amenity, keyed by its case-folded name."""
+        return {name.casefold(): 1 << bit for bit, name in enumerate(self.amenities)}
+
+    @cached_property
+    def hotel_type_codes(self) -> dict[str, int]:
+        return {name: code for code, name in enumerate(self.hotel_types)}
+
+    def amenity_mask(self, amenities: list[str]) -> int:
+        """Return the bitmask for `amenities`, matching each one case-insensitively within the known names."""
+        mask = 0
+        for requested in amenities:
+            wanted = requested.strip().casefold()
+            if wanted in self.amenity_bits:
+                mask |= self.amenity_bits[wanted]
+                continue
+            matches = [bit for bit, name in enumerate(self.amenities) if wanted in name.casefold()]
+            if not wanted or not matches:
+                raise ValueError(f"Unknown amenity {requested!r}, expected one of: {', '.join(self.amenities)}")
+            # "WiFi" matches "Free WiFi"
+            mask |= 1 << matches[0]
+        return mask
+
+    def amenity_names(self, mask: int) -> list[str]:
+        return [name for bit, name in enumerate(self.amenities) if mask & (1 << bit)]
+
+    def amenity_codes(self, mask: int) -> list[int]:
+        """Return the amenities in `mask` as their positions in `amenities`, a much shorter form than the names."""
+        return [bit for bit in range(len(self.amenities)) if mask & (1 << bit)]
+
+
+@dataclass
+class CityHotels:
+    """Column-oriented hotels of one city. Row `i` of every column describes the same hotel."""
+
+    city: str
+    names: list[str]
+    addresses: list[str]
+    neighborhoods: np.ndarray
+    hotel_types: np.ndarray
+    amenity_masks: np.ndarray
+    ratings: np.ndarray
+    prices: np.ndarray
+    available_rooms: np.ndarray
+    # Rows sorted by rating, best first, and the matching ratings for range cuts with searchsorted
+    by_rating: np.ndarray = field(init=False)
+    _descending_ratings: np.ndarray = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.by_rating = np.argsort(-self.ratings, kind="stable")
+        self._descending_ratings = -self.ratings[self.by_rating]
+
+    def query(
+        self,
+        amenity_mask: int = 0,
+        max_price: float | None = None,
+        min_rating: float | None = None,
+        hotel_type: int | None = None,
+        limit: int | None = None,
+    ) -> np.ndarray:
+        """Return the rows matching every given filter, best rated first."""
+        rows = self.by_rating
+        if min_rating is not None:
+            # In the ratings' own precision: a float32 4.1 is below the float64 4.1, and would be left out
+            threshold = self.ratings.dtype.type(min_rating)
+            rows = rows[: np.searchsorted(self._descending_ratings, -threshold, side="right")]
+        keep = np.ones(len(self.names), dtype=bool)
+        if amenity_mask:
+            keep &= (self.amenity_masks & amenity_mask) == amenity_mask
+        if max_price is not None:
+            keep &= self.prices <= max_price
+        if hotel_type is not None:
+            keep &= self.hotel_types == hotel_type
+        rows = rows[keep[rows]]
+        return rows[:limit] if limit is not None else rows
+
+
+def normalize_city(location: str) -> str:
+    """Return the inventory name for `location`, so "SF", "sf " and "San Francisco" share one inventory."""
+    location = " ".join(location.split())
+    return CITY_ALIASES.get(location.casefold(), location.title())
+
+
+class HotelInventory:
+    """The hotels of the recently queried cities, generated once per city and queried without further generation."""
+
+    def __init__(self, vocabulary: HotelVocabulary, hotels_per_city: int = 200, seed: int = 0, max_cities: int = 100):
+        self.vocabulary = vocabulary
+        self.hotels_per_city = hotels_per_city
+        self.seed = seed
+        self._cities = TTLCache(max_entries=max_cities, ttl=float("inf"))
+        self._faker = Faker()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, vocabulary: HotelVocabulary) -> HotelInventory:
+        """Create the inventory and generate the cities listed in `HOTEL_INVENTORY_CITIES`."""
+        inventory = cls(
+            vocabulary,
+            hotels_per_city=int(os.getenv("HOTELS_PER_CITY", "200")),
+            max_cities=int(os.getenv("HOTEL_INVENTORY_MAX_CITIES", "100")),
+        )
+        for city in os.getenv("HOTEL_INVENTORY_CITIES", DEFAULT_CITIES).split(","):
+            if city.strip():
+                inventory.city(city)
+        return inventory
+
+    def city(self, location: str) -> CityHotels:
+        """Return the hotels for `location`, generating them on first use (a blocking call: run it in a thread)."""
+        name = normalize_city(location)
+        hotels = self._cities.get(name)
+        if hotels is None:
+            with self._lock:
+                hotels = self._cities.get(name)
+                if hotels is None:
+                    hotels = self._generate(name)
+                    self._cities.set(name, hotels)
+        return hotels
+
+    def _generate(self, city: str) -> CityHotels:
+        vocabulary = self.vocabulary
+        # Seeding from the city name gives every process (and every restart) the same hotels
+        rng = random.Random(f"{self.seed}:{city}")
+        self._faker.seed_instance(f"{self.seed}:{city}")
+        n = self.hotels_per_city
+        hotel_types = [rng.randrange(len(vocabulary.hotel_types)) for _ in range(n)]
+        amenity_masks = []
+        for _ in range(n):
+            mask = 0
+            for bit in rng.sample(range(len(vocabulary.amenities)), rng.randint(3, 6)):
+                mask |= 1 << bit
+            amenity_masks.append(mask)
+        prices = [rng.randint(*vocabulary.price_ranges.get(vocabulary.hotel_types[t], (100, 300))) for t in hotel_types]
+        return CityHotels(
+            city=city,
+            names=[f"{vocabulary.hotel_types[t]} {rng.choice(vocabulary.name_suffixes)}" for t in hotel_types],
+            addresses=[self._faker.street_address() for _ in range(n)],
+            neighborhoods=np.array([rng.randrange(len(vocabulary.neighborhoods)) for _ in range(n)], dtype=np.uint8),
+            hotel_types=np.array(hotel_types, dtype=np.uint8),
+            amenity_masks=np.array(amenity_masks, dtype=np.uint32),
+            ratings=np.array([round(rng.uniform(3.0, 5.0), 1) for _ in range(n)], dtype=np.float32),
+            prices=np.array(prices, dtype=np.int32),
+            available_rooms=np.array([rng.randint(1, 15) for _ in range(n)], dtype=np.int16),
+        )
+
+    def records(self, hotels: CityHotels, rows: np.ndarray) -> list[dict]:
+        """Return the given rows as dicts with the fields of the servers' `Hotel` dataclass."""
+        vocabulary = self.vocabulary
+        return [
+            {
+                "name": hotels.names[row],
+                "address": hotels.addresses[row],
+                "location": f"{vocabulary.neighborhoods[hotels.neighborhoods[row]]}, {hotels.city}",
+                "rating": round(float(hotels.ratings[row]), 1),
+                "price_per_night": int(hotels.prices[row]),
+                "hotel_type": vocabulary.hotel_types[hotels.hotel_types[row]],
+                "amenities": vocabulary.amenity_names(int(hotels.amenity_masks[row])),
+                "available_rooms": int(hotels.available_rooms[row]),
+            }
+            for row in rows.tolist()
+        ]
+
+    def table_rows(self, hotels: CityHotels, rows: np.ndarray) -> list[list]:
+        """Return the given rows as lists of values in `TABLE_COLUMNS` order, with amenities as codes."""
+        vocabulary = self.vocabulary
+        return [
+            [
+                hotels.names[row],
+                hotels.addresses[row],
+                vocabulary.neighborhoods[neighborhood],
+                round(rating, 1),
+                price,
+                vocabulary.hotel_types[hotel_type],
+                vocabulary.amenity_codes(amenity_mask),
+                available_rooms,
+            ]
+            for row, neighborhood, rating, price, hotel_type, amenity_mask, available_rooms in zip(
+                rows.tolist(),
+                hotels.neighborhoods[rows].tolist(),
+                hotels.ratings[rows].tolist(),
+                hotels.prices[rows].tolist(),
+                hotels.hotel_types[rows].tolist(),
+                hotels.amenity_masks[rows].tolist(),
+                hotels.available_rooms[rows].tolist(),
+            )
+        ]
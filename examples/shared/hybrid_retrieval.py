@@ -0,0 +1,105 @@
+"""Hybrid keyword (BM25) + vector retrieval for the LlamaIndex query engines.
+
+`HybridRetriever` runs a BM25 search over the store's keyword index first. When that
+result is clearly confident (the best chunk contains every query term and scores well
+ahead of the next one) it is returned as is, skipping the embedding call entirely.
+Otherwise the keyword and vector rankings are merged with reciprocal-rank fusion (RRF),
+which needs no score calibration between the two.
+
+Configuration comes from environment variables:
+
+    RETRIEVAL_MODE                     "hybrid" (default) or "vector" for dense retrieval only
+    BM25_CONFIDENCE_RATIO              How far the best BM25 score must lead the second one to answer from
+                                       BM25 alone (default 2.0, 0 to always fuse with vector results)
+"""
+
+from __future__ import annotations
+
+import os
+from collections import Counter
+
+from llama_index.core import Settings, VectorStoreIndex
+from llama_index.core.base.base_retriever import BaseRetriever
+from llama_index.core.query_engine import RetrieverQueryEngine
+from llama_index.core.schema import NodeWithScore, QueryBundle
+
+from .query_cache import CachedRetriever
+
+# Standard RRF constant, from Cormack et al. (2009)
+RRF_K = 60
+# Each ranking contributes this many times the final top-k to the fusion
+CANDIDATES_PER_RESULT = 4
+
+# How often each path was taken, printed by the example scripts
+retrieval_counts: Counter[str] = Counter()
+
+
+def reciprocal_rank_fusion(rankings: list[list[NodeWithScore]], top_k: int) -> list[NodeWithScore]:
+    """Merge rankings of the same nodes, scoring each node by the sum of 1 / (RRF_K + rank)."""
+    scores: dict[str, float] = {}
+    nodes = {}
+    for ranking in rankings:
+        for rank, result in enumerate(ranking, start=1):
+            scores[result.node.node_id] = scores.get(result.node.node_id, 0.0) + 1 / (RRF_K + rank)
+            nodes.setdefault(result.node.node_id, result.node)
+    best = sorted(scores, key=scores.get, reverse=True)[:top_k]
+    return [NodeWithScore(node=nodes[node_id], score=scores[node_id]) for node_id in best]
+
+
+class HybridRetriever(BaseRetriever):
+    """Retriever that answers from BM25 when it is confident, and fuses BM25 with vector search otherwise."""
+
+    def __init__(self, index: VectorStoreIndex, similarity_top_k: int = 2, confidence_ratio: float = 2.0):
+        self._index = index
+        self._similarity_top_k = similarity_top_k
+        self._candidates = similarity_top_k * CANDIDATES_PER_RESULT
+        self._confidence_ratio = confidence_ratio
+        self._dense = CachedRetriever(index, similarity_top_k=self._candidates)
+        super().__init__(callback_manager=self._dense.callback_manager)
+
+    def _keyword_search(self, query: str) -> tuple[list[NodeWithScore], bool]:
+        result, top_coverage = self._index.vector_store.keyword_search(query, self._candidates)
+        nodes = self._index.docstore.get_nodes(result.ids)
+        ranking = [NodeWithScore(node=node, score=score) for node, score in zip(nodes, result.similarities)]
+        scores = result.similarities
+        confident = (
+            self._confidence_ratio > 0
+            and top_coverage == 1.0
+            and (len(scores) == 1 or scores[0] >= self._confidence_ratio * scores[1])
+        )
+        return ranking, confident
+
+    def _retrieve(self, query_bundle: QueryBundle) -> list[NodeWithScore]:
+        keyword_ranking, confident = self._keyword_search(query_bundle.query_str)
+        if confident:
+            retrieval_counts["keyword_only"] += 1
+            return keyword_ranking[: self._similarity_top_k]
+        retrieval_counts["hybrid"] += 1
+        dense_ranking = self._dense.retrieve(query_bundle)
+        return reciprocal_rank_fusion([keyword_ranking, dense_ranking], self._similarity_top_k)
+
+    async def _aretrieve(self, query_bundle: QueryBundle) -> list[NodeWithScore]:
+        keyword_ranking, confident = self._keyword_search(query_bundle.query_str)
+        if confident:
+            retrieval_counts["keyword_only"] += 1
+            return keyword_ranking[: self._similarity_top_k]
+        retrieval_counts["hybrid"] += 1
+        dense_ranking = await self._dense.aretrieve(query_bundle)
+        return reciprocal_rank_fusion([keyword_ranking, dense_ranking], self._similarity_top_k)
+
+
+def create_query_engine(
+    index: VectorStoreIndex, similarity_top_k: int = 2, retrieval_mode: str = "hybrid"
+) -> RetrieverQueryEngine:
+    """Return a query engine for `index` using "hybrid" or "vector" retrieval, both with cached embeddings."""
+    if retrieval_mode == "hybrid":
+        retriever = HybridRetriever(
+            index,
+            similarity_top_k=similarity_top_k,
+            confidence_ratio=float(os.getenv("BM25_CONFIDENCE_RATIO", "2.0")),
+        )
+    elif retrieval_mode == "vector":
+        retriever = CachedRetriever(index, similarity_top_k=similarity_top_k)
+    else:
+        raise ValueError(f"Unknown retrieval mode {retrieval_mode!r}, expected 'hybrid' or 'vector'")
+    return RetrieverQueryEngine.from_args(retriever=retriever, llm=Settings.llm)
@@ -0,0 +1,166 @@
+"""Content-addressed cache for the persisted LlamaIndex vector indexes.
+
+Each source file gets its own persist directory under `example_data/.llama_index_storage`,
+named after the file and a key derived from the embedding model and chunking settings.
+A manifest in that directory records the SHA-256 of the source file, so the cached index
+is only reused as-is when the file, the embedding model and the chunking settings all match.
+When only the file changed, the cached index is updated page by page (see `ingestion.py`);
+a different model or chunking setting, or a half-written directory, starts from an empty index.
+
+The vector index used for search ("exact", or an ANN index such as "ivf", see `ann_index.py`)
+is not part of the key: an ANN index is built on top of the stored vectors and saved next to them.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from llama_index.core import Settings, StorageContext, VectorStoreIndex, load_index_from_storage
+
+from .ann_index import create_ann_index
+from .ingestion import ingest_pages, load_pages
+from .numpy_vector_store import NumpyVectorStore
+from .pdf_pages import parse_pdf_pages
+
+logger = logging.getLogger(__name__)
+
+STORAGE_DIR = Path(__file__).resolve().parent.parent.parent / "example_data" / ".llama_index_storage"
+MANIFEST_FILE = "cache_manifest.json"
+
+
+def file_sha256(path: Path) -> str:
+    """Return the hex SHA-256 of a file, read in chunks so large PDFs are not loaded into memory."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def index_settings() -> dict:
+    """Return the global LlamaIndex settings that change the contents of an index."""
+    return {
+        "embed_model": Settings.embed_model.model_name,
+        "chunk_size": Settings.chunk_size,
+        "chunk_overlap": Settings.chunk_overlap,
+        "vector_store_dtype": os.getenv("VECTOR_STORE_DTYPE", "float32"),
+    }
+
+
+def index_cache_dir(source: Path, settings: dict, storage_dir: Path = STORAGE_DIR) -> Path:
+    """Return the persist directory for `source` built with `settings`."""
+    key = hashlib.sha256(json.dumps(settings, sort_keys=True).encode()).hexdigest()[:16]
+    return storage_dir / f"{source.stem}-{key}"
+
+
+def read_manifest(persist_dir: Path) -> dict | None:
+    try:
+        return json.loads((persist_dir / MANIFEST_FILE).read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def write_manifest(persist_dir: Path, manifest: dict) -> None:
+    # The manifest is written last, so a directory without one is never mistaken for a complete index
+    (persist_dir / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2, sort_keys=True))
+
+
+def _prune_stale(source: Path, keep: Path, storage_dir: Path) -> None:
+    # Only `<stem>-<key>` directories, so that another file's directories (such as "guide-v2-<key>"
+    # for "guide.pdf") are left alone
+    pattern = re.compile(rf"{re.escape(source.stem)}-[0-9a-f]{{16}}")
+    for path in storage_dir.glob(f"{source.stem}-*"):
+        if not pattern.fullmatch(path.name) or not path.is_dir() or path == keep:
+            continue
+        manifest = read_manifest(path)
+        if manifest is None or manifest.get("source") == source.name:
+            logger.info("Removing stale index cache %s", path)
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def _load_index(persist_dir: Path) -> VectorStoreIndex | None:
+    try:
+        vector_store = NumpyVectorStore.from_persist_dir(persist_dir)
+        index = load_index_from_storage(
+            StorageContext.from_defaults(persist_dir=str(persist_dir), vector_store=vector_store)
+        )
+        if not vector_store.has_keyword_index:
+            texts = {node_id: node.get_content() for node_id, node in index.docstore.docs.items()}
+            vector_store.build_keyword_index(texts, persist_dir)
+        return index
+    except Exception:
+        logger.warning("Index cache %s is unreadable, rebuilding", persist_dir, exc_info=True)
+        return None
+
+
+def expected_manifest(source: Path) -> dict:
+    """Return the manifest of an up-to-date index of `source`."""
+    return {"source": source.name, "source_sha256": file_sha256(source), **index_settings()}
+
+
+def load_or_build_index(
+    source: Path, storage_dir: Path = STORAGE_DIR, vector_index: str = "exact", expected: dict | None = None
+) -> VectorStoreIndex:
+    """Load the cached index for `source`, updating it incrementally if the file has changed.
+
+    `vector_index` picks how queries are answered: "exact" scores every chunk, "ivf" uses an ANN index.
+    `expected` is the manifest from `expected_manifest`, when the caller already computed it.
+    """
+    source = source.resolve()
+    settings = index_settings()
+    persist_dir = index_cache_dir(source, settings, storage_dir)
+    expected = expected or expected_manifest(source)
+
+    manifest = read_manifest(persist_dir)
+    index = _load_index(persist_dir) if manifest is not None else None
+    if index is not None and manifest == expected:
+        index.vector_store.set_ann_index(create_ann_index(vector_index), persist_dir)
+        return index
+
+    # Either there is no usable cache, or the file changed: only re-embed the pages that differ
+    logger.info("Ingesting changes to %s", source.name)
+    if index is None:
+        vector_store = NumpyVectorStore(dtype=settings["vector_store_dtype"])
+        index = VectorStoreIndex(nodes=[], storage_context=StorageContext.from_defaults(vector_store=vector_store))
+    ingest_pages(index, load_pages(source, expected["source_sha256"]))
+
+    # Persist to a temporary directory and swap it in, so an interrupted run never leaves a partial cache
+    tmp_dir = persist_dir.with_name(persist_dir.name + ".tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    index.storage_context.persist(persist_dir=str(tmp_dir))
+    write_manifest(tmp_dir, expected)
+    shutil.rmtree(persist_dir, ignore_errors=True)
+    tmp_dir.rename(persist_dir)
+    _prune_stale(source, persist_dir, storage_dir)
+    index.vector_store.set_ann_index(create_ann_index(vector_index), persist_dir)
+    return index
+
+
+def load_or_build_indexes(
+    sources: list[Path], storage_dir: Path = STORAGE_DIR, vector_index: str = "exact"
+) -> list[VectorStoreIndex]:
+    """Load or build the indexes for several files at once, sharing the embedding stage between them."""
+    sources = [source.resolve() for source in sources]
+    manifests = [expected_manifest(source) for source in sources]
+    # Parsing a PDF forks worker processes, which is only safe before the threads below start. The parsed
+    # pages are cached on disk, where the threads then read them
+    for source, manifest in zip(sources, manifests):
+        persist_dir = index_cache_dir(source, index_settings(), storage_dir)
+        if source.suffix.lower() == ".pdf" and read_manifest(persist_dir) != manifest:
+            parse_pdf_pages(source, manifest["source_sha256"])
+
+    with ThreadPoolExecutor(max_workers=len(sources)) as executor:
+        return list(
+            executor.map(
+                lambda source, manifest: load_or_build_index(source, storage_dir, vector_index, manifest),
+                sources,
+                manifests,
+            )
+        )
@@ -0,0 +1,138 @@
+"""Incremental, page-level ingestion into a persisted LlamaIndex vector index.
+
+Every page of a source file becomes one document with a stable id, and the docstore
+records a hash of each page's text. On re-ingestion only pages whose hash changed are
+re-split, and chunks whose embedded text already exists in the index reuse the stored
+embedding, so editing a page of a long handbook re-embeds just the chunks that changed.
+The page label is not part of the embedded text, so inserting or removing a page, which
+shifts the pages after it, doesn't re-embed their chunks either.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+
+from llama_index.core import Settings, SimpleDirectoryReader, VectorStoreIndex
+from llama_index.core.readers.file.base import default_file_metadata_func
+from llama_index.core.schema import BaseNode, Document, MetadataMode
+
+from .embedding import get_embedding_stage
+from .pdf_pages import parse_pdf_pages
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class IngestionStats:
+    pages_added: int = 0
+    pages_updated: int = 0
+    pages_removed: int = 0
+    pages_unchanged: int = 0
+    chunks_embedded: int = 0
+    chunks_reused: int = 0
+
+
+def text_sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def chunk_hash(node: BaseNode) -> str:
+    """Hash exactly the content that gets embedded for a chunk."""
+    return text_sha256(node.get_content(metadata_mode=MetadataMode.EMBED))
+
+
+# File metadata that is kept out of both the embedded and the LLM text, as SimpleDirectoryReader does
+FILE_METADATA_KEYS = [
+    "file_name",
+    "file_type",
+    "file_size",
+    "creation_date",
+    "last_modified_date",
+    "last_accessed_date",
+]
+
+
+def _load_pdf_pages(source: Path, source_sha256: str) -> list[Document]:
+    file_metadata = default_file_metadata_func(str(source))
+    file_metadata.pop("last_accessed_date", None)
+    return [
+        Document(
+            text=page.text,
+            metadata={"page_label": page.label, "file_name": source.name, **file_metadata},
+            excluded_embed_metadata_keys=list(FILE_METADATA_KEYS),
+            excluded_llm_metadata_keys=list(FILE_METADATA_KEYS),
+        )
+        for page in parse_pdf_pages(source, source_sha256)
+    ]
+
+
+def load_pages(source: Path, source_sha256: str | None = None) -> list[Document]:
+    """Load `source` as one document per page, with ids that stay the same across runs.
+
+    PDFs are parsed in parallel, and with `source_sha256` their text is cached on disk (see `pdf_pages.py`).
+    """
+    if source.suffix.lower() == ".pdf" and source_sha256 is not None:
+        documents = _load_pdf_pages(source, source_sha256)
+    else:
+        documents = SimpleDirectoryReader(input_files=[source]).load_data()
+    for page_number, document in enumerate(documents):
+        document.id_ = f"{source.name}#page={page_number}"
+        # The absolute path differs between checkouts, and inserting a page relabels every page after it,
+        # so keep both out of the embedded text: a chunk that moved to another page reuses its embedding
+        document.excluded_embed_metadata_keys += ["file_path", "page_label"]
+    return documents
+
+
+def _stored_embeddings(index: VectorStoreIndex) -> dict[str, list[float]]:
+    """Map the chunk hash of every node already in the index to its stored embedding."""
+    embeddings = {}
+    for ref_doc_info in (index.docstore.get_all_ref_doc_info() or {}).values():
+        for node_id in ref_doc_info.node_ids:
+            node = index.docstore.get_node(node_id, raise_error=False)
+            if node is not None:
+                embeddings[chunk_hash(node)] = index.vector_store.get(node_id)
+    return embeddings
+
+
+def ingest_pages(index: VectorStoreIndex, pages: list[Document]) -> IngestionStats:
+    """Bring `index` in line with `pages`, embedding only chunks that are not already stored."""
+    stats = IngestionStats()
+    docstore = index.docstore
+    stored_pages = set((docstore.get_all_ref_doc_info() or {}).keys())
+    reusable = _stored_embeddings(index)
+
+    new_nodes = []
+    for page in pages:
+        page_hash = text_sha256(page.text)
+        stored_hash = docstore.get_document_hash(page.id_)
+        if stored_hash == page_hash:
+            stats.pages_unchanged += 1
+            continue
+        if page.id_ in stored_pages:
+            index.delete_ref_doc(page.id_, delete_from_docstore=True)
+            stats.pages_updated += 1
+        else:
+            stats.pages_added += 1
+
+        for node in Settings.node_parser.get_nodes_from_documents([page]):
+            embedding = reusable.get(chunk_hash(node))
+            if embedding is not None:
+                node.embedding = embedding
+                stats.chunks_reused += 1
+            else:
+                stats.chunks_embedded += 1
+            new_nodes.append(node)
+        docstore.set_document_hash(page.id_, page_hash)
+
+    for page_id in stored_pages - {page.id_ for page in pages}:
+        index.delete_ref_doc(page_id, delete_from_docstore=True)
+        stats.pages_removed += 1
+
+    # Embed the new chunks up front in concurrent, rate-limited batches; insert_nodes keeps existing embeddings
+    get_embedding_stage().embed_nodes([node for node in new_nodes if node.embedding is None])
+    index.insert_nodes(new_nodes)
+    logger.info("Ingestion finished: %s", stats)
+    return stats
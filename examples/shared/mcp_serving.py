@@ -0,0 +1,109 @@
+"""Launching the example FastMCP servers over streamable HTTP, with one or several worker processes.
+
+`FastMCP.run()` serves from a single process and event loop. `run_server()` can start
+several uvicorn worker processes that share one listening port. Each worker imports the
+server module itself, so each one builds its own (identical) state at startup. A stateful
+streamable-HTTP session only exists in the worker that created it, so more than one
+worker requires stateless HTTP. Stateless HTTP can still have sessions, kept in a store
+that every worker reads (see `mcp_sessions.py`).
+
+On SIGINT/SIGTERM uvicorn stops accepting connections and waits up to
+`MCP_SHUTDOWN_TIMEOUT` seconds for in-flight requests before closing them. `GET /ready`
+answers 200 once a worker has finished starting, for load balancer and orchestrator probes.
+
+Configuration comes from environment variables:
+
+    MCP_SERVER_HOST                    Interface to listen on (default 127.0.0.1)
+    MCP_SERVER_PORT                    Port to listen on (default 8000)
+    MCP_SERVER_WORKERS                 Worker processes (default 1)
+    MCP_STATELESS_HTTP                 "true" to serve every request without a session (default false)
+    MCP_SHUTDOWN_TIMEOUT               Seconds to wait for in-flight requests on shutdown (default 30)
+    MCP_SESSION_STORE                  Where stateless HTTP keeps sessions: "none" (default), "memory" or "sqlite"
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import uvicorn
+from mcp.server.fastmcp import FastMCP
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp
+from uvicorn.importer import import_from_string
+
+from .mcp_sessions import SessionMiddleware, create_session_store
+
+# Import string of the server's `FastMCP` instance, passed from `run_server` to the worker processes
+SERVER_APP_ENV = "MCP_SERVER_APP"
+EXAMPLES_DIR = Path(__file__).resolve().parent.parent
+
+
+def server_settings() -> dict:
+    """Return the `FastMCP` keyword arguments configured from the environment."""
+    return {
+        "host": os.getenv("MCP_SERVER_HOST", "127.0.0.1"),
+        "port": int(os.getenv("MCP_SERVER_PORT", "8000")),
+        "stateless_http": os.getenv("MCP_STATELESS_HTTP", "false").lower() == "true",
+    }
+
+
+def add_readiness_route(app: FastMCP, path: str = "/ready") -> None:
+    """Serve `GET path` with 200 once this worker is up. Call at import time, so every worker has it."""
+
+    @app.custom_route(path, methods=["GET"])
+    async def ready(request: Request) -> JSONResponse:
+        return JSONResponse({"status": "ready", "pid": os.getpid(), "stateless_http": app.settings.stateless_http})
+
+
+def http_app(app: FastMCP) -> ASGIApp:
+    """Return the streamable-HTTP ASGI app of `app`, with sessions from `MCP_SESSION_STORE` in stateless mode."""
+    asgi_app = app.streamable_http_app()
+    store = create_session_store()
+    if store is None:
+        return asgi_app
+    if not app.settings.stateless_http:
+        raise SystemExit("MCP_SESSION_STORE needs MCP_STATELESS_HTTP=true; stateful mode has its own sessions.")
+    return SessionMiddleware(asgi_app, store, path=app.settings.streamable_http_path)
+
+
+def worker_http_app() -> ASGIApp:
+    """Factory run by each worker process: import the server module and build its ASGI app."""
+    return http_app(import_from_string(os.environ[SERVER_APP_ENV]))
+
+
+def run_server(app: FastMCP, module_file: str) -> None:
+    """Serve `app`, defined at module level as `app` in `module_file`, with `MCP_SERVER_WORKERS` processes."""
+    workers = int(os.getenv("MCP_SERVER_WORKERS", "1"))
+    shutdown_timeout = int(os.getenv("MCP_SHUTDOWN_TIMEOUT", "30"))
+    settings = {
+        "host": app.settings.host,
+        "port": app.settings.port,
+        "log_level": app.settings.log_level.lower(),
+        "timeout_graceful_shutdown": shutdown_timeout,
+    }
+    if workers <= 1:
+        uvicorn.run(http_app(app), **settings)
+        return
+
+    if not app.settings.stateless_http:
+        raise SystemExit(
+            "MCP_SERVER_WORKERS > 1 needs MCP_STATELESS_HTTP=true: a stateful session only exists in the worker "
+            "that created it, and the next request may reach another worker."
+        )
+    store = create_session_store()
+    if store is not None and not store.shared:
+        raise SystemExit(
+            f"MCP_SESSION_STORE={store.name} keeps sessions in one worker; use a shared store such as sqlite."
+        )
+    # Workers are separate processes, so they get the app by import string and build it themselves
+    module = Path(module_file).resolve().relative_to(EXAMPLES_DIR).with_suffix("")
+    os.environ[SERVER_APP_ENV] = f"{'.'.join(module.parts)}:app"
+    uvicorn.run(
+        f"{__name__}:worker_http_app",
+        factory=True,
+        app_dir=str(EXAMPLES_DIR),
+        workers=workers,
+        **settings,
+    )
@@ -0,0 +1,250 @@
+"""MCP sessions kept in a store that every server worker can read, for stateless streamable HTTP.
+
+In stateful mode the MCP SDK keeps each session in the memory of the process that created
+it, so every request of a client must reach that same process. In stateless mode any
+process can serve any request, but the server no longer issues session IDs at all.
+
+`SessionMiddleware` puts sessions back on top of stateless mode: it answers a successful
+`initialize` with an `Mcp-Session-Id` header, records the session in a `SessionStore`, and
+checks the header of every later request against the store. With a store shared between
+processes, a session created by one worker is accepted by all of them, and survives a
+worker restart. Idle sessions expire after `MCP_SESSION_TTL` seconds; the client then gets
+a 404 and, as the MCP spec requires, starts a new session. A `DELETE` ends the session.
+
+Stores are registered by name in `SESSION_STORES`:
+
+    memory                             Sessions in this process only, for a single worker
+    sqlite                             Sessions in a SQLite file, shared by the workers of one host
+
+Configuration comes from environment variables:
+
+    MCP_SESSION_STORE                  "none" (default, no sessions), "memory" or "sqlite"
+    MCP_SESSION_DB                     SQLite file of the sqlite store (default .mcp_sessions.sqlite3)
+    MCP_SESSION_TTL                    Seconds a session stays valid without requests (default 3600)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import astuple, dataclass
+from typing import Protocol
+
+from mcp.server.streamable_http import MCP_SESSION_ID_HEADER
+from mcp.types import INVALID_REQUEST, JSONRPCError
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .ttl_cache import TTLCache
+
+# A session's last-seen time is written at most this often, so that busy sessions don't turn
+# every request into a write to the shared store
+TOUCH_INTERVAL = 30.0
+
+
+@dataclass
+class Session:
+    session_id: str
+    client_name: str
+    client_version: str
+    protocol_version: str
+    created_at: float
+    last_seen: float
+
+
+class SessionStore(Protocol):
+    """Where `SessionMiddleware` keeps sessions. `get` returns None for unknown and expired sessions."""
+
+    name: str
+    # Whether other worker processes see the sessions created in this one
+    shared: bool
+
+    def create(self, session: Session) -> None: ...
+
+    def get(self, session_id: str) -> Session | None: ...
+
+    def delete(self, session_id: str) -> None: ...
+
+
+class InMemorySessionStore:
+    """Sessions in a dict of this process, which other workers can't see."""
+
+    name = "memory"
+    shared = False
+
+    def __init__(self, ttl: float, max_sessions: int = 10_000):
+        self.ttl = ttl
+        self._sessions = TTLCache(max_entries=max_sessions, ttl=ttl)
+
+    @classmethod
+    def from_env(cls, ttl: float) -> InMemorySessionStore:
+        return cls(ttl=ttl)
+
+    def create(self, session: Session) -> None:
+        self._sessions.set(session.session_id, session)
+
+    def get(self, session_id: str) -> Session | None:
+        session = self._sessions.get(session_id)
+        if session is not None and time.time() - session.last_seen >= TOUCH_INTERVAL:
+            session.last_seen = time.time()
+            self._sessions.set(session_id, session)
+        return session
+
+    def delete(self, session_id: str) -> None:
+        self._sessions.pop(session_id)
+
+
+class SQLiteSessionStore:
+    """Sessions in a SQLite file, so every worker process on the host sees the same sessions."""
+
+    name = "sqlite"
+    shared = True
+
+    def __init__(self, path: str, ttl: float):
+        self.path = path
+        self.ttl = ttl
+        self._connection: sqlite3.Connection | None = None
+        # One connection shared by the worker threads the middleware calls the store from
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_env(cls, ttl: float) -> SQLiteSessionStore:
+        return cls(os.getenv("MCP_SESSION_DB", ".mcp_sessions.sqlite3"), ttl=ttl)
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        # Opened on first use, so each worker process gets its own connection
+        with self._lock:
+            if self._connection is None:
+                connection = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+                # WAL lets the workers read while one of them writes
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS sessions (session_id TEXT PRIMARY KEY, client_name TEXT, "
+                    "client_version TEXT, protocol_version TEXT, created_at REAL, last_seen REAL)"
+                )
+                self._connection = connection
+            return self._connection
+
+    def create(self, session: Session) -> None:
+        with self._lock:
+            # Creating a session is rare enough to also clear out the expired ones
+            self.connection.execute("DELETE FROM sessions WHERE last_seen < ?", (time.time() - self.ttl,))
+            self.connection.execute("INSERT INTO sessions VALUES (?, ?, ?, ?, ?, ?)", astuple(session))
+
+    def get(self, session_id: str) -> Session | None:
+        now = time.time()
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT * FROM sessions WHERE session_id = ? AND last_seen >= ?", (session_id, now - self.ttl)
+            ).fetchone()
+            if row is None:
+                return None
+            session = Session(*row)
+            if now - session.last_seen >= TOUCH_INTERVAL:
+                session.last_seen = now
+                self.connection.execute("UPDATE sessions SET last_seen = ? WHERE session_id = ?", (now, session_id))
+        return session
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self.connection.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+
+SESSION_STORES: dict[str, type] = {"memory": InMemorySessionStore, "sqlite": SQLiteSessionStore}
+
+
+def create_session_store(name: str | None = None) -> SessionStore | None:
+    """Return the session store called `name` (default `MCP_SESSION_STORE`), or None for no sessions."""
+    name = name or os.getenv("MCP_SESSION_STORE", "none")
+    if name == "none":
+        return None
+    if name not in SESSION_STORES:
+        raise ValueError(f"Unknown session store {name!r}, expected 'none' or one of {sorted(SESSION_STORES)}")
+    return SESSION_STORES[name].from_env(ttl=float(os.getenv("MCP_SESSION_TTL", "3600")))
+
+
+def _error_response(status_code: int, message: str) -> Response:
+    error = JSONRPCError(jsonrpc="2.0", id="server-error", error={"code": INVALID_REQUEST, "message": message})
+    return JSONResponse(error.model_dump(by_alias=True, exclude_none=True), status_code=status_code)
+
+
+class SessionMiddleware:
+    """ASGI middleware giving a stateless streamable-HTTP MCP app sessions kept in `store`."""
+
+    def __init__(self, app: ASGIApp, store: SessionStore, path: str = "/mcp"):
+        self.app = app
+        self.store = store
+        self.path = path.rstrip("/")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].rstrip("/") != self.path:
+            await self.app(scope, receive, send)
+            return
+
+        # The store is called from a worker thread: a SQLite write lock held by another worker would
+        # otherwise stall every request of this one
+        session_id = Headers(scope=scope).get(MCP_SESSION_ID_HEADER)
+        if session_id is not None:
+            if await asyncio.to_thread(self.store.get, session_id) is None:
+                await _error_response(404, "Not Found: Invalid or expired session ID")(scope, receive, send)
+            elif scope["method"] == "DELETE":
+                await asyncio.to_thread(self.store.delete, session_id)
+                await Response(status_code=200)(scope, receive, send)
+            else:
+                await self.app(scope, receive, send)
+            return
+        if scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+
+        # Read the body to find out whether this is the `initialize` request, then replay it to the app
+        body = b""
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get("body", b"")
+            more_body = message.get("more_body", False)
+        replayed = False
+
+        async def replay() -> Message:
+            nonlocal replayed
+            if replayed:
+                return await receive()
+            replayed = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        try:
+            request = json.loads(body)
+        except ValueError:
+            request = None
+        if not isinstance(request, dict) or request.get("method") != "initialize":
+            await _error_response(400, "Bad Request: Missing session ID")(scope, replay, send)
+            return
+
+        params = request.get("params") or {}
+        client_info = params.get("clientInfo") or {}
+
+        async def send_with_session(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                now = time.time()
+                session = Session(
+                    session_id=uuid.uuid4().hex,
+                    client_name=str(client_info.get("name", "")),
+                    client_version=str(client_info.get("version", "")),
+                    protocol_version=str(params.get("protocolVersion", "")),
+                    created_at=now,
+                    last_seen=now,
+                )
+                await asyncio.to_thread(self.store.create, session)
+                headers = [*message.get("headers", []), (MCP_SESSION_ID_HEADER.encode(), session.session_id.encode())]
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, replay, send_with_session)
@@ -0,0 +1,203 @@
+"""On-disk cache of the tool definitions of MCP servers, for the LangChain MCP clients.
+
+`MultiServerMCPClient.get_tools()` opens a session with every server (an HTTP handshake
+plus `tools/list`) before the agent can make its first model call. `get_cached_tools()`
+instead builds the LangChain tools from the definitions saved by an earlier run. Entries
+older than `MCP_TOOL_CACHE_REVALIDATE_AFTER` are also revalidated against the server by a
+task on the caller's event loop while the agent runs. When the loop ends first, the task is
+cancelled like any other, and the entry is revalidated on a later run.
+
+Each server gets its own cache file, named after the server and a digest of its URL and
+headers (so a different token gets its own entry, without the token being written to
+disk). The file holds the server's reported name and version, the tool definitions, and
+their digest. When revalidation finds a different version or digest, the file is updated
+and a warning says the tools changed; the running agent keeps the tools it started with.
+Entries older than `MCP_TOOL_CACHE_MAX_AGE` are refreshed before use.
+
+`openai_tool_definitions()` converts tools to the OpenAI function-calling format for
+`bind_tools`, converting each distinct tool schema only once per process.
+
+Configuration comes from environment variables:
+
+    MCP_TOOL_CACHE_MAX_AGE             Seconds a cached tool list is used without waiting for the server,
+                                       0 to always fetch the tools first (default 86400)
+    MCP_TOOL_CACHE_REVALIDATE_AFTER    Seconds a cached tool list is used without revalidating it (default 3600)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import time
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+from langchain_core.tools import BaseTool
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from langchain_mcp_adapters.client import MultiServerMCPClient
+from langchain_mcp_adapters.sessions import Connection, create_session
+from langchain_mcp_adapters.tools import convert_mcp_tool_to_langchain_tool
+from mcp.client.streamable_http import create_mcp_http_client
+from mcp.types import Tool
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = Path(__file__).resolve().parent.parent.parent / ".mcp_tool_cache"
+# Seconds a background revalidation may take
+REVALIDATE_TIMEOUT = 10.0
+
+# Revalidations in flight: the event loop only keeps weak references to tasks
+_revalidations: set[asyncio.Task] = set()
+
+# OpenAI definitions of the tools converted so far, by the identity of the tool's schema object (kept in the
+# value, so that its id can't be reused) and by the schema's content, for tools rebuilt from the same definition
+_definitions_by_identity: dict[tuple[str, int], tuple[object, dict]] = {}
+_definitions_by_content: dict[str, dict] = {}
+
+
+def cache_path(server_name: str, connection: Connection) -> Path:
+    """Return the cache file of a server, keyed by its URL and headers."""
+    identity = json.dumps({"url": connection.get("url"), "headers": connection.get("headers")}, sort_keys=True)
+    return CACHE_DIR / f"{server_name}-{hashlib.sha256(identity.encode()).hexdigest()[:16]}.json"
+
+
+def tools_digest(tools: list[dict]) -> str:
+    return hashlib.sha256(json.dumps(tools, sort_keys=True).encode()).hexdigest()
+
+
+async def fetch_tool_definitions(connection: Connection) -> dict:
+    """Open a session with the server and return its name, version and tool definitions as a cache entry."""
+    async with create_session(connection) as session:
+        initialized = await session.initialize()
+        tools = []
+        cursor = None
+        while True:
+            page = await session.list_tools(cursor=cursor)
+            tools += [tool.model_dump(mode="json", by_alias=True, exclude_none=True) for tool in page.tools]
+            cursor = page.nextCursor
+            if not cursor:
+                break
+    return {
+        "url": connection.get("url"),
+        "server_name": initialized.serverInfo.name,
+        "server_version": initialized.serverInfo.version,
+        "digest": tools_digest(tools),
+        "fetched_at": time.time(),
+        "tools": tools,
+    }
+
+
+def load_entry(path: Path) -> dict | None:
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def save_entry(path: Path, entry: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Write then rename, so a concurrent run never reads a half-written file
+    temporary = path.with_suffix(f".{os.getpid()}.tmp")
+    temporary.write_text(json.dumps(entry, indent=2))
+    temporary.replace(path)
+
+
+@contextlib.asynccontextmanager
+async def prepared_connection(connection: Connection) -> AsyncIterator[Connection]:
+    """Yield `connection` with its HTTP client already created, in a worker thread, and close the client after.
+
+    Creating the client loads the TLS certificates, which would otherwise hold up the agent
+    on the same event loop for longer than reading the cache saves.
+    """
+    if "url" not in connection:
+        yield connection
+        return
+    client_factory = connection.get("httpx_client_factory") or create_mcp_http_client
+    client = await asyncio.to_thread(client_factory, headers=connection.get("headers"), auth=connection.get("auth"))
+
+    def prepared_client(headers=None, timeout=None, auth=None):
+        if timeout is not None:
+            client.timeout = timeout
+        return client
+
+    try:
+        yield {**connection, "httpx_client_factory": prepared_client}
+    finally:
+        await client.aclose()
+
+
+async def revalidate(server_name: str, connection: Connection, path: Path, cached: dict) -> None:
+    """Fetch the server's tools, and update the cache file if its version or tools changed."""
+    try:
+        async with prepared_connection(connection) as prepared:
+            entry = await asyncio.wait_for(fetch_tool_definitions(prepared), REVALIDATE_TIMEOUT)
+    except Exception as e:
+        logger.warning("Could not revalidate the cached tools of MCP server %r: %s", server_name, e)
+        return
+    if entry["digest"] != cached["digest"] or entry["server_version"] != cached["server_version"]:
+        logger.warning("The tools of MCP server %r changed; the next run will use the new ones", server_name)
+    save_entry(path, entry)
+
+
+async def get_server_tools(
+    client: MultiServerMCPClient, server_name: str, max_age: float, revalidate_after: float
+) -> list[BaseTool]:
+    connection = client.connections[server_name]
+    path = cache_path(server_name, connection)
+    entry = load_entry(path) if max_age > 0 else None
+    age = time.time() - entry["fetched_at"] if entry is not None else None
+    if age is not None and age < max_age:
+        if age >= revalidate_after:
+            task = asyncio.create_task(revalidate(server_name, connection, path, entry))
+            _revalidations.add(task)
+            task.add_done_callback(_revalidations.discard)
+    else:
+        entry = await fetch_tool_definitions(connection)
+        save_entry(path, entry)
+    # Without a session, each tool opens its own session with the server when it is called. The rest of the
+    # options are the client's, as `client.get_tools()` passes them
+    return [
+        convert_mcp_tool_to_langchain_tool(
+            None,
+            Tool.model_validate(tool),
+            connection=connection,
+            callbacks=client.callbacks,
+            tool_interceptors=client.tool_interceptors,
+            server_name=server_name,
+            tool_name_prefix=client.tool_name_prefix,
+        )
+        for tool in entry["tools"]
+    ]
+
+
+async def get_cached_tools(client: MultiServerMCPClient) -> list[BaseTool]:
+    """Return the tools of every server of `client`, like `client.get_tools()`, from the cache when possible."""
+    max_age = float(os.getenv("MCP_TOOL_CACHE_MAX_AGE", "86400"))
+    revalidate_after = float(os.getenv("MCP_TOOL_CACHE_REVALIDATE_AFTER", "3600"))
+    server_tools = await asyncio.gather(
+        *(get_server_tools(client, name, max_age, revalidate_after) for name in client.connections)
+    )
+    return [tool for tools in server_tools for tool in tools]
+
+
+def openai_tool_definitions(tools: list[BaseTool]) -> list[dict]:
+    """Return the OpenAI function-calling definitions of `tools`, converting each distinct schema only once."""
+    definitions = []
+    for tool in tools:
+        identity = (tool.name, id(tool.args_schema))
+        cached = _definitions_by_identity.get(identity)
+        if cached is None or cached[0] is not tool.args_schema:
+            schema = tool.args_schema
+            if not isinstance(schema, dict):
+                schema = tool.tool_call_schema.model_json_schema()
+            content = json.dumps([tool.name, tool.description, schema], sort_keys=True, default=str)
+            key = hashlib.sha256(content.encode()).hexdigest()
+            if key not in _definitions_by_content:
+                _definitions_by_content[key] = convert_to_openai_tool(tool)
+            cached = _definitions_by_identity[identity] = (tool.args_schema, _definitions_by_content[key])
+        definitions.append(cached[1])
+    return definitions
@@ -0,0 +1,218 @@
+"""Shared, connection-pooled model clients for every framework used in the examples.
+
+Each example used to build its own OpenAI client from the `API_HOST` if/elif chain,
+which meant every script (and every agent inside a script) opened a fresh HTTP
+connection pool and a fresh credential. This module builds one long-lived
+`httpx` pool and one `openai` client per provider and hands out thin framework
+adapters on top of them, so TLS handshakes and pool warm-up are paid once per process.
+
+Pool behaviour can be tuned with environment variables:
+
+    MODEL_CLIENT_MAX_CONNECTIONS             Max open connections per provider (default 100)
+    MODEL_CLIENT_MAX_KEEPALIVE_CONNECTIONS   Max idle connections kept alive (default 20)
+    MODEL_CLIENT_KEEPALIVE_EXPIRY            Seconds an idle connection is kept (default 60)
+    MODEL_CLIENT_HTTP2                       Set to "true" to negotiate HTTP/2 (requires the `h2` package)
+
+Async clients are bound to the event loop that first uses them, so call
+`close_clients()` at the end of the `asyncio.run()` entry point.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import logging
+import os
+from functools import cache
+
+import httpx
+import openai
+
+from .azure_tokens import close_async_token_providers, get_async_token_provider, get_token_provider
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OLLAMA_ENDPOINT = "http://localhost:11434/v1"
+DEFAULT_OLLAMA_MODEL = "gemma4:e4b"
+DEFAULT_OLLAMA_EMBEDDING_MODEL = "nomic-embed-text"
+DEFAULT_OPENAI_MODEL = "gpt-4o"
+# The LangChain and LangGraph examples have always defaulted to the smaller model
+DEFAULT_LANGCHAIN_OPENAI_MODEL = "gpt-4o-mini"
+DEFAULT_OPENAI_EMBEDDING_MODEL = "text-embedding-3-large"
+
+
+def get_api_host() -> str:
+    """Return the configured provider: "azure", "ollama" or "openai"."""
+    api_host = os.getenv("API_HOST", "azure")
+    return api_host if api_host in ("azure", "ollama") else "openai"
+
+
+def get_model_name(default_openai_model: str = DEFAULT_OPENAI_MODEL) -> str:
+    """Return the chat model (or Azure deployment) name for the configured provider."""
+    api_host = get_api_host()
+    if api_host == "azure":
+        return os.environ["AZURE_OPENAI_CHAT_DEPLOYMENT"]
+    elif api_host == "ollama":
+        return os.environ.get("OLLAMA_MODEL", DEFAULT_OLLAMA_MODEL)
+    return os.environ.get("OPENAI_MODEL", default_openai_model)
+
+
+def get_embedding_model_name() -> str:
+    """Return the embedding model (or Azure deployment) name for the configured provider."""
+    api_host = get_api_host()
+    if api_host == "azure":
+        return os.environ["AZURE_OPENAI_EMBEDDING_DEPLOYMENT"]
+    elif api_host == "ollama":
+        return os.environ.get("OLLAMA_EMBEDDING_MODEL", DEFAULT_OLLAMA_EMBEDDING_MODEL)
+    return os.environ.get("OPENAI_EMBEDDING_MODEL", DEFAULT_OPENAI_EMBEDDING_MODEL)
+
+
+def get_base_url() -> str | None:
+    """Return the OpenAI-compatible base URL for the configured provider (None means api.openai.com)."""
+    api_host = get_api_host()
+    if api_host == "azure":
+        return os.environ["AZURE_OPENAI_ENDPOINT"] + "/openai/v1"
+    elif api_host == "ollama":
+        return os.environ.get("OLLAMA_ENDPOINT", DEFAULT_OLLAMA_ENDPOINT)
+    return None
+
+
+def _pool_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=int(os.getenv("MODEL_CLIENT_MAX_CONNECTIONS", "100")),
+        max_keepalive_connections=int(os.getenv("MODEL_CLIENT_MAX_KEEPALIVE_CONNECTIONS", "20")),
+        keepalive_expiry=float(os.getenv("MODEL_CLIENT_KEEPALIVE_EXPIRY", "60")),
+    )
+
+
+def _use_http2() -> bool:
+    if os.getenv("MODEL_CLIENT_HTTP2", "false").lower() != "true":
+        return False
+    if importlib.util.find_spec("h2") is None:
+        logger.warning("MODEL_CLIENT_HTTP2 is set but the 'h2' package is not installed, falling back to HTTP/1.1")
+        return False
+    return True
+
+
+_http_clients: dict[str, httpx.Client] = {}
+_async_http_clients: dict[str, httpx.AsyncClient] = {}
+
+
+def get_http_client(api_host: str | None = None) -> httpx.Client:
+    """Return the process-wide synchronous connection pool for a provider."""
+    api_host = api_host or get_api_host()
+    if api_host not in _http_clients:
+        _http_clients[api_host] = openai.DefaultHttpxClient(limits=_pool_limits(), http2=_use_http2())
+    return _http_clients[api_host]
+
+
+def get_async_http_client(api_host: str | None = None) -> httpx.AsyncClient:
+    """Return the process-wide asynchronous connection pool for a provider."""
+    api_host = api_host or get_api_host()
+    if api_host not in _async_http_clients:
+        _async_http_clients[api_host] = openai.DefaultAsyncHttpxClient(limits=_pool_limits(), http2=_use_http2())
+    return _async_http_clients[api_host]
+
+
+def get_api_key(is_async: bool = False):
+    """Return the API key for the configured provider.
+
+    For Azure this is the shared, cached token provider (a callable), which the OpenAI SDK
+    invokes before each request so the token is never baked into a client.
+    """
+    api_host = get_api_host()
+    if api_host == "azure":
+        return get_async_token_provider() if is_async else get_token_provider()
+    elif api_host == "ollama":
+        return "none"
+    return os.environ["OPENAI_API_KEY"]
+
+
+@cache
+def get_openai_client() -> openai.OpenAI:
+    """Return the shared synchronous OpenAI client for the configured provider."""
+    return openai.OpenAI(base_url=get_base_url(), api_key=get_api_key(), http_client=get_http_client())
+
+
+@cache
+def get_async_openai_client() -> openai.AsyncOpenAI:
+    """Return the shared asynchronous OpenAI client for the configured provider."""
+    return openai.AsyncOpenAI(
+        base_url=get_base_url(), api_key=get_api_key(is_async=True), http_client=get_async_http_client()
+    )
+
+
+async def close_clients() -> None:
+    """Close the shared async connection pools and credentials. Call once before the event loop exits."""
+    while _async_http_clients:
+        _, http_client = _async_http_clients.popitem()
+        await http_client.aclose()
+    get_async_openai_client.cache_clear()
+    await close_async_token_providers()
+
+
+# Framework adapters. Imports are deferred so each example only loads the framework it uses.
+
+
+def create_agent_framework_client(**kwargs):
+    """Return an Agent Framework `OpenAIChatClient` backed by the shared async client."""
+    from agent_framework.openai import OpenAIChatClient
+
+    return OpenAIChatClient(model=get_model_name(), async_client=get_async_openai_client(), **kwargs)
+
+
+def create_langchain_model(**kwargs):
+    """Return a LangChain `ChatOpenAI` model (Responses API) backed by the shared connection pools."""
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(
+        model=get_model_name(DEFAULT_LANGCHAIN_OPENAI_MODEL),
+        base_url=get_base_url(),
+        api_key=get_api_key(),
+        http_client=get_http_client(),
+        http_async_client=get_async_http_client(),
+        use_responses_api=True,
+        **kwargs,
+    )
+
+
+def create_openai_agents_model():
+    """Return an OpenAI Agents SDK `OpenAIResponsesModel` backed by the shared async client."""
+    from agents import OpenAIResponsesModel
+
+    return OpenAIResponsesModel(model=get_model_name(), openai_client=get_async_openai_client())
+
+
+def create_pydantic_ai_model():
+    """Return a PydanticAI `OpenAIChatModel` backed by the shared async client."""
+    from pydantic_ai.models.openai import OpenAIChatModel
+    from pydantic_ai.providers.openai import OpenAIProvider
+
+    return OpenAIChatModel(get_model_name(), provider=OpenAIProvider(openai_client=get_async_openai_client()))
+
+
+def create_llamaindex_llm(**kwargs):
+    """Return a LlamaIndex `OpenAILike` chat LLM backed by the shared sync and async clients."""
+    from llama_index.llms.openai_like import OpenAILike
+
+    return OpenAILike(
+        model=get_model_name(),
+        api_base=get_base_url(),
+        is_chat_model=True,
+        openai_client=get_openai_client(),
+        async_openai_client=get_async_openai_client(),
+        **kwargs,
+    )
+
+
+def create_llamaindex_embedding(**kwargs):
+    """Return a LlamaIndex `OpenAIEmbedding` backed by the shared sync and async clients."""
+    from llama_index.embeddings.openai import OpenAIEmbedding
+
+    class PooledOpenAIEmbedding(OpenAIEmbedding):
+        def _get_client(self) -> openai.OpenAI:
+            return get_openai_client()
+
+        def _get_aclient(self) -> openai.AsyncOpenAI:
+            return get_async_openai_client()
+
+    return PooledOpenAIEmbedding(model_name=get_embedding_model_name(), api_base=get_base_url(), **kwargs)
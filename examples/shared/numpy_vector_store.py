@@ -0,0 +1,294 @@
+"""A LlamaIndex vector store backed by a memory-mapped NumPy array.
+
+The default `SimpleVectorStore` persists embeddings as JSON lists of floats, so loading
+an index means parsing every number and holding it as a Python float. This store keeps
+the embeddings in a single `.npy` matrix that is memory-mapped on load, with a small
+JSON sidecar for the node ids, and answers queries with one matrix-vector product and
+`argpartition` for the top-k.
+
+Vectors are L2-normalised on insert so the dot product is the cosine similarity, and
+can be stored as float32, float16 or int8 (symmetric per-row quantisation) to trade
+precision for memory and disk.
+
+For large collections an approximate nearest-neighbour index (see `ann_index.py`) can be
+attached with `set_ann_index()`, so that queries only score the rows it selects.
+
+Alongside the vectors the store keeps a BM25 keyword index over the chunk text (see
+`bm25_index.py`), so keyword search is available without an embedding call.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import uuid
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from llama_index.core.bridge.pydantic import PrivateAttr
+from llama_index.core.schema import BaseNode, MetadataMode
+from llama_index.core.vector_stores.types import (
+    BasePydanticVectorStore,
+    VectorStoreQuery,
+    VectorStoreQueryMode,
+    VectorStoreQueryResult,
+)
+
+from .ann_index import AnnIndex
+from .bm25_index import BM25Index
+
+DTYPES = ("float32", "float16", "int8")
+VECTOR_STORE_FNAME = "default__vector_store"
+SCORE_BLOCK_ROWS = 65536
+
+
+def _paths(persist_path: str | os.PathLike) -> tuple[Path, Path, Path, Path]:
+    # StorageContext.persist passes ".../default__vector_store.json", keep the stem and use our own suffixes
+    base = Path(persist_path).with_suffix("")
+    return (
+        base.with_suffix(".npy"),
+        base.with_suffix(".scales.npy"),
+        base.with_suffix(".meta.json"),
+        base.with_suffix(".bm25.json"),
+    )
+
+
+def _save_replace(path: Path, array: np.ndarray) -> None:
+    # Never truncate a file in place: it may be memory-mapped by this or another store
+    tmp_path = path.with_suffix(".tmp.npy")
+    np.save(tmp_path, array)
+    os.replace(tmp_path, path)
+
+
+class NumpyVectorStore(BasePydanticVectorStore):
+    """Dense vector store holding normalised embeddings in a (memory-mapped) NumPy matrix."""
+
+    stores_text: bool = False
+    dtype: str = "float32"
+
+    _vectors: np.ndarray = PrivateAttr()
+    _scales: np.ndarray | None = PrivateAttr(default=None)
+    _node_ids: list[str] = PrivateAttr(default_factory=list)
+    _ref_doc_ids: list[str | None] = PrivateAttr(default_factory=list)
+    _positions: dict[str, int] = PrivateAttr(default_factory=dict)
+    _ann: AnnIndex | None = PrivateAttr(default=None)
+    _bm25: BM25Index | None = PrivateAttr(default_factory=BM25Index)
+    _instance_id: str = PrivateAttr(default_factory=lambda: uuid.uuid4().hex)
+    _mutations: int = PrivateAttr(default=0)
+
+    def __init__(self, dtype: str = "float32", **kwargs: Any):
+        if dtype not in DTYPES:
+            raise ValueError(f"dtype must be one of {DTYPES}, got: {dtype}")
+        super().__init__(dtype=dtype, **kwargs)
+        self._vectors = np.empty((0, 0), dtype=dtype)
+        self._scales = np.empty(0, dtype=np.float32) if dtype == "int8" else None
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "NumpyVectorStore"
+
+    @property
+    def client(self) -> None:
+        return None
+
+    def _encode(self, embeddings: np.ndarray) -> tuple[np.ndarray, np.ndarray | None]:
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        embeddings = embeddings / np.where(norms == 0, 1, norms)
+        if self.dtype != "int8":
+            return embeddings.astype(self.dtype), None
+        scales = np.abs(embeddings).max(axis=1) / 127
+        scales[scales == 0] = 1
+        return np.round(embeddings / scales[:, None]).astype(np.int8), scales.astype(np.float32)
+
+    def _decode(self, rows: np.ndarray, scales: np.ndarray | None) -> np.ndarray:
+        rows = rows.astype(np.float32)
+        return rows * scales[:, None] if scales is not None else rows
+
+    @property
+    def version(self) -> str:
+        """Changes whenever the stored vectors or the search method change, for keying result caches."""
+        return f"{self._instance_id}-{self._mutations}"
+
+    @property
+    def row_count(self) -> int:
+        return len(self._node_ids)
+
+    def decoded(self, rows: np.ndarray | slice) -> np.ndarray:
+        """Return the stored vectors at positions `rows` as float32."""
+        return self._decode(self._vectors[rows], self._scales[rows] if self._scales is not None else None)
+
+    def iter_decoded(self, block_rows: int = SCORE_BLOCK_ROWS):
+        """Yield every stored vector as float32, one block of rows at a time."""
+        for start in range(0, self.row_count, block_rows):
+            yield self.decoded(slice(start, start + block_rows))
+
+    def set_ann_index(self, ann: AnnIndex | None, persist_dir: str | os.PathLike | None = None) -> None:
+        """Search through `ann` instead of scoring every row, or exactly again if it is None.
+
+        With `persist_dir`, a previously saved index matching this store is loaded from there,
+        otherwise the index is built and saved there for the next run.
+        """
+        if ann is not None:
+            path = Path(persist_dir) / f"{VECTOR_STORE_FNAME}.{ann.name}.npz" if persist_dir is not None else None
+            if path is None or not ann.load(path, self):
+                ann.build(self)
+                if path is not None:
+                    ann.save(path)
+        self._ann = ann
+        self._mutations += 1
+
+    def add(self, nodes: list[BaseNode], **add_kwargs: Any) -> list[str]:
+        if not nodes:
+            return []
+        vectors, scales = self._encode(np.asarray([node.get_embedding() for node in nodes], dtype=np.float32))
+        if len(self._node_ids) == 0:
+            self._vectors = vectors
+            self._scales = scales
+        else:
+            # Concatenating copies a memory-mapped matrix into memory, which is fine for the add path
+            self._vectors = np.concatenate([self._vectors, vectors])
+            if scales is not None:
+                self._scales = np.concatenate([self._scales, scales])
+        for node in nodes:
+            self._positions[node.node_id] = len(self._node_ids)
+            self._node_ids.append(node.node_id)
+            self._ref_doc_ids.append(node.ref_doc_id)
+        if self._ann is not None:
+            self._ann.add(self._decode(vectors, scales))
+        if self._bm25 is not None:
+            self._bm25.add([node.get_content(metadata_mode=MetadataMode.NONE) for node in nodes])
+        self._mutations += 1
+        return [node.node_id for node in nodes]
+
+    def _keep(self, keep: np.ndarray) -> None:
+        self._vectors = self._vectors[keep]
+        if self._scales is not None:
+            self._scales = self._scales[keep]
+        self._node_ids = [node_id for node_id, kept in zip(self._node_ids, keep) if kept]
+        self._ref_doc_ids = [ref_doc_id for ref_doc_id, kept in zip(self._ref_doc_ids, keep) if kept]
+        self._positions = {node_id: i for i, node_id in enumerate(self._node_ids)}
+        if self._ann is not None:
+            self._ann.keep(keep)
+        if self._bm25 is not None:
+            self._bm25.keep(keep)
+        self._mutations += 1
+
+    def delete(self, ref_doc_id: str, **delete_kwargs: Any) -> None:
+        keep = np.array([doc_id != ref_doc_id for doc_id in self._ref_doc_ids], dtype=bool)
+        if not keep.all():
+            self._keep(keep)
+
+    def delete_nodes(self, node_ids: list[str] | None = None, filters: Any = None, **delete_kwargs: Any) -> None:
+        if filters is not None:
+            raise NotImplementedError("NumpyVectorStore does not support metadata filters")
+        remove = set(node_ids or [])
+        self._keep(np.array([node_id not in remove for node_id in self._node_ids], dtype=bool))
+
+    def clear(self) -> None:
+        self._keep(np.zeros(len(self._node_ids), dtype=bool))
+
+    def get(self, text_id: str) -> list[float] | None:
+        """Return the stored (normalised) embedding for a node id."""
+        position = self._positions.get(text_id)
+        if position is None:
+            return None
+        scales = self._scales[position : position + 1] if self._scales is not None else None
+        return self._decode(self._vectors[position : position + 1], scales)[0].tolist()
+
+    def similarities(self, query_embedding: list[float], rows: np.ndarray | None = None) -> np.ndarray:
+        """Return the cosine similarity of the query with every stored vector, or with `rows` only."""
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1)
+        vectors = self._vectors if rows is None else self._vectors[rows]
+        if vectors.dtype == np.float32:
+            scores = vectors @ query
+        else:
+            # NumPy has no fast float16/int8 matmul, so upcast one block at a time to bound memory
+            scores = np.empty(len(vectors), dtype=np.float32)
+            for start in range(0, len(vectors), SCORE_BLOCK_ROWS):
+                block = vectors[start : start + SCORE_BLOCK_ROWS]
+                scores[start : start + len(block)] = block.astype(np.float32) @ query
+        if self._scales is not None:
+            scores *= self._scales if rows is None else self._scales[rows]
+        return scores
+
+    def query(self, query: VectorStoreQuery, **kwargs: Any) -> VectorStoreQueryResult:
+        if query.filters is not None:
+            raise NotImplementedError("NumpyVectorStore does not support metadata filters")
+        if query.mode != VectorStoreQueryMode.DEFAULT:
+            raise NotImplementedError(f"NumpyVectorStore does not support query mode {query.mode}")
+        if len(self._node_ids) == 0:
+            return VectorStoreQueryResult(similarities=[], ids=[])
+
+        rows = None
+        if query.node_ids is not None:
+            rows = np.array([self._positions[node_id] for node_id in query.node_ids if node_id in self._positions])
+            if len(rows) == 0:
+                return VectorStoreQueryResult(similarities=[], ids=[])
+        elif self._ann is not None:
+            query_vector = np.asarray(query.query_embedding, dtype=np.float32)
+            rows = self._ann.candidates(query_vector / (np.linalg.norm(query_vector) or 1))
+            # Too few candidates to fill the top-k: fall back to exact search
+            if rows is not None and len(rows) < query.similarity_top_k:
+                rows = None
+        scores = self.similarities(query.query_embedding, rows)
+
+        k = min(query.similarity_top_k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        positions = top if rows is None else rows[top]
+        return VectorStoreQueryResult(
+            similarities=scores[top].tolist(), ids=[self._node_ids[position] for position in positions]
+        )
+
+    @property
+    def has_keyword_index(self) -> bool:
+        return self._bm25 is not None
+
+    def build_keyword_index(self, texts: dict[str, str], persist_dir: str | os.PathLike | None = None) -> None:
+        """(Re)build the BM25 index from the text of every stored node id, saving it to `persist_dir` if given."""
+        bm25 = BM25Index()
+        bm25.add([texts.get(node_id, "") for node_id in self._node_ids])
+        self._bm25 = bm25
+        self._mutations += 1
+        if persist_dir is not None:
+            bm25.save(_paths(Path(persist_dir) / f"{VECTOR_STORE_FNAME}.json")[3])
+
+    def keyword_search(self, query: str, top_k: int) -> tuple[VectorStoreQueryResult, float]:
+        """Return the BM25 top-k for `query`, and the share of query terms found in the best match."""
+        if self._bm25 is None:
+            raise ValueError("This store has no keyword index, call build_keyword_index() first")
+        results = self._bm25.search(query, top_k)
+        ids = [self._node_ids[row] for row in results.rows]
+        return VectorStoreQueryResult(similarities=results.scores.tolist(), ids=ids), results.top_coverage
+
+    def persist(self, persist_path: str, fs: Any = None) -> None:
+        vectors_path, scales_path, meta_path, bm25_path = _paths(persist_path)
+        vectors_path.parent.mkdir(parents=True, exist_ok=True)
+        _save_replace(vectors_path, np.ascontiguousarray(self._vectors))
+        if self._scales is not None:
+            _save_replace(scales_path, self._scales)
+        if self._bm25 is not None:
+            self._bm25.save(bm25_path)
+        meta = {"dtype": self.dtype, "node_ids": self._node_ids, "ref_doc_ids": self._ref_doc_ids}
+        meta_path.write_text(json.dumps(meta))
+
+    @classmethod
+    def from_persist_path(cls, persist_path: str, fs: Any = None) -> NumpyVectorStore:
+        vectors_path, scales_path, meta_path, bm25_path = _paths(persist_path)
+        meta = json.loads(meta_path.read_text())
+        store = cls(dtype=meta["dtype"])
+        # mmap_mode="r" maps the file instead of reading it, so loading is constant time
+        store._vectors = np.load(vectors_path, mmap_mode="r")
+        store._scales = np.load(scales_path) if meta["dtype"] == "int8" else None
+        store._node_ids = meta["node_ids"]
+        store._ref_doc_ids = meta["ref_doc_ids"]
+        store._positions = {node_id: i for i, node_id in enumerate(store._node_ids)}
+        # Stores persisted before keyword search existed have no BM25 index, see `build_keyword_index()`
+        store._bm25 = BM25Index.load(bm25_path) if bm25_path.exists() else None
+        return store
+
+    @classmethod
+    def from_persist_dir(cls, persist_dir: str | os.PathLike, fs: Any = None) -> NumpyVectorStore:
+        return cls.from_persist_path(str(Path(persist_dir) / f"{VECTOR_STORE_FNAME}.json"))
@@ -0,0 +1,101 @@
+"""Parallel PDF text extraction with a parsed-page cache on disk.
+
+Extracting text with pypdf is CPU-bound and was the slowest local step of an index build.
+`parse_pdf_pages` splits the pages of a PDF into ranges that are parsed in a process pool,
+and saves the text of every page under `example_data/.llama_index_storage/parsed_pages`,
+keyed by the file name and SHA-256. Rebuilding or re-ingesting an unchanged file then
+skips PDF parsing entirely.
+
+The example scripts build their indexes at import time, outside an `if __name__ == "__main__"`
+guard, so the pool uses the "fork" start method ("spawn" would run the script again in every
+worker). Forking a process while other threads hold locks can deadlock the children, so the
+pool is only used while the process has a single thread: `load_or_build_indexes` parses the
+PDFs before starting its threads. The pool is also only used on Linux: on macOS the system
+frameworks don't survive a fork, which is why CPython defaults to "spawn" there. Elsewhere,
+or when the PDF is short, the pages are parsed in-process instead.
+
+Configuration comes from environment variables:
+
+    PDF_PARSE_WORKERS                  Processes used to extract text, 1 to parse in-process (default: CPU count, max 8)
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+PARSED_PAGES_DIR = (
+    Path(__file__).resolve().parent.parent.parent / "example_data" / ".llama_index_storage" / "parsed_pages"
+)
+# Starting worker processes costs more than parsing a few pages
+PARALLEL_MIN_PAGES = 16
+
+
+@dataclass
+class ParsedPage:
+    label: str
+    text: str
+
+
+def _parse_range(path: str, start: int, stop: int) -> list[ParsedPage]:
+    import pypdf
+
+    reader = pypdf.PdfReader(path)
+    return [ParsedPage(label=reader.page_labels[i], text=reader.pages[i].extract_text()) for i in range(start, stop)]
+
+
+def _page_count(path: str) -> int:
+    import pypdf
+
+    return len(pypdf.PdfReader(path).pages)
+
+
+def get_parse_workers() -> int:
+    if "PDF_PARSE_WORKERS" in os.environ:
+        return max(1, int(os.environ["PDF_PARSE_WORKERS"]))
+    return min(os.cpu_count() or 1, 8)
+
+
+def _parse(source: Path) -> list[ParsedPage]:
+    n_pages = _page_count(str(source))
+    workers = min(get_parse_workers(), math.ceil(n_pages / PARALLEL_MIN_PAGES))
+    if workers <= 1 or not sys.platform.startswith("linux") or threading.active_count() > 1:
+        return _parse_range(str(source), 0, n_pages)
+
+    # A couple of ranges per worker evens out pages that take longer to parse
+    n_ranges = min(n_pages, workers * 2)
+    bounds = [round(i * n_pages / n_ranges) for i in range(n_ranges + 1)]
+    logger.info("Parsing %d pages of %s in %d processes", n_pages, source.name, workers)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork")) as executor:
+        futures = [executor.submit(_parse_range, str(source), start, stop) for start, stop in zip(bounds, bounds[1:])]
+        return [page for future in futures for page in future.result()]
+
+
+def parse_pdf_pages(source: Path, source_sha256: str, cache_dir: Path = PARSED_PAGES_DIR) -> list[ParsedPage]:
+    """Return the label and text of every page of `source`, from the cache when the file is unchanged."""
+    cache_path = cache_dir / f"{source.name}-{source_sha256}.json"
+    try:
+        return [ParsedPage(**page) for page in json.loads(cache_path.read_text())]
+    except (FileNotFoundError, json.JSONDecodeError, TypeError):
+        pass
+
+    pages = _parse(source)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps([asdict(page) for page in pages]))
+    os.replace(tmp_path, cache_path)
+    # Text parsed from earlier versions of this file will never be read again
+    for path in cache_dir.glob(f"{source.name}-*.json"):
+        if path != cache_path:
+            path.unlink(missing_ok=True)
+    return pages
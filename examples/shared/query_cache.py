@@ -0,0 +1,108 @@
+"""LRU + TTL caches for query embeddings and retrieval results.
+
+An agent often asks its query engine tools the same sub-question more than once in a
+run. `CachedRetriever` wraps an index retriever so that a repeated question reuses the
+nodes retrieved last time, and a question asked of several indexes is embedded once.
+
+Keys use the normalised query text (case-folded, whitespace collapsed, trailing
+punctuation dropped). Retrieval results are also keyed on the index version, so any
+change to the vector store makes the old results unreachable instead of stale.
+
+Configuration comes from environment variables:
+
+    QUERY_CACHE_MAX_ENTRIES            Entries kept per cache before evicting the least recently used (default 1024)
+    QUERY_CACHE_TTL                    Seconds an entry stays valid (default 600)
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from functools import cache
+from typing import Any
+
+from llama_index.core import Settings, VectorStoreIndex
+from llama_index.core.base.base_retriever import BaseRetriever
+from llama_index.core.schema import NodeWithScore, QueryBundle
+
+from .ttl_cache import CacheStats, TTLCache
+
+
+def normalize_query(query: str) -> str:
+    return re.sub(r"\s+", " ", query).strip().rstrip("?!.").strip().casefold()
+
+
+def _new_cache() -> TTLCache:
+    return TTLCache(
+        max_entries=int(os.getenv("QUERY_CACHE_MAX_ENTRIES", "1024")),
+        ttl=float(os.getenv("QUERY_CACHE_TTL", "600")),
+    )
+
+
+@cache
+def get_embedding_cache() -> TTLCache:
+    """Return the process-wide cache of query embeddings, shared by every index."""
+    return _new_cache()
+
+
+@cache
+def get_retrieval_cache() -> TTLCache:
+    """Return the process-wide cache of retrieved nodes."""
+    return _new_cache()
+
+
+def index_version(index: VectorStoreIndex) -> str:
+    """Return a key that changes whenever the contents (or search method) of the index change."""
+    return getattr(index.vector_store, "version", None) or f"{index.index_id}-{id(index.vector_store)}"
+
+
+class CachedRetriever(BaseRetriever):
+    """Retriever for a vector index that caches query embeddings and retrieved nodes."""
+
+    def __init__(self, index: VectorStoreIndex, similarity_top_k: int = 2, **retriever_kwargs: Any):
+        self._index = index
+        self._retriever = index.as_retriever(similarity_top_k=similarity_top_k, **retriever_kwargs)
+        self._embed_model = index._embed_model or Settings.embed_model
+        self._similarity_top_k = similarity_top_k
+        super().__init__(callback_manager=self._retriever.callback_manager)
+
+    def _embedding_key(self, query: str) -> tuple:
+        return (self._embed_model.model_name, normalize_query(query))
+
+    def _retrieval_key(self, query: str) -> tuple:
+        return (index_version(self._index), self._similarity_top_k, normalize_query(query))
+
+    @staticmethod
+    def _copy(nodes: list[NodeWithScore]) -> list[NodeWithScore]:
+        # Postprocessors may change scores in place, so never hand out the cached objects themselves
+        return [node.model_copy() for node in nodes]
+
+    def _retrieve(self, query_bundle: QueryBundle) -> list[NodeWithScore]:
+        retrieval_key = self._retrieval_key(query_bundle.query_str)
+        nodes = get_retrieval_cache().get(retrieval_key)
+        if nodes is None:
+            embedding_key = self._embedding_key(query_bundle.query_str)
+            embedding = query_bundle.embedding or get_embedding_cache().get(embedding_key)
+            if embedding is None:
+                embedding = self._embed_model.get_agg_embedding_from_queries(query_bundle.embedding_strs)
+                get_embedding_cache().set(embedding_key, embedding)
+            nodes = self._retriever.retrieve(QueryBundle(query_str=query_bundle.query_str, embedding=embedding))
+            get_retrieval_cache().set(retrieval_key, nodes)
+        return self._copy(nodes)
+
+    async def _aretrieve(self, query_bundle: QueryBundle) -> list[NodeWithScore]:
+        retrieval_key = self._retrieval_key(query_bundle.query_str)
+        nodes = get_retrieval_cache().get(retrieval_key)
+        if nodes is None:
+            embedding_key = self._embedding_key(query_bundle.query_str)
+            embedding = query_bundle.embedding or get_embedding_cache().get(embedding_key)
+            if embedding is None:
+                embedding = await self._embed_model.aget_agg_embedding_from_queries(query_bundle.embedding_strs)
+                get_embedding_cache().set(embedding_key, embedding)
+            nodes = await self._retriever.aretrieve(QueryBundle(query_str=query_bundle.query_str, embedding=embedding))
+            get_retrieval_cache().set(retrieval_key, nodes)
+        return self._copy(nodes)
+
+
+def query_cache_stats() -> dict[str, CacheStats]:
+    return {"embeddings": get_embedding_cache().stats, "retrievals": get_retrieval_cache().stats}
@@ -0,0 +1,507 @@
+"""A LangGraph checkpointer that keeps conversations in a SQLite file, storing message lists as deltas.
+
+`InMemorySaver` keeps every checkpoint of every thread in process memory, and each step
+stores a full copy of every channel that changed: a conversation of n messages holds n
+copies of its history, all lost when the process exits. `SQLiteCheckpointer` writes
+checkpoints to a SQLite file instead, so a thread picks up where it left off after a
+restart, and stores a list channel (such as `messages`) that only grew since its previous
+version as the items appended to it, pointing at that version. Every
+`CHECKPOINT_SNAPSHOT_EVERY` versions it stores a full copy again, so reading a channel never
+goes back through more than that many deltas. Values of other types, and lists that were
+edited rather than appended to, are stored in full.
+
+Retention bounds the file: compaction keeps the newest `CHECKPOINT_KEEP` checkpoints of a
+thread, deletes the older ones with their pending writes, and deletes the channel values
+that no remaining checkpoint reaches. A thread is compacted on its first checkpoint after
+the file is opened, then every `CHECKPOINT_KEEP` checkpoints. Threads with no checkpoint in
+the last `CHECKPOINT_TTL` seconds are deleted when the file is opened and on compaction.
+
+The async methods run the SQLite calls in a worker thread, so graph runs sharing an event
+loop don't wait on each other's disk writes.
+
+`thread_id()` gives each run of an example its own thread, named after the script, so runs
+don't pile up in one conversation and different graphs never share a thread. Set
+`CHECKPOINT_THREAD` to the thread printed by a run to resume that conversation instead.
+
+Configuration comes from environment variables:
+
+    CHECKPOINT_DB                      SQLite file of the checkpoints (default .langgraph_checkpoints.sqlite3
+                                       at the root of the repository)
+    CHECKPOINT_KEEP                    Checkpoints kept per thread, 0 to keep them all (default 100)
+    CHECKPOINT_TTL                     Seconds a thread is kept after its last checkpoint, 0 for ever
+                                       (default 2592000, 30 days)
+    CHECKPOINT_THREAD                  Thread of an earlier run to resume, as printed by that run
+                                       (default a new thread on every run)
+    CHECKPOINT_SNAPSHOT_EVERY          Versions of a list channel between full copies (default 20)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from collections.abc import AsyncIterator, Iterator, Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    SerializerProtocol,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+
+from .ttl_cache import TTLCache
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS checkpoints (thread_id TEXT, checkpoint_ns TEXT, checkpoint_id TEXT, "
+    "parent_checkpoint_id TEXT, type TEXT, checkpoint BLOB, metadata_type TEXT, metadata BLOB, created_at REAL, "
+    "PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id))",
+    # A row with a base_version holds the items appended to the list stored at base_version
+    "CREATE TABLE IF NOT EXISTS blobs (thread_id TEXT, checkpoint_ns TEXT, channel TEXT, version TEXT, "
+    "type TEXT, value BLOB, base_version TEXT, PRIMARY KEY (thread_id, checkpoint_ns, channel, version))",
+    "CREATE TABLE IF NOT EXISTS writes (thread_id TEXT, checkpoint_ns TEXT, checkpoint_id TEXT, task_id TEXT, "
+    "idx INTEGER, channel TEXT, type TEXT, value BLOB, task_path TEXT, "
+    "PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx))",
+)
+
+DEFAULT_DB = Path(__file__).resolve().parent.parent.parent / ".langgraph_checkpoints.sqlite3"
+# Seconds a thread is kept after its last checkpoint
+DEFAULT_TTL = 30 * 24 * 3600
+# Threads whose latest list values are remembered to compute deltas against
+RECENT_THREADS = 256
+
+
+@dataclass
+class _StoredList:
+    """The serialized items of the latest stored version of a list channel, and its deltas since a full copy."""
+
+    version: str
+    items: list[tuple[str, bytes]]
+    depth: int
+
+
+@dataclass
+class _ThreadState:
+    checkpoints_since_compaction: int = 0
+    lists: dict[tuple[str, str], _StoredList] = field(default_factory=dict)
+
+
+class SQLiteCheckpointer(BaseCheckpointSaver[str]):
+    """Checkpoints in a SQLite file, with list channels stored as deltas and old checkpoints compacted away."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        keep: int = 100,
+        ttl: float = DEFAULT_TTL,
+        snapshot_every: int = 20,
+        *,
+        serde: SerializerProtocol | None = None,
+    ):
+        super().__init__(serde=serde)
+        self.path = path
+        self.keep = keep
+        self.ttl = ttl
+        self.snapshot_every = snapshot_every
+        self._connection: sqlite3.Connection | None = None
+        # One connection shared by the threads LangGraph saves checkpoints from
+        self._lock = threading.RLock()
+        self._threads = TTLCache(max_entries=RECENT_THREADS, ttl=float("inf"))
+
+    @classmethod
+    def from_env(cls) -> SQLiteCheckpointer:
+        return cls(
+            os.getenv("CHECKPOINT_DB", DEFAULT_DB),
+            keep=int(os.getenv("CHECKPOINT_KEEP", "100")),
+            ttl=float(os.getenv("CHECKPOINT_TTL", DEFAULT_TTL)),
+            snapshot_every=int(os.getenv("CHECKPOINT_SNAPSHOT_EVERY", "20")),
+        )
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        with self._lock:
+            if self._connection is None:
+                connection = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute("PRAGMA synchronous=NORMAL")
+                for statement in SCHEMA:
+                    connection.execute(statement)
+                self._connection = connection
+                self.delete_expired_threads()
+            return self._connection
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def get_next_version(self, current: str | None, channel: None) -> str:
+        # Same scheme as InMemorySaver: a zero-padded counter, so versions also sort as text
+        current_v = 0 if current is None else int(str(current).split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+    def _load_value(self, thread_id: str, checkpoint_ns: str, channel: str, version: str) -> tuple[bool, Any]:
+        """Return whether the channel has a value at `version`, and the value, applying any deltas."""
+        deltas = []
+        while True:
+            row = self.connection.execute(
+                "SELECT type, value, base_version FROM blobs "
+                "WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?",
+                (thread_id, checkpoint_ns, channel, version),
+            ).fetchone()
+            if row is None:
+                return False, None
+            value_type, value, version = row
+            if version is None:
+                break
+            deltas.append((value_type, value))
+        if value_type == "empty":
+            return False, None
+        loaded = self.serde.loads_typed((value_type, value))
+        for delta in reversed(deltas):
+            loaded = loaded + self.serde.loads_typed(delta)
+        return True, loaded
+
+    def _to_tuple(self, thread_id: str, checkpoint_ns: str, row: tuple) -> CheckpointTuple:
+        checkpoint_id, parent_checkpoint_id, checkpoint_type, checkpoint_blob, metadata_type, metadata_blob = row
+        checkpoint: Checkpoint = self.serde.loads_typed((checkpoint_type, checkpoint_blob))
+        channel_values = {}
+        for channel, version in checkpoint["channel_versions"].items():
+            found, value = self._load_value(thread_id, checkpoint_ns, channel, str(version))
+            if found:
+                channel_values[channel] = value
+        # In the order live execution applies a super-step's writes, so order-sensitive reducers replay them
+        # to the same value
+        writes = self.connection.execute(
+            "SELECT task_id, idx, channel, type, value, task_path FROM writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_path, task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint={**checkpoint, "channel_values": channel_values},
+            metadata=self.serde.loads_typed((metadata_type, metadata_blob)),
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_checkpoint_id,
+                    }
+                }
+                if parent_checkpoint_id
+                else None
+            ),
+            pending_writes=[
+                (task_id, channel, self.serde.loads_typed((value_type, value)))
+                for task_id, _, channel, value_type, value, _ in writes
+            ],
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        query = (
+            "SELECT checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata FROM checkpoints "
+            "WHERE thread_id = ? AND checkpoint_ns = ?"
+        )
+        with self._lock:
+            if checkpoint_id := get_checkpoint_id(config):
+                row = self.connection.execute(
+                    f"{query} AND checkpoint_id = ?", (thread_id, checkpoint_ns, checkpoint_id)
+                ).fetchone()
+            else:
+                row = self.connection.execute(
+                    f"{query} ORDER BY checkpoint_id DESC LIMIT 1", (thread_id, checkpoint_ns)
+                ).fetchone()
+            return self._to_tuple(thread_id, checkpoint_ns, row) if row is not None else None
+
+    def list(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> Iterator[CheckpointTuple]:
+        conditions, parameters = [], []
+        if config:
+            conditions.append("thread_id = ?")
+            parameters.append(config["configurable"]["thread_id"])
+            if (checkpoint_ns := config["configurable"].get("checkpoint_ns")) is not None:
+                conditions.append("checkpoint_ns = ?")
+                parameters.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                conditions.append("checkpoint_id = ?")
+                parameters.append(checkpoint_id)
+        if before and (before_checkpoint_id := get_checkpoint_id(before)):
+            conditions.append("checkpoint_id < ?")
+            parameters.append(before_checkpoint_id)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, "
+                f"metadata_type, metadata FROM checkpoints {where} ORDER BY checkpoint_id DESC",
+                parameters,
+            ).fetchall()
+        for thread_id, checkpoint_ns, *row in rows:
+            if limit is not None and limit <= 0:
+                break
+            # Metadata is serialized, so it is filtered here rather than in SQL
+            if filter:
+                metadata = self.serde.loads_typed((row[4], row[5]))
+                if not all(metadata.get(key) == value for key, value in filter.items()):
+                    continue
+            if limit is not None:
+                limit -= 1
+            with self._lock:
+                checkpoint_tuple = self._to_tuple(thread_id, checkpoint_ns, tuple(row))
+            yield checkpoint_tuple
+
+    def _blob_row(
+        self, thread: _ThreadState, thread_id: str, checkpoint_ns: str, channel: str, version: str, values: dict
+    ) -> tuple:
+        """Return the blobs row of a channel's new version, as the appended items when it is a list that grew."""
+        key = (checkpoint_ns, channel)
+        if channel not in values:
+            thread.lists.pop(key, None)
+            return (thread_id, checkpoint_ns, channel, version, "empty", b"", None)
+        value = values[channel]
+        if not isinstance(value, list):
+            thread.lists.pop(key, None)
+            return (thread_id, checkpoint_ns, channel, version, *self.serde.dumps_typed(value), None)
+
+        # Serializing the items one by one tells which ones are unchanged since the previous version
+        items = [self.serde.dumps_typed(item) for item in value]
+        previous = thread.lists.get(key)
+        if (
+            previous is not None
+            and previous.depth < self.snapshot_every
+            and items[: len(previous.items)] == previous.items
+            # Another process may have compacted the previous version away
+            and self.connection.execute(
+                "SELECT 1 FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?",
+                (thread_id, checkpoint_ns, channel, previous.version),
+            ).fetchone()
+        ):
+            thread.lists[key] = _StoredList(version, items, previous.depth + 1)
+            delta = self.serde.dumps_typed(value[len(previous.items) :])
+            return (thread_id, checkpoint_ns, channel, version, *delta, previous.version)
+        thread.lists[key] = _StoredList(version, items, 0)
+        return (thread_id, checkpoint_ns, channel, version, *self.serde.dumps_typed(value), None)
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        saved = checkpoint.copy()
+        values = saved.pop("channel_values")
+        with self._lock:
+            thread = self._threads.get(thread_id)
+            first_checkpoint = thread is None
+            if first_checkpoint:
+                thread = _ThreadState()
+                self._threads.set(thread_id, thread)
+            try:
+                with self.connection:
+                    self.connection.executemany(
+                        "INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        [
+                            self._blob_row(thread, thread_id, checkpoint_ns, channel, str(version), values)
+                            for channel, version in new_versions.items()
+                        ],
+                    )
+                    self.connection.execute(
+                        "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (
+                            thread_id,
+                            checkpoint_ns,
+                            checkpoint["id"],
+                            config["configurable"].get("checkpoint_id"),
+                            *self.serde.dumps_typed(saved),
+                            *self.serde.dumps_typed(get_checkpoint_metadata(config, metadata)),
+                            time.time(),
+                        ),
+                    )
+            except BaseException:
+                # The remembered list versions may not have been stored
+                self._threads.pop(thread_id)
+                raise
+            thread.checkpoints_since_compaction += 1
+            if self.keep and (first_checkpoint or thread.checkpoints_since_compaction >= self.keep):
+                self.compact(thread_id)
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        # Special writes (errors, interrupts...) replace earlier ones of the task, regular writes are kept
+        verb = "INSERT OR REPLACE" if all(channel in WRITES_IDX_MAP for channel, _ in writes) else "INSERT OR IGNORE"
+        rows = [
+            (
+                thread_id,
+                checkpoint_ns,
+                checkpoint_id,
+                task_id,
+                WRITES_IDX_MAP.get(channel, idx),
+                channel,
+                *self.serde.dumps_typed(value),
+                task_path,
+            )
+            for idx, (channel, value) in enumerate(writes)
+        ]
+        with self._lock, self.connection:
+            self.connection.executemany(f"{verb} INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock, self.connection:
+            for table in ("checkpoints", "blobs", "writes"):
+                self.connection.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+            self._threads.pop(thread_id)
+
+    def delete_expired_threads(self) -> None:
+        """Delete the threads whose latest checkpoint is older than `ttl` seconds."""
+        if not self.ttl:
+            return
+        with self._lock:
+            expired = self.connection.execute(
+                "SELECT thread_id FROM checkpoints GROUP BY thread_id HAVING MAX(created_at) < ?",
+                (time.time() - self.ttl,),
+            ).fetchall()
+            for (thread_id,) in expired:
+                self.delete_thread(thread_id)
+
+    def compact(self, thread_id: str) -> None:
+        """Keep the newest `keep` checkpoints of each namespace of the thread, and the values they reach."""
+        with self._lock:
+            with self.connection:
+                rows = self.connection.execute(
+                    "SELECT checkpoint_ns, checkpoint_id, type, checkpoint FROM checkpoints "
+                    "WHERE thread_id = ? ORDER BY checkpoint_ns, checkpoint_id DESC",
+                    (thread_id,),
+                ).fetchall()
+                kept_per_ns: dict[str, int] = {}
+                dropped = []
+                reachable = set()
+                for checkpoint_ns, checkpoint_id, checkpoint_type, checkpoint_blob in rows:
+                    kept_per_ns[checkpoint_ns] = kept_per_ns.get(checkpoint_ns, 0) + 1
+                    if kept_per_ns[checkpoint_ns] > self.keep:
+                        dropped.append((thread_id, checkpoint_ns, checkpoint_id))
+                        continue
+                    checkpoint = self.serde.loads_typed((checkpoint_type, checkpoint_blob))
+                    for channel, version in checkpoint["channel_versions"].items():
+                        reachable.add((checkpoint_ns, channel, str(version)))
+
+                if dropped:
+                    for table in ("checkpoints", "writes"):
+                        self.connection.executemany(
+                            f"DELETE FROM {table} WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                            dropped,
+                        )
+                    # Deltas also need the versions they were computed against
+                    bases = {
+                        (checkpoint_ns, channel, version): base_version
+                        for checkpoint_ns, channel, version, base_version in self.connection.execute(
+                            "SELECT checkpoint_ns, channel, version, base_version FROM blobs WHERE thread_id = ?",
+                            (thread_id,),
+                        )
+                    }
+                    pending = list(reachable)
+                    while pending:
+                        checkpoint_ns, channel, version = pending.pop()
+                        base_version = bases.get((checkpoint_ns, channel, version))
+                        if base_version is not None and (checkpoint_ns, channel, base_version) not in reachable:
+                            reachable.add((checkpoint_ns, channel, base_version))
+                            pending.append((checkpoint_ns, channel, base_version))
+                    self.connection.executemany(
+                        "DELETE FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?",
+                        [(thread_id, *blob) for blob in bases if blob not in reachable],
+                    )
+            if thread := self._threads.get(thread_id):
+                thread.checkpoints_since_compaction = 0
+            self.delete_expired_threads()
+
+    async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        checkpoint_tuples = await asyncio.to_thread(
+            lambda: [*self.list(config, filter=filter, before=before, limit=limit)]
+        )
+        for checkpoint_tuple in checkpoint_tuples:
+            yield checkpoint_tuple
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+
+def thread_id(script: str) -> str:
+    """Return the thread for a run of `script`: the one named by `CHECKPOINT_THREAD`, or a new one.
+
+    The id starts with the script's name, so examples sharing the file never share a thread.
+    """
+    prefix = f"{Path(script).stem}-"
+    name = os.getenv("CHECKPOINT_THREAD") or uuid.uuid4().hex[:12]
+    return name if name.startswith(prefix) else prefix + name
@@ -0,0 +1,91 @@
+"""Per-tool result memoisation for FastMCP servers.
+
+Agents often repeat the exact same tool call: a retry after a timeout, or several agents
+asking for the same city and dates. `memoize_tool` caches a tool's serialised result for
+a TTL, keyed on its arguments (defaults filled in, any injected `Context` left out), with
+least-recently-used eviction past a maximum number of entries. Each tool gets its own cache.
+
+Every result reports whether it came from the cache in the `_meta` of the tool response:
+
+    {"cache": {"status": "hit", "ttl_seconds": 60.0, "hits": 3, "misses": 1}}
+
+A tool with side effects besides its result, such as progress notifications, names the
+argument that turns them on in `bypass_when`: calls with that argument set are always run,
+and only refresh the cache. Errors are never cached. Configuration comes from environment variables:
+
+    TOOL_CACHE_TTL                     Seconds a result stays cached, 0 to disable caching (default 60)
+    TOOL_CACHE_MAX_ENTRIES             Results kept per tool before evicting the least recently used (default 1024)
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import json
+import os
+from collections.abc import Awaitable, Callable
+from typing import Any, get_type_hints
+
+from mcp.server.fastmcp import Context
+from mcp.types import CallToolResult, TextContent
+from pydantic import TypeAdapter
+
+from .ttl_cache import TTLCache
+
+
+def memoize_tool(
+    func: Callable[..., Awaitable[Any]] | None = None,
+    *,
+    ttl: float | None = None,
+    max_entries: int | None = None,
+    bypass_when: str | None = None,
+):
+    """Cache the results of an async FastMCP tool. Apply it below `@app.tool()`.
+
+    The wrapped tool keeps its signature and output schema, and returns a `CallToolResult`
+    carrying the same structured and text content as the undecorated tool, plus the cache status.
+    Fields that are None are left out, so every optional field of the output needs a default.
+    Calls where the argument named `bypass_when` is truthy don't read the cache.
+    """
+    if func is None:
+        return functools.partial(memoize_tool, ttl=ttl, max_entries=max_entries, bypass_when=bypass_when)
+
+    ttl = float(os.getenv("TOOL_CACHE_TTL", "60")) if ttl is None else ttl
+    max_entries = int(os.getenv("TOOL_CACHE_MAX_ENTRIES", "1024")) if max_entries is None else max_entries
+    cache = TTLCache(max_entries=max_entries, ttl=ttl)
+    signature = inspect.signature(func)
+    output = TypeAdapter(get_type_hints(func, include_extras=True)["return"])
+
+    def to_result(structured: dict, status: str) -> CallToolResult:
+        meta = {"status": status, "ttl_seconds": ttl, "hits": cache.stats.hits, "misses": cache.stats.misses}
+        return CallToolResult(
+            # Without indentation or escaped non-ASCII characters, which only add tokens for the model
+            content=[TextContent(type="text", text=json.dumps(structured, separators=(",", ":"), ensure_ascii=False))],
+            structuredContent=structured,
+            _meta={"cache": meta},
+        )
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs) -> CallToolResult:
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        # The request context FastMCP injects differs on every call, and doesn't change the result
+        arguments = {name: value for name, value in bound.arguments.items() if not isinstance(value, Context)}
+        bypass = bool(bypass_when and arguments.get(bypass_when))
+        if bypass_when:
+            # Whether the side effects were asked for doesn't change the result either
+            arguments.pop(bypass_when, None)
+        key = json.dumps(arguments, sort_keys=True, default=str)
+        if ttl > 0 and not bypass:
+            structured = cache.get(key)
+            if structured is not None:
+                return to_result(structured, "hit")
+        # Unset optional fields would only add tokens
+        structured = output.dump_python(await func(*args, **kwargs), mode="json", exclude_none=True)
+        if ttl <= 0:
+            return to_result(structured, "bypass")
+        cache.set(key, structured)
+        return to_result(structured, "bypass" if bypass else "miss")
+
+    wrapper.cache = cache
+    return wrapper
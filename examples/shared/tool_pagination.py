@@ -0,0 +1,41 @@
+"""Opaque cursors for paginated MCP tool results.
+
+A tool returns one page of results plus a `next_cursor`, which the client passes back
+to get the following page. The cursor holds the offset of that page and a digest of the
+search it belongs to, so a cursor reused with different filters is rejected instead of
+silently paging through another result list. Cursors stay valid as long as the results
+are deterministic for a given search, as with the precomputed hotel inventory.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+
+from .tool_validation import DEFAULT_MESSAGES, ValidationMessages
+
+
+def search_key(**filters) -> str:
+    """Return a short digest identifying a search by its filters."""
+    encoded = json.dumps(filters, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+def encode_cursor(offset: int, key: str) -> str:
+    return base64.urlsafe_b64encode(f"{offset}:{key}".encode()).decode()
+
+
+def decode_cursor(cursor: str | None, key: str, messages: ValidationMessages = DEFAULT_MESSAGES) -> int:
+    """Return the offset stored in `cursor` (0 for no cursor), checking that it belongs to the search `key`."""
+    if not cursor:
+        return 0
+    # Bad base64, bad UTF-8 and a missing or non-numeric offset all raise ValueError
+    try:
+        offset, cursor_key = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+        offset = int(offset)
+    except ValueError:
+        raise ValueError(messages.invalid_cursor) from None
+    if cursor_key != key or offset < 0:
+        raise ValueError(messages.invalid_cursor)
+    return offset
@@ -0,0 +1,52 @@
+"""Argument validation shared by the MCP server tools.
+
+Everything that doesn't depend on the arguments is built once, at import: the date
+pattern is compiled at module level, dates are parsed with `date.fromisoformat` (a
+C-level parser, unlike `datetime.strptime`, which goes through `_strptime` and its
+locale-dependent regexes on every call), and the error messages are fixed per server.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from datetime import date
+
+# `date.fromisoformat` also accepts forms such as "20260101" and "2026-W01-1", so check the shape first
+ISO_DATE_PATTERN = re.compile(r"[0-9]{4}-[0-9]{2}-[0-9]{2}")
+
+
+@dataclass(frozen=True)
+class ValidationMessages:
+    """Error messages of the validators, so each server can report them in its own language."""
+
+    iso_format: str = "{param_name} must be in ISO format (YYYY-MM-DD), got: {value}"
+    invalid_date: str = "Invalid {param_name}: {error}"
+    stay_order: str = "check_out date must be after check_in date"
+    invalid_cursor: str = "Invalid cursor, or a cursor from a search with other filters: search again without one"
+
+
+DEFAULT_MESSAGES = ValidationMessages()
+
+
+def parse_iso_date(value: str, param_name: str, messages: ValidationMessages = DEFAULT_MESSAGES) -> date:
+    """Return the date in `value`, which must be in ISO format (YYYY-MM-DD).
+
+    Raises:
+        ValueError: If the date is not in ISO format or is invalid
+    """
+    if not ISO_DATE_PATTERN.fullmatch(value):
+        raise ValueError(messages.iso_format.format(param_name=param_name, value=value))
+    try:
+        return date.fromisoformat(value)
+    except ValueError as e:
+        raise ValueError(messages.invalid_date.format(param_name=param_name, error=e)) from None
+
+
+def parse_stay(check_in: str, check_out: str, messages: ValidationMessages = DEFAULT_MESSAGES) -> tuple[date, date]:
+    """Return the check-in and check-out dates, checking that the stay lasts at least one night."""
+    check_in_date = parse_iso_date(check_in, "check_in", messages)
+    check_out_date = parse_iso_date(check_out, "check_out", messages)
+    if check_out_date <= check_in_date:
+        raise ValueError(messages.stay_order)
+    return check_in_date, check_out_date
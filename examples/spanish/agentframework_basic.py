@@ -1,33 +1,17 @@
 import asyncio
-import os
+import sys
+from pathlib import Path
 
 from agent_framework import Agent
-from agent_framework.openai import OpenAIChatClient
-from azure.identity.aio import DefaultAzureCredential, get_bearer_token_provider
 from dotenv import load_dotenv
 from rich import print
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from shared.model_clients import close_clients, create_agent_framework_client  # noqa: E402
+
 # Configurar el cliente para usar Azure OpenAI, Ollama u OpenAI
 load_dotenv(override=True)
-API_HOST = os.getenv("API_HOST", "azure")
-
-async_credential = None
-if API_HOST == "azure":
-    async_credential = DefaultAzureCredential()
-    token_provider = get_bearer_token_provider(async_credential, "https://cognitiveservices.azure.com/.default")
-    client = OpenAIChatClient(
-        base_url=f"{os.environ['AZURE_OPENAI_ENDPOINT']}/openai/v1/",
-        api_key=token_provider,
-        model=os.environ["AZURE_OPENAI_CHAT_DEPLOYMENT"],
-    )
-elif API_HOST == "ollama":
-    client = OpenAIChatClient(
-        base_url=os.environ.get("OLLAMA_ENDPOINT", "http://localhost:11434/v1"),
-        api_key="none",
-        model=os.environ.get("OLLAMA_MODEL", "gemma4:e4b"),
-    )
-else:
-    client = OpenAIChatClient(api_key=os.environ["OPENAI_API_KEY"], model=os.environ.get("OPENAI_MODEL", "gpt-4o"))
+client = create_agent_framework_client()
 
 agent = Agent(client=client, instructions="Eres un agente informativo. Responde a las preguntas con alegría.")
 
@@ -36,8 +20,7 @@ async def main():
     response = await agent.run("¿Qué clima hace hoy en San Francisco?")
     print(response.text)
 
-    if async_credential:
-        await async_credential.close()
+    await close_clients()
 
 
 if __name__ == "__main__":
@@ -6,68 +6,52 @@ Prerrequisito:
 """
 import asyncio
 import logging
-import os
+import sys
+from pathlib import Path
 
-import azure.identity
 from dotenv import load_dotenv
 from langchain.agents import create_agent
 from langchain_core.messages import HumanMessage
 from langchain_mcp_adapters.client import MultiServerMCPClient
-from langchain_openai import ChatOpenAI
 from rich.logging import RichHandler
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from shared.mcp_tool_cache import get_cached_tools  # noqa: E402
+from shared.model_clients import close_clients, create_langchain_model  # noqa: E402
+
 logging.basicConfig(level=logging.WARNING, format="%(message)s", datefmt="[%X]", handlers=[RichHandler()])
 logger = logging.getLogger("itinerario_lang")
 
 load_dotenv(override=True)
-API_HOST = os.getenv("API_HOST", "azure")
-
-if API_HOST == "azure":
-    token_provider = azure.identity.get_bearer_token_provider(
-        azure.identity.DefaultAzureCredential(), "https://cognitiveservices.azure.com/.default"
-    )
-    base_model = ChatOpenAI(
-        model=os.environ.get("AZURE_OPENAI_CHAT_DEPLOYMENT"),
-        base_url=os.environ["AZURE_OPENAI_ENDPOINT"] + "/openai/v1/",
-        api_key=token_provider,
-        use_responses_api=True,
-    )
-elif API_HOST == "ollama":
-    base_model = ChatOpenAI(
-        model=os.environ.get("OLLAMA_MODEL", "gemma4:e4b"),
-        base_url=os.environ.get("OLLAMA_ENDPOINT", "http://localhost:11434/v1"),
-        api_key="none",
-        use_responses_api=True,
-    )
-else:
-    base_model = ChatOpenAI(
-        model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
-        use_responses_api=True,
-    )
+base_model = create_langchain_model()
 
 
 async def run_agent():
-    client = MultiServerMCPClient(
-        {
-            "itinerary": {
-                # Asegúrate de iniciar tu servidor de itinerarios en el puerto 8000
-                "url": "http://localhost:8000/mcp/",
-                "transport": "streamable_http",
+    try:
+        client = MultiServerMCPClient(
+            {
+                "itinerary": {
+                    # Asegúrate de iniciar tu servidor de itinerarios en el puerto 8000
+                    "url": "http://localhost:8000/mcp/",
+                    "transport": "streamable_http",
+                }
             }
-        }
-    )
-
-    tools = await client.get_tools()
-    agent = create_agent(base_model, tools)
-
-    user_query = (
-        "Encuéntrame un hotel en San Francisco para 2 noches comenzando el 2026-01-01. "
-        "Necesito un hotel con WiFi gratis y piscina."
-    )
-
-    response = await agent.ainvoke({"messages": [HumanMessage(content=user_query)]})
-    final = response["messages"][-1].content
-    print(final)
+        )
+
+        # Herramientas guardadas de una ejecución anterior, revalidadas en segundo plano (ver shared/mcp_tool_cache.py)
+        tools = await get_cached_tools(client)
+        agent = create_agent(base_model, tools)
+
+        user_query = (
+            "Encuéntrame un hotel en San Francisco para 2 noches comenzando el 2026-01-01. "
+            "Necesito un hotel con WiFi gratis y piscina."
+        )
+
+        response = await agent.ainvoke({"messages": [HumanMessage(content=user_query)]})
+        final = response["messages"][-1].content
+        print(final)
+    finally:
+        await close_clients()
 
 
 def main():
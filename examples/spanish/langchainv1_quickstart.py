@@ -6,46 +6,24 @@ adaptado a la configuración de modelo de múltiples proveedores de este reposit
 """
 from __future__ import annotations
 
-import os
+import sys
 from dataclasses import dataclass
+from pathlib import Path
 
-import azure.identity
 from dotenv import load_dotenv
 from langchain.agents import create_agent
 from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import tool
-from langchain_openai import ChatOpenAI
-from langgraph.checkpoint.memory import InMemorySaver
 from langgraph.runtime import get_runtime
 from pydantic import BaseModel
 from rich import print
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from shared.model_clients import create_langchain_model  # noqa: E402
+from shared.sqlite_checkpointer import SQLiteCheckpointer, thread_id  # noqa: E402
+
 load_dotenv(override=True)
-API_HOST = os.getenv("API_HOST", "azure")
-
-if API_HOST == "azure":
-    token_provider = azure.identity.get_bearer_token_provider(
-        azure.identity.DefaultAzureCredential(),
-        "https://cognitiveservices.azure.com/.default",
-    )
-    model = ChatOpenAI(
-        model=os.environ.get("AZURE_OPENAI_CHAT_DEPLOYMENT"),
-        base_url=os.environ["AZURE_OPENAI_ENDPOINT"] + "/openai/v1/",
-        api_key=token_provider,
-        use_responses_api=True,
-    )
-elif API_HOST == "ollama":
-    model = ChatOpenAI(
-        model=os.environ.get("OLLAMA_MODEL", "gemma4:e4b"),
-        base_url=os.environ.get("OLLAMA_ENDPOINT", "http://localhost:11434/v1"),
-        api_key="none",
-        use_responses_api=True,
-    )
-else:
-    model = ChatOpenAI(
-        model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
-        use_responses_api=True,
-    )
+model = create_langchain_model()
 
 
 system_prompt = """Eres un experto meteorólogo que habla con juegos de palabras.
@@ -90,7 +68,8 @@ class WeatherResponse(BaseModel):
     punny_response: str
 
 
-checkpointer = InMemorySaver()
+# Las conversaciones se guardan en disco entre ejecuciones (ver shared/sqlite_checkpointer.py)
+checkpointer = SQLiteCheckpointer.from_env()
 
 agent = create_agent(
     model=model,
@@ -102,20 +81,25 @@ agent = create_agent(
 
 
 def main():
-    config = {"configurable": {"thread_id": "1"}}
-    context = UserContext(user_id="1")
-
-    r1 = agent.invoke(
-        {"messages": [{"role": "user", "content": "¿Qué clima hace afuera?"}]}, config=config, context=context
-    )
-    print(r1.get("structured_response"))
-
-    r2 = agent.invoke(
-        {"messages": [{"role": "user", "content": "Gracias"}]},
-        config=config,
-        context=context,
-    )
-    print(r2.get("structured_response"))
+    # Una conversación nueva en cada ejecución, salvo que CHECKPOINT_THREAD indique una para retomar
+    config = {"configurable": {"thread_id": thread_id(__file__)}}
+    print(f"Hilo: {config['configurable']['thread_id']}")
+    try:
+        context = UserContext(user_id="1")
+
+        r1 = agent.invoke(
+            {"messages": [{"role": "user", "content": "¿Qué clima hace afuera?"}]}, config=config, context=context
+        )
+        print(r1.get("structured_response"))
+
+        r2 = agent.invoke(
+            {"messages": [{"role": "user", "content": "Gracias"}]},
+            config=config,
+            context=context,
+        )
+        print(r2.get("structured_response"))
+    finally:
+        checkpointer.close()
 
 
 if __name__ == "__main__":
@@ -1,16 +1,19 @@
 # https://github.com/JRAlexander/IntroToAgents1-Oxford/blob/main/intro-langgraph/time-travel.ipynb
 
-import os
+import asyncio
+import sys
+from pathlib import Path
 
-import azure.identity
 from dotenv import load_dotenv
 from langchain_core.messages import HumanMessage
 from langchain_core.tools import tool
-from langchain_openai import ChatOpenAI
-from langgraph.checkpoint.memory import MemorySaver
 from langgraph.graph import END, START, MessagesState, StateGraph
 from langgraph.prebuilt import ToolNode
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from shared.model_clients import close_clients, create_langchain_model  # noqa: E402
+from shared.sqlite_checkpointer import SQLiteCheckpointer, thread_id  # noqa: E402
+
 
 @tool
 def play_song_on_spotify(song: str):
@@ -31,25 +34,7 @@ tool_node = ToolNode(tools)
 
 # Configurar el cliente para usar Azure OpenAI u Ollama
 load_dotenv(override=True)
-API_HOST = os.getenv("API_HOST", "azure")
-
-if API_HOST == "azure":
-    token_provider = azure.identity.get_bearer_token_provider(
-        azure.identity.DefaultAzureCredential(), "https://cognitiveservices.azure.com/.default"
-    )
-    model = ChatOpenAI(
-        model=os.environ.get("AZURE_OPENAI_CHAT_DEPLOYMENT"),
-        base_url=os.environ["AZURE_OPENAI_ENDPOINT"] + "/openai/v1/",
-        api_key=token_provider,
-        use_responses_api=True,
-    )
-elif API_HOST == "ollama":
-    model = ChatOpenAI(
-        model=os.environ["OLLAMA_MODEL"],
-        base_url=os.environ.get("OLLAMA_ENDPOINT", "http://localhost:11434/v1"),
-        api_key="none",
-        use_responses_api=True,
-    )
+model = create_langchain_model()
 
 model = model.bind_tools(tools, parallel_tool_calls=False)
 
@@ -69,9 +54,9 @@ def should_continue(state):
 
 
 # Definir la función que llama al modelo
-def call_model(state):
+async def call_model(state):
     messages = state["messages"]
-    response = model.invoke(messages)
+    response = await model.ainvoke(messages)
     # Devolvemos una lista porque esto se agregará a la lista existente
     return {"messages": [response]}
 
@@ -112,8 +97,8 @@ workflow.add_conditional_edges(
 # Esto significa que después de llamar a `action`, se llama al nodo `agent`.
 workflow.add_edge("action", "agent")
 
-# Configurar memoria
-memory = MemorySaver()
+# Configurar memoria, guardada en disco entre ejecuciones (ver shared/sqlite_checkpointer.py)
+memory = SQLiteCheckpointer.from_env()
 
 # Finalmente, ¡lo compilamos!
 # Esto lo convierte en un Runnable de LangChain,
@@ -123,7 +108,20 @@ memory = MemorySaver()
 # Esto agrega un punto de interrupción antes de llamar al nodo `action`
 app = workflow.compile(checkpointer=memory)
 
-config = {"configurable": {"thread_id": "1"}}
+# Una conversación nueva en cada ejecución, salvo que CHECKPOINT_THREAD indique una para retomar
+config = {"configurable": {"thread_id": thread_id(__file__)}}
 input_message = HumanMessage(content="¿Podés poner la canción más popular de Taylor Swift?")
-for event in app.stream({"messages": [input_message]}, config, stream_mode="values"):
-    event["messages"][-1].pretty_print()
+
+
+async def main():
+    print(f"Hilo: {config['configurable']['thread_id']}")
+    try:
+        async for event in app.astream({"messages": [input_message]}, config, stream_mode="values"):
+            event["messages"][-1].pretty_print()
+    finally:
+        await close_clients()
+        memory.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -5,64 +5,67 @@ Inicia el servidor MCP local definido en `mcp_server_basic.py` en el puerto 8000
     python examples/mcp_server_basic.py
 """
 
-import os
+import sys
+from pathlib import Path
 
-import azure.identity
 from dotenv import load_dotenv
 from langchain_mcp_adapters.client import MultiServerMCPClient
-from langchain_openai import ChatOpenAI
 from langgraph.graph import START, MessagesState, StateGraph
 from langgraph.prebuilt import ToolNode, tools_condition
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from shared.graph_rendering import render_graph  # noqa: E402
+from shared.mcp_tool_cache import get_cached_tools, openai_tool_definitions  # noqa: E402
+from shared.model_clients import close_clients, create_langchain_model  # noqa: E402
+
 # Configuración del cliente para usar Azure OpenAI
 load_dotenv(override=True)
-API_HOST = os.getenv("API_HOST", "azure")
-
-if API_HOST == "azure":
-    token_provider = azure.identity.get_bearer_token_provider(
-        azure.identity.DefaultAzureCredential(), "https://cognitiveservices.azure.com/.default"
-    )
-    model = ChatOpenAI(
-        model=os.environ.get("AZURE_OPENAI_CHAT_DEPLOYMENT"),
-        base_url=os.environ["AZURE_OPENAI_ENDPOINT"] + "/openai/v1/",
-        api_key=token_provider,
-        use_responses_api=True,
-    )
+model = create_langchain_model()
 
 
 async def setup_agent():
-    client = MultiServerMCPClient(
-        {
-            "weather": {
-                # Asegúrate de iniciar tu servidor del clima en el puerto 8000
-                "url": "http://localhost:8000/mcp/",
-                "transport": "streamable_http",
+    try:
+        client = MultiServerMCPClient(
+            {
+                "weather": {
+                    # Asegúrate de iniciar tu servidor del clima en el puerto 8000
+                    "url": "http://localhost:8000/mcp/",
+                    "transport": "streamable_http",
+                }
             }
-        }
-    )
-    tools = await client.get_tools()
+        )
+        # Herramientas guardadas de una ejecución anterior, revalidadas en segundo plano (ver shared/mcp_tool_cache.py)
+        tools = await get_cached_tools(client)
 
-    def call_model(state: MessagesState):
-        response = model.bind_tools(tools).invoke(state["messages"])
-        return {"messages": response}
+        # Convertir los esquemas de las herramientas y vincularlas una sola vez, no en cada llamada al modelo
+        model_with_tools = model.bind_tools(openai_tool_definitions(tools))
 
-    builder = StateGraph(MessagesState)
-    builder.add_node(call_model)
-    builder.add_node(ToolNode(tools))
-    builder.add_edge(START, "call_model")
-    builder.add_conditional_edges(
-        "call_model",
-        tools_condition,
-    )
-    builder.add_edge("tools", "call_model")
-    graph = builder.compile()
-    hotel_response = await graph.ainvoke(
-        {"messages": "Encuentra un hotel en SF para 2 noches comenzando el 2024-01-01. Necesito WiFi gratis y piscina."}
-    )
-    print(hotel_response["messages"][-1].content)
-    image_bytes = graph.get_graph().draw_mermaid_png()
-    with open("examples/images/langgraph_mcp_http_graph.png", "wb") as f:
-        f.write(image_bytes)
+        async def call_model(state: MessagesState):
+            response = await model_with_tools.ainvoke(state["messages"])
+            return {"messages": response}
+
+        builder = StateGraph(MessagesState)
+        builder.add_node(call_model)
+        builder.add_node(ToolNode(tools))
+        builder.add_edge(START, "call_model")
+        builder.add_conditional_edges(
+            "call_model",
+            tools_condition,
+        )
+        builder.add_edge("tools", "call_model")
+        graph = builder.compile()
+        hotel_response = await graph.ainvoke(
+            {
+                "messages": (
+                    "Encuentra un hotel en SF para 2 noches comenzando el 2024-01-01. Necesito WiFi gratis y piscina."
+                )
+            }
+        )
+        print(hotel_response["messages"][-1].content)
+        # Solo con RENDER_GRAPH=true, y solo si el grafo cambió (ver shared/graph_rendering.py)
+        render_graph(graph, "langgraph_mcp_http_graph.png")
+    finally:
+        await close_clients()
 
 
 if __name__ == "__main__":
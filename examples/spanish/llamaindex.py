@@ -1,76 +1,39 @@
 # https://docs.llamaindex.ai/en/stable/examples/agent/react_agent_with_query_engine/
 
 import os
+import sys
 from pathlib import Path
 
-import azure.identity
 from dotenv import load_dotenv
-from llama_index.core import Settings, SimpleDirectoryReader, StorageContext, VectorStoreIndex, load_index_from_storage
+from llama_index.core import Settings
 from llama_index.core.agent.workflow import AgentStream, ReActAgent
 from llama_index.core.tools import QueryEngineTool
 from llama_index.core.workflow import Context
-from llama_index.embeddings.openai import OpenAIEmbedding
-from llama_index.llms.openai_like import OpenAILike
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from shared.hybrid_retrieval import create_query_engine, retrieval_counts  # noqa: E402
+from shared.index_cache import load_or_build_indexes  # noqa: E402
+from shared.model_clients import close_clients, create_llamaindex_embedding, create_llamaindex_llm  # noqa: E402
+from shared.query_cache import query_cache_stats  # noqa: E402
 
 # Configuramos el cliente para usar Azure OpenAI
 load_dotenv(override=True)
-API_HOST = os.getenv("API_HOST", "azure")
-
-if API_HOST == "azure":
-    token_provider = azure.identity.get_bearer_token_provider(
-        azure.identity.DefaultAzureCredential(), "https://cognitiveservices.azure.com/.default"
-    )
-    Settings.llm = OpenAILike(
-        model=os.environ["AZURE_OPENAI_CHAT_DEPLOYMENT"],
-        api_base=os.environ["AZURE_OPENAI_ENDPOINT"] + "/openai/v1",
-        api_key=token_provider(),
-        is_chat_model=True,
-    )
-
-    Settings.embed_model = OpenAIEmbedding(
-        model=os.environ["AZURE_OPENAI_EMBEDDING_DEPLOYMENT"],
-        api_base=os.environ["AZURE_OPENAI_ENDPOINT"] + "/openai/v1",
-        api_key=token_provider(),
-    )
-elif API_HOST == "ollama":
-    Settings.llm = OpenAILike(
-        model=os.environ.get("OLLAMA_MODEL", "gemma4:e4b"),
-        api_base=os.environ.get("OLLAMA_ENDPOINT", "http://localhost:11434/v1"),
-        api_key="none",
-        is_chat_model=True,
-    )
-
-    Settings.embed_model = OpenAIEmbedding(
-        model="nomic-embed-text",
-        api_base=os.environ.get("OLLAMA_ENDPOINT", "http://localhost:11434/v1"),
-        api_key="none",
-    )
-
-# Intentamos cargar el índice desde el almacenamiento
-try:
-    storage_context = StorageContext.from_defaults(persist_dir="./storage/docs1")
-    index1 = load_index_from_storage(storage_context)
-
-    storage_context = StorageContext.from_defaults(persist_dir="./storage/docs2")
-    index2 = load_index_from_storage(storage_context)
-
-    index_loaded = True
-except FileNotFoundError:
-    index_loaded = False
-
-if not index_loaded:
-    root_dir = Path(__file__).parent.parent
-
-    docs1 = SimpleDirectoryReader(input_files=[root_dir / "../example_data/employee_handbook.pdf"]).load_data()
-    docs2 = SimpleDirectoryReader(input_files=[root_dir / "../example_data/PerksPlus.pdf"]).load_data()
-    index1 = VectorStoreIndex.from_documents(docs1)
-    index2 = VectorStoreIndex.from_documents(docs2)
-
-    index1.storage_context.persist(persist_dir=root_dir / "../example_data/.llama_index_storage/docs1")
-    index2.storage_context.persist(persist_dir=root_dir / "../example_data/.llama_index_storage/docs2")
-
-engine1 = index1.as_query_engine(similarity_top_k=3)
-engine2 = index2.as_query_engine(similarity_top_k=3)
+Settings.llm = create_llamaindex_llm()
+Settings.embed_model = create_llamaindex_embedding()
+
+# Cargamos cada índice desde su caché, construyéndolo y guardándolo si cambió el PDF o la configuración
+root_dir = Path(__file__).parent.parent
+# Buscamos en cada índice de forma exacta, o con VECTOR_INDEX=ivf usamos un índice aproximado (ANN)
+VECTOR_INDEX = os.getenv("VECTOR_INDEX", "exact")
+index1, index2 = load_or_build_indexes(
+    [root_dir / "../example_data/employee_handbook.pdf", root_dir / "../example_data/PerksPlus.pdf"],
+    vector_index=VECTOR_INDEX,
+)
+
+# Combinamos búsqueda por palabras clave (BM25) y vectorial, o con RETRIEVAL_MODE=vector solo vectorial
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "hybrid")
+engine1 = create_query_engine(index1, similarity_top_k=3, retrieval_mode=RETRIEVAL_MODE)
+engine2 = create_query_engine(index2, similarity_top_k=3, retrieval_mode=RETRIEVAL_MODE)
 
 query_engine_tools = [
     QueryEngineTool.from_defaults(
@@ -92,17 +55,22 @@ query_engine_tools = [
 
 
 async def main():
-    agent = ReActAgent(tools=query_engine_tools, llm=Settings.llm)
-    ctx = Context(agent)
-
-    handler = agent.run("¿puedo obtener reembolso por mis herramientas de jardinería?", ctx=ctx)
-
-    async for ev in handler.stream_events():
-        if isinstance(ev, AgentStream):
-            print(f"{ev.delta}", end="", flush=True)
-
-    response = await handler
-    print(str(response))
+    try:
+        agent = ReActAgent(tools=query_engine_tools, llm=Settings.llm)
+        ctx = Context(agent)
+
+        handler = agent.run("¿puedo obtener reembolso por mis herramientas de jardinería?", ctx=ctx)
+
+        async for ev in handler.stream_events():
+            if isinstance(ev, AgentStream):
+                print(f"{ev.delta}", end="", flush=True)
+
+        response = await handler
+        print(str(response))
+        print(f"\nCaché de consultas: {query_cache_stats()}")
+        print(f"Recuperaciones: {dict(retrieval_counts)}")
+    finally:
+        await close_clients()
 
 
 if __name__ == "__main__":
@@ -1,18 +1,76 @@
-import random
-import re
-from dataclasses import dataclass
-from datetime import datetime
-from typing import Annotated
-
-from faker import Faker
-from mcp.server.fastmcp import FastMCP
+import asyncio
+import json
+import sys
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Annotated, Literal
+
+import numpy as np
+from dotenv import load_dotenv
+from mcp.server.fastmcp import Context, FastMCP
 from pydantic import Field
 
-app = FastMCP()
-fake = Faker()
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from shared.hotel_inventory import TABLE_COLUMNS, CityHotels, HotelInventory, HotelVocabulary  # noqa: E402
+from shared.mcp_serving import add_readiness_route, run_server, server_settings  # noqa: E402
+from shared.tool_cache import memoize_tool  # noqa: E402
+from shared.tool_pagination import decode_cursor, encode_cursor, search_key  # noqa: E402
+from shared.tool_validation import ValidationMessages, parse_stay  # noqa: E402
 
+load_dotenv(override=True)
 
-@dataclass
+# Host, puerto y modo sin estado se configuran con variables de entorno (ver shared/mcp_serving.py)
+app = FastMCP(**server_settings())
+add_readiness_route(app)
+
+# Etiquetas para los datos simulados de hoteles
+HOTEL_VOCABULARY = HotelVocabulary(
+    hotel_types=("Lujo", "Boutique", "Económico", "Negocios"),
+    amenities=(
+        "WiFi gratis",
+        "Piscina",
+        "Spa",
+        "Gimnasio",
+        "Restaurante",
+        "Bar",
+        "Servicio a la habitación",
+        "Estacionamiento",
+    ),
+    neighborhoods=(
+        "Centro",
+        "Distrito Histórico",
+        "Zona Costera",
+        "Distrito Financiero",
+        "Barrio de las Artes",
+        "Zona Universitaria",
+    ),
+    name_suffixes=("Hotel", "Inn", "Suites", "Resort", "Plaza"),
+    price_ranges={
+        "Lujo": (250, 600),
+        "Boutique": (180, 350),
+        "Económico": (80, 150),
+        "Resort": (200, 500),
+        "Negocios": (150, 300),
+    },
+)
+# Generamos los hoteles simulados una sola vez al iniciar, en lugar de en cada llamada
+inventory = HotelInventory.from_env(HOTEL_VOCABULARY)
+DEFAULT_LIMIT = 5
+MAX_LIMIT = 50
+MAX_STOPS = 20
+# Hoteles por notificación de progreso al enviar los resultados por partes
+STREAM_CHUNK_SIZE = 5
+
+# Mensajes de error de la validación de argumentos
+VALIDATION_MESSAGES = ValidationMessages(
+    iso_format="{param_name} debe estar en formato ISO (YYYY-MM-DD), se recibió: {value}",
+    invalid_date="{param_name} inválido: {error}",
+    stay_order="La fecha de salida debe ser posterior a la fecha de entrada",
+    invalid_cursor="Cursor inválido, o de una búsqueda con otros filtros: busca de nuevo sin cursor",
+)
+
+
+@dataclass(slots=True)
 class Hotel:
     name: str
     address: str
@@ -24,106 +82,204 @@ class Hotel:
     available_rooms: int
 
 
+@dataclass(slots=True)
+class HotelTable:
+    """Hoteles en formato compacto: una fila por hotel, con sus valores en el orden de `columns`."""
+
+    city: str
+    columns: list[str]
+    rows: list[list[str | float | int | list[int]]]
+    # La columna amenities contiene posiciones en esta lista
+    amenity_codes: list[str]
+
+
 @dataclass
 class HotelSuggestions:
     hotels: list[Hotel]
+    # Número de hoteles que cumplen los filtros, sumando todas las páginas
+    total: int
+    # Pásalo como `cursor` para obtener la página siguiente; se omite en la última página
+    next_cursor: str | None = None
+    # Los hoteles en formato compacto, que deja `hotels` vacío
+    table: HotelTable | None = None
 
 
-def validate_iso_date(date_str: str, param_name: str):
-    """
-    Valida que una cadena esté en formato ISO (YYYY-MM-DD) y devuelve la fecha parseada.
+@dataclass
+class ItineraryStop:
+    location: Annotated[str, Field(description="Ubicación (ciudad o área) para buscar hoteles")]
+    check_in: Annotated[str, Field(description="Fecha de entrada en formato ISO (YYYY-MM-DD)")]
+    check_out: Annotated[str, Field(description="Fecha de salida en formato ISO (YYYY-MM-DD)")]
 
-    Args:
-        date_str: La cadena de fecha a validar
-        param_name: Nombre del parámetro para mensajes de error
 
-    Returns:
-        El objeto de fecha parseado
+@dataclass
+class StopSuggestions:
+    location: str
+    check_in: str
+    check_out: str
+    hotels: list[Hotel]
+    # Por qué esta parada no tiene sugerencias, por ejemplo fechas inválidas
+    error: str | None = None
+    # Los hoteles en formato compacto, que deja `hotels` vacío
+    table: HotelTable | None = None
 
-    Raises:
-        ValueError: Si la fecha no está en formato ISO o es inválida
-    """
-    iso_pattern = re.compile(r"^\d{4}-\d{2}-\d{2}$")
-    if not iso_pattern.match(date_str):
-        raise ValueError(f"{param_name} debe estar en formato ISO (YYYY-MM-DD), se recibió: {date_str}")
 
-    try:
-        return datetime.strptime(date_str, "%Y-%m-%d").date()
-    except ValueError as e:
-        raise ValueError(f"{param_name} inválido: {e}")
+@dataclass
+class ItinerarySuggestions:
+    stops: list[StopSuggestions]
+
+
+# Filtros compartidos por las herramientas de hoteles
+Amenities = Annotated[
+    list[str] | None,
+    Field(description=f"Servicios que debe tener el hotel, entre: {', '.join(HOTEL_VOCABULARY.amenities)}"),
+]
+MaxPrice = Annotated[float | None, Field(gt=0, description="Precio máximo por noche")]
+MinRating = Annotated[float | None, Field(ge=0, le=5, description="Calificación mínima, de 0 a 5")]
+HotelType = Annotated[Literal[HOTEL_VOCABULARY.hotel_types] | None, Field(description="Tipo de hotel")]
+Limit = Annotated[int, Field(ge=1, le=MAX_LIMIT, description="Número máximo de hoteles a devolver")]
+Stream = Annotated[
+    bool,
+    Field(description="Enviar también los resultados en notificaciones de progreso, en cuanto cada parte está lista"),
+]
+OutputFormat = Annotated[
+    Literal["full", "compact"],
+    Field(description="'compact' devuelve una tabla de filas con códigos de servicios, mucho más corta que 'full'"),
+]
+
+
+def match_hotels(
+    location: str,
+    amenity_mask: int,
+    max_price: float | None,
+    min_rating: float | None,
+    hotel_type: str | None,
+) -> tuple[CityHotels, np.ndarray]:
+    """Devuelve los hoteles de la ciudad y las filas que cumplen los filtros, los mejor calificados primero."""
+    city_hotels = inventory.city(location)
+    rows = city_hotels.query(
+        amenity_mask=amenity_mask,
+        max_price=max_price,
+        min_rating=min_rating,
+        hotel_type=HOTEL_VOCABULARY.hotel_type_codes[hotel_type] if hotel_type is not None else None,
+    )
+    return city_hotels, rows
+
+
+def to_hotels(city_hotels: CityHotels, rows: np.ndarray) -> list[Hotel]:
+    return [Hotel(**record) for record in inventory.records(city_hotels, rows)]
+
+
+def to_table(city_hotels: CityHotels, rows: np.ndarray) -> HotelTable:
+    """Devuelve los hoteles de `rows` en formato compacto."""
+    return HotelTable(
+        city=city_hotels.city,
+        columns=list(TABLE_COLUMNS),
+        rows=inventory.table_rows(city_hotels, rows),
+        amenity_codes=list(HOTEL_VOCABULARY.amenities),
+    )
 
 
 @app.tool()
+@memoize_tool(bypass_when="stream")
 async def suggest_hotels(
     location: Annotated[str, Field(description="Ubicación (ciudad o área) para buscar hoteles")],
     check_in: Annotated[str, Field(description="Fecha de entrada en formato ISO (YYYY-MM-DD)")],
     check_out: Annotated[str, Field(description="Fecha de salida en formato ISO (YYYY-MM-DD)")],
+    ctx: Context,
+    amenities: Amenities = None,
+    max_price: MaxPrice = None,
+    min_rating: MinRating = None,
+    hotel_type: HotelType = None,
+    limit: Limit = DEFAULT_LIMIT,
+    cursor: Annotated[str | None, Field(description="next_cursor de la página anterior, para la siguiente")] = None,
+    stream: Stream = False,
+    output_format: OutputFormat = "full",
 ) -> HotelSuggestions:
     """
-    Sugiere hoteles basados en ubicación y fechas.
+    Sugiere hoteles basados en ubicación y fechas, los mejor calificados primero, en páginas de `limit` hoteles.
+    Filtra por servicios, precio, calificación y tipo de hotel aquí en lugar de sobre los resultados.
     """
-    # Validar fechas
-    check_in_date = validate_iso_date(check_in, "check_in")
-    check_out_date = validate_iso_date(check_out, "check_out")
-
-    # Asegurar que check_out sea después de check_in
-    if check_out_date <= check_in_date:
-        raise ValueError("La fecha de salida debe ser posterior a la fecha de entrada")
-
-    # Crear datos simulados realistas para hoteles
-    hotel_types = ["Lujo", "Boutique", "Económico", "Negocios"]
-    amenities = ["WiFi gratis", "Piscina", "Spa", "Gimnasio", "Restaurante", "Bar", "Servicio a la habitación", "Estacionamiento"]
-
-    # Generar una calificación entre 3.0 y 5.0
-    def generate_rating():
-        return round(random.uniform(3.0, 5.0), 1)
-
-    # Generar un precio basado en el tipo de hotel
-    def generate_price(hotel_type):
-        price_ranges = {
-            "Lujo": (250, 600),
-            "Boutique": (180, 350),
-            "Económico": (80, 150),
-            "Resort": (200, 500),
-            "Negocios": (150, 300),
-        }
-        min_price, max_price = price_ranges.get(hotel_type, (100, 300))
-        return round(random.uniform(min_price, max_price))
-
-    # Generar entre 3 y 8 hoteles
-    num_hotels = random.randint(3, 8)
-    hotels = []
-
-    neighborhoods = [
-        "Centro",
-        "Distrito Histórico",
-        "Zona Costera",
-        "Distrito Financiero",
-        "Barrio de las Artes",
-        "Zona Universitaria",
-    ]
-
-    for i in range(num_hotels):
-        hotel_type = random.choice(hotel_types)
-        hotel_amenities = random.sample(amenities, random.randint(3, 6))
-        neighborhood = random.choice(neighborhoods)
-
-        hotel = Hotel(
-            name=f"{hotel_type} {['Hotel', 'Inn', 'Suites', 'Resort', 'Plaza'][random.randint(0, 4)]}",
-            address=fake.street_address(),
-            location=f"{neighborhood}, {location}",
-            rating=generate_rating(),
-            price_per_night=generate_price(hotel_type),
-            hotel_type=hotel_type,
-            amenities=hotel_amenities,
-            available_rooms=random.randint(1, 15),
-        )
-        hotels.append(hotel)
-
-    # Ordenar por calificación para mostrar los mejores hoteles primero
-    hotels.sort(key=lambda x: x.rating, reverse=True)
-    return HotelSuggestions(hotels=hotels)
+    # Validar fechas, y asegurar que check_out sea después de check_in
+    parse_stay(check_in, check_out, VALIDATION_MESSAGES)
+
+    amenity_mask = HOTEL_VOCABULARY.amenity_mask(amenities or [])
+    key = search_key(
+        location=location, amenity_mask=amenity_mask, max_price=max_price, min_rating=min_rating, hotel_type=hotel_type
+    )
+    offset = decode_cursor(cursor, key, VALIDATION_MESSAGES)
+    # Buscar en un hilo, para que generar una ciudad nueva no bloquee el servidor
+    city_hotels, rows = await asyncio.to_thread(match_hotels, location, amenity_mask, max_price, min_rating, hotel_type)
+    page = rows[offset : offset + limit]
+    table = None
+    if output_format == "compact":
+        # La tabla compacta se arma de una vez; al enviar por partes se mandan sus filas en bloques
+        hotels, table = [], to_table(city_hotels, page)
+        if stream:
+            for start in range(0, len(page), STREAM_CHUNK_SIZE):
+                table_rows = table.rows[start : start + STREAM_CHUNK_SIZE]
+                await ctx.report_progress(start + len(table_rows), len(page), json.dumps({"rows": table_rows}))
+    elif stream:
+        # Enviar primero los hoteles mejor calificados, mientras se arma el resto de la página
+        hotels = []
+        for start in range(0, len(page), STREAM_CHUNK_SIZE):
+            chunk = to_hotels(city_hotels, page[start : start + STREAM_CHUNK_SIZE])
+            hotels += chunk
+            await ctx.report_progress(len(hotels), len(page), json.dumps({"hotels": [asdict(h) for h in chunk]}))
+    else:
+        hotels = to_hotels(city_hotels, page)
+    next_offset = offset + len(page)
+    next_cursor = encode_cursor(next_offset, key) if next_offset < len(rows) else None
+    return HotelSuggestions(hotels=hotels, total=len(rows), next_cursor=next_cursor, table=table)
+
+
+@app.tool()
+@memoize_tool(bypass_when="stream")
+async def suggest_hotels_batch(
+    stops: Annotated[
+        list[ItineraryStop],
+        Field(min_length=1, max_length=MAX_STOPS, description="Paradas del itinerario, cada una con sus fechas"),
+    ],
+    ctx: Context,
+    amenities: Amenities = None,
+    max_price: MaxPrice = None,
+    min_rating: MinRating = None,
+    hotel_type: HotelType = None,
+    limit: Limit = DEFAULT_LIMIT,
+    stream: Stream = False,
+    output_format: OutputFormat = "full",
+) -> ItinerarySuggestions:
+    """
+    Sugiere hoteles para cada parada de un viaje por varias ciudades en una sola llamada, los mejor calificados primero.
+    Los filtros se aplican a todas las paradas. Prefiere esta herramienta a llamar a suggest_hotels por cada ciudad.
+    """
+    amenity_mask = HOTEL_VOCABULARY.amenity_mask(amenities or [])
+    stops_done = 0
+
+    def suggest_for_stop(stop: ItineraryStop) -> StopSuggestions:
+        try:
+            parse_stay(stop.check_in, stop.check_out, VALIDATION_MESSAGES)
+        except ValueError as e:
+            # Una parada con fechas inválidas no hace fallar a las demás
+            return StopSuggestions(stop.location, stop.check_in, stop.check_out, hotels=[], error=str(e))
+        city_hotels, rows = match_hotels(stop.location, amenity_mask, max_price, min_rating, hotel_type)
+        if output_format == "compact":
+            table = to_table(city_hotels, rows[:limit])
+            return StopSuggestions(stop.location, stop.check_in, stop.check_out, hotels=[], table=table)
+        hotels = to_hotels(city_hotels, rows[:limit])
+        return StopSuggestions(stop.location, stop.check_in, stop.check_out, hotels=hotels)
+
+    async def search_stop(stop: ItineraryStop) -> StopSuggestions:
+        nonlocal stops_done
+        # Buscar en un hilo, para que generar una ciudad nueva no bloquee el servidor
+        result = await asyncio.to_thread(suggest_for_stop, stop)
+        stops_done += 1
+        if stream:
+            await ctx.report_progress(stops_done, len(stops), json.dumps(asdict(result)))
+        return result
+
+    results = await asyncio.gather(*(search_stop(stop) for stop in stops))
+    return ItinerarySuggestions(stops=list(results))
 
 
 if __name__ == "__main__":
-    app.run(transport="streamable-http")
+    run_server(app, __file__)
@@ -1,33 +1,19 @@
 import asyncio
-import os
+import sys
+from pathlib import Path
 
-from agents import Agent, OpenAIResponsesModel, Runner, function_tool, set_tracing_disabled
-from azure.identity.aio import DefaultAzureCredential, get_bearer_token_provider
+from agents import Agent, Runner, function_tool, set_tracing_disabled
 from dotenv import load_dotenv
-from openai import AsyncOpenAI
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from shared.model_clients import close_clients, create_openai_agents_model  # noqa: E402
 
 # Desactivamos el rastreo ya que no estamos usando modelos de OpenAI.com
 set_tracing_disabled(disabled=True)
 
 # Configuramos el cliente OpenAI para usar Azure OpenAI
 load_dotenv(override=True)
-API_HOST = os.getenv("API_HOST", "azure")
-
-async_credential = None
-if API_HOST == "azure":
-    async_credential = DefaultAzureCredential()
-    token_provider = get_bearer_token_provider(async_credential, "https://cognitiveservices.azure.com/.default")
-    client = AsyncOpenAI(
-        base_url=os.environ["AZURE_OPENAI_ENDPOINT"] + "/openai/v1",
-        api_key=token_provider,
-    )
-    MODEL_NAME = os.environ["AZURE_OPENAI_CHAT_DEPLOYMENT"]
-elif API_HOST == "ollama":
-    client = AsyncOpenAI(base_url=os.environ.get("OLLAMA_ENDPOINT", "http://localhost:11434/v1"), api_key="none")
-    MODEL_NAME = os.environ["OLLAMA_MODEL"]
-else:
-    client = AsyncOpenAI(api_key=os.environ["OPENAI_API_KEY"])
-    MODEL_NAME = os.environ.get("OPENAI_MODEL", "gpt-4o")
+model = create_openai_agents_model()
 
 
 @function_tool
@@ -49,21 +35,21 @@ spanish_agent = Agent(
     name="agente_es",
     instructions="Solo hablas español.",
     tools=[get_weather],
-    model=OpenAIResponsesModel(model=MODEL_NAME, openai_client=client),
+    model=model,
 )
 
 english_agent = Agent(
     name="agente_en",
     instructions="Solo hablas inglés",
     tools=[get_weather],
-    model=OpenAIResponsesModel(model=MODEL_NAME, openai_client=client),
+    model=model,
 )
 
 triage_agent = Agent(
     name="agente_clasificación",
     instructions="Transfiere al agente apropiado según el idioma de la solicitud.",
     handoffs=[spanish_agent, english_agent],
-    model=OpenAIResponsesModel(model=MODEL_NAME, openai_client=client),
+    model=model,
 )
 
 
@@ -71,8 +57,7 @@ async def main():
     result = await Runner.run(triage_agent, input="Hola, ¿cómo estás? ¿Puedes darme el clima para Cuenca, Ecuador?")
     print(result.final_output)
 
-    if async_credential:
-        await async_credential.close()
+    await close_clients()
 
 
 if __name__ == "__main__":
@@ -7,14 +7,16 @@ Inicia el servidor MCP local definido en `mcp_server_basic.py` en el puerto 8000
 
 import asyncio
 import logging
-import os
+import sys
+from pathlib import Path
 
-from agents import Agent, OpenAIResponsesModel, Runner, set_tracing_disabled
+from agents import Agent, Runner, set_tracing_disabled
 from agents.mcp.server import MCPServerStreamableHttp
 from agents.model_settings import ModelSettings
-from azure.identity.aio import DefaultAzureCredential, get_bearer_token_provider
 from dotenv import load_dotenv
-from openai import AsyncOpenAI
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from shared.model_clients import close_clients, create_openai_agents_model  # noqa: E402
 
 logging.basicConfig(level=logging.WARNING)
 # Desactivar tracing ya que no estamos conectados a un proveedor de tracing soportado
@@ -22,23 +24,7 @@ set_tracing_disabled(disabled=True)
 
 # Configuración del cliente OpenAI para usar Azure OpenAI
 load_dotenv(override=True)
-API_HOST = os.getenv("API_HOST", "azure")
-
-async_credential = None
-if API_HOST == "azure":
-    async_credential = DefaultAzureCredential()
-    token_provider = get_bearer_token_provider(async_credential, "https://cognitiveservices.azure.com/.default")
-    client = AsyncOpenAI(
-        base_url=os.environ["AZURE_OPENAI_ENDPOINT"] + "/openai/v1",
-        api_key=token_provider,
-    )
-    MODEL_NAME = os.environ["AZURE_OPENAI_CHAT_DEPLOYMENT"]
-elif API_HOST == "ollama":
-    client = AsyncOpenAI(base_url=os.environ.get("OLLAMA_ENDPOINT", "http://localhost:11434/v1"), api_key="none")
-    MODEL_NAME = os.environ["OLLAMA_MODEL"]
-else:
-    client = AsyncOpenAI(api_key=os.environ["OPENAI_API_KEY"])
-    MODEL_NAME = os.environ.get("OPENAI_MODEL", "gpt-4o")
+model = create_openai_agents_model()
 
 
 mcp_server = MCPServerStreamableHttp(name="weather", params={"url": "http://localhost:8000/mcp/"})
@@ -47,7 +33,7 @@ agent = Agent(
     name="Asistente",
     instructions="Usa las herramientas para lograr la tarea",
     mcp_servers=[mcp_server],
-    model=OpenAIResponsesModel(model=MODEL_NAME, openai_client=client),
+    model=model,
     model_settings=ModelSettings(tool_choice="required"),
 )
 
@@ -60,8 +46,7 @@ async def main():
 
     await mcp_server.cleanup()
 
-    if async_credential:
-        await async_credential.close()
+    await close_clients()
 
 
 if __name__ == "__main__":
@@ -1,26 +1,16 @@
-import os
+import sys
+from pathlib import Path
 
-import openai
-from azure.identity import DefaultAzureCredential, get_bearer_token_provider
 from dotenv import load_dotenv
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from shared.model_clients import get_api_host, get_model_name, get_openai_client  # noqa: E402
+
 # Configuración del cliente OpenAI para usar Azure OpenAI
 load_dotenv(override=True)
-API_HOST = os.getenv("API_HOST", "azure")
-
-if API_HOST == "azure":
-    token_provider = get_bearer_token_provider(DefaultAzureCredential(), "https://cognitiveservices.azure.com/.default")
-    client = openai.OpenAI(
-        base_url=os.environ["AZURE_OPENAI_ENDPOINT"] + "/openai/v1",
-        api_key=token_provider,
-    )
-    MODEL_NAME = os.environ["AZURE_OPENAI_CHAT_DEPLOYMENT"]
-elif API_HOST == "ollama":
-    client = openai.OpenAI(
-        base_url=os.environ.get("OLLAMA_ENDPOINT", "http://localhost:11434/v1"),
-        api_key="none",
-    )
-    MODEL_NAME = os.environ["OLLAMA_MODEL"]
+API_HOST = get_api_host()
+client = get_openai_client()
+MODEL_NAME = get_model_name()
 
 tools = [
     {
@@ -8,6 +8,7 @@ $azureOpenAiChatDeployment = azd env get-value AZURE_OPENAI_CHAT_DEPLOYMENT
 $azureOpenAiChatModel = azd env get-value AZURE_OPENAI_CHAT_MODEL
 $azureOpenAiEmbeddingDeployment = azd env get-value AZURE_OPENAI_EMBEDDING_DEPLOYMENT
 $azureOpenAiEmbeddingModel = azd env get-value AZURE_OPENAI_EMBEDDING_MODEL
+$azureOpenAiEmbeddingCapacity = azd env get-value AZURE_OPENAI_EMBEDDING_CAPACITY
 
 Add-Content -Path .env -Value "API_HOST=azure"
 Add-Content -Path .env -Value "AZURE_TENANT_ID=$azureTenantId"
@@ -16,3 +17,4 @@ Add-Content -Path .env -Value "AZURE_OPENAI_CHAT_DEPLOYMENT=$azureOpenAiChatDepl
 Add-Content -Path .env -Value "AZURE_OPENAI_CHAT_MODEL=$azureOpenAiChatModel"
 Add-Content -Path .env -Value "AZURE_OPENAI_EMBEDDING_DEPLOYMENT=$azureOpenAiEmbeddingDeployment"
 Add-Content -Path .env -Value "AZURE_OPENAI_EMBEDDING_MODEL=$azureOpenAiEmbeddingModel"
+Add-Content -Path .env -Value "AZURE_OPENAI_EMBEDDING_CAPACITY=$azureOpenAiEmbeddingCapacity"
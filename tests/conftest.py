@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The examples import their helpers as the top-level `shared` package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "examples"))
@@ -0,0 +1,23 @@
+import numpy as np
+from shared.hotel_inventory import CityHotels
+
+
+def make_city(ratings: list[float]) -> CityHotels:
+    n = len(ratings)
+    return CityHotels(
+        city="Seattle",
+        names=[f"Hotel {i}" for i in range(n)],
+        addresses=[f"{i} Pike St" for i in range(n)],
+        neighborhoods=np.zeros(n, dtype=np.uint8),
+        hotel_types=np.zeros(n, dtype=np.uint8),
+        amenity_masks=np.zeros(n, dtype=np.uint32),
+        ratings=np.array(ratings, dtype=np.float32),
+        prices=np.full(n, 100, dtype=np.int32),
+        available_rooms=np.ones(n, dtype=np.int16),
+    )
+
+
+def test_min_rating_keeps_hotels_rated_exactly_the_minimum():
+    city = make_city([4.0, 4.1, 4.2, 3.9, 4.1])
+    rows = city.query(min_rating=4.1)
+    assert sorted(rows.tolist()) == [1, 2, 4]
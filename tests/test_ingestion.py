@@ -0,0 +1,41 @@
+from pathlib import Path
+
+import pytest
+from llama_index.core import Settings, StorageContext, VectorStoreIndex
+from llama_index.core.embeddings import MockEmbedding
+from shared import ingestion
+from shared.numpy_vector_store import NumpyVectorStore
+from shared.pdf_pages import ParsedPage
+
+PAGES = [
+    "Employees may expense home office equipment up to 500 dollars per year.",
+    "Gardening tools are not covered by the PerksPlus program.",
+    "Dental coverage includes two cleanings per year at no cost.",
+]
+
+
+@pytest.fixture(autouse=True)
+def mock_embedding(monkeypatch):
+    # Set the private field: reading `Settings.embed_model` would first load the OpenAI default
+    monkeypatch.setattr(Settings, "_embed_model", MockEmbedding(embed_dim=8))
+
+
+def load(monkeypatch, tmp_path: Path, texts: list[str]):
+    pages = [ParsedPage(label=str(number), text=text) for number, text in enumerate(texts, start=1)]
+    monkeypatch.setattr(ingestion, "parse_pdf_pages", lambda source, source_sha256: pages)
+    source = tmp_path / "handbook.pdf"
+    source.touch()
+    return ingestion.load_pages(source, source_sha256="0" * 64)
+
+
+def test_inserting_a_page_reuses_the_embeddings_of_the_pages_after_it(monkeypatch, tmp_path):
+    vector_store = NumpyVectorStore()
+    index = VectorStoreIndex(nodes=[], storage_context=StorageContext.from_defaults(vector_store=vector_store))
+    first = ingestion.ingest_pages(index, load(monkeypatch, tmp_path, PAGES))
+    assert first.chunks_embedded == len(PAGES)
+
+    inserted = ["Welcome to the Contoso employee handbook."]
+    stats = ingestion.ingest_pages(index, load(monkeypatch, tmp_path, inserted + PAGES))
+
+    assert stats.chunks_embedded == 1
+    assert stats.chunks_reused == len(PAGES)